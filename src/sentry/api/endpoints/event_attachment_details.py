@@ -9,6 +9,7 @@ from sentry.auth.superuser import is_active_superuser
 from sentry.auth.system import is_system_auth
 from sentry.constants import ATTACHMENTS_ROLE_DEFAULT
 from sentry.models import EventAttachment, File, OrganizationMember
+from sentry.models.file import DOWNLOAD_READ_AHEAD
 
 
 class EventAttachmentDetailsPermission(ProjectPermission):
@@ -48,7 +49,7 @@ class EventAttachmentDetailsEndpoint(ProjectEndpoint):
 
     def download(self, attachment):
         file = File.objects.get(id=attachment.file_id)
-        fp = file.getfile()
+        fp = file.getfile(read_ahead=DOWNLOAD_READ_AHEAD)
         response = StreamingHttpResponse(
             iter(lambda: fp.read(4096), b""),
             content_type=file.headers.get("content-type", "application/octet-stream"),
@@ -2,6 +2,7 @@ import logging
 import random
 
 from django.conf import settings
+from django.http import HttpResponse
 from rest_framework.response import Response
 from sentry_sdk import Hub, set_tag, start_span, start_transaction
 
@@ -10,7 +11,7 @@ from sentry.api.base import Endpoint
 from sentry.api.permissions import RelayPermission
 from sentry.models import Organization, OrganizationOption, Project, ProjectKey, ProjectKeyStatus
 from sentry.relay import config, projectconfig_cache
-from sentry.utils import metrics
+from sentry.utils import json, metrics
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +23,23 @@ def _sample_apm():
     return random.random() < getattr(settings, "SENTRY_RELAY_ENDPOINT_APM_SAMPLING", 0)
 
 
+def _serialized_configs_response(configs):
+    """
+    Build the response from configs that have already been serialized to JSON
+    bytes, without decoding them again.
+    """
+    chunks = [b'{"configs":{']
+    for i, (key, serialized) in enumerate(configs.items()):
+        if i:
+            chunks.append(b",")
+        chunks.append(json.dumps(key).encode("utf8"))
+        chunks.append(b":")
+        chunks.append(serialized)
+    chunks.append(b"}}")
+
+    return HttpResponse(b"".join(chunks), status=200, content_type="application/json")
+
+
 class RelayProjectConfigsEndpoint(Endpoint):
     authentication_classes = (RelayAuthentication,)
     permission_classes = (RelayPermission,)
@@ -61,6 +79,18 @@ class RelayProjectConfigsEndpoint(Endpoint):
         public_keys = request.relay_request_data.get("publicKeys")
         public_keys = set(public_keys or ())
 
+        # Full configs are precomputed by `update_config_cache` and cached in
+        # serialized form, so they can be passed through as they are. Only
+        # internal relays can request full configs, and they have access to
+        # all organizations.
+        cached_configs = {}
+        if full_config_requested and public_keys:
+            with start_span(op="relay_fetch_cached_configs"):
+                cached_configs = projectconfig_cache.get_many_serialized(public_keys)
+                public_keys -= set(cached_configs)
+
+            metrics.timing("relay_project_configs.cached_configs", len(cached_configs))
+
         project_keys = {}  # type: dict[str, ProjectKey]
         project_ids = set()  # type: set[int]
 
@@ -131,10 +161,16 @@ class RelayProjectConfigsEndpoint(Endpoint):
 
             configs[public_key] = project_config.to_dict()
 
+        serialized_configs = {
+            public_key: json.dumps(project_config).encode("utf8")
+            for public_key, project_config in configs.items()
+        }
+
         if full_config_requested:
-            projectconfig_cache.set_many(configs)
+            projectconfig_cache.set_many_serialized(serialized_configs)
 
-        return Response({"configs": configs}, status=200)
+        serialized_configs.update(cached_configs)
+        return _serialized_configs_response(serialized_configs)
 
     def _post_by_project(self, request, full_config_requested):
         project_ids = set(request.relay_request_data.get("projects") or ())
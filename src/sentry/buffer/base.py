@@ -1,6 +1,8 @@
 import logging
 
-from django.db.models import F
+from django.db import connections, router
+from django.db.models import F, Model
+from django.db.models.expressions import BaseExpression
 
 from sentry.signals import buffer_incr_complete
 from sentry.tasks.process_buffer import process_incr
@@ -28,7 +30,10 @@ class Buffer(Service, metaclass=BufferMount):
     keep up with the updates.
     """
 
-    __all__ = ("incr", "process", "process_pending", "validate")
+    __all__ = ("incr", "process", "process_batch", "process_pending", "validate")
+
+    # The maximum amount of rows updated by a single bulk ``UPDATE`` statement.
+    bulk_update_size = 1000
 
     def incr(self, model, columns, filters, extra=None, signal_only=None):
         """
@@ -82,3 +87,162 @@ class Buffer(Service, metaclass=BufferMount):
             created=created,
             sender=model,
         )
+
+    def process_batch(self, model, items):
+        """
+        Processes many buffered updates for the same model at once. ``items``
+        is a sequence of ``(columns, filters, extra, signal_only)`` tuples, as
+        they would be passed to ``process``.
+
+        Updates of rows that share the same filter, counter and extra columns
+        are merged and applied with a single ``UPDATE ... FROM (VALUES ...)``
+        statement. Updates for rows which do not exist yet, and updates that
+        cannot be expressed that way, fall back to ``process``.
+        """
+        batches = {}
+
+        for columns, filters, extra, signal_only in items:
+            if (
+                signal_only
+                or not columns
+                or not self._can_bulk_update(model, columns, filters, extra)
+            ):
+                self.process(model, columns, filters, extra, signal_only)
+                continue
+
+            extra = dict(extra or {})
+            if self._has_score_clause(model, columns, extra):
+                # The score is computed as part of the update statement.
+                extra.pop("score", None)
+
+            shape = (tuple(sorted(filters)), tuple(sorted(columns)), tuple(sorted(extra)))
+            filter_values = tuple(
+                self._coerce_filter_value(filters[name]) for name in sorted(filters)
+            )
+
+            # Merge updates to the same row, extra values are last write wins.
+            merged = batches.setdefault(shape, {}).get(filter_values)
+            if merged is None:
+                batches[shape][filter_values] = (dict(columns), filters, extra)
+            else:
+                for column, amount in columns.items():
+                    merged[0][column] += amount
+                merged[2].update(extra)
+
+        for shape, rows in batches.items():
+            rows = list(rows.items())
+            for i in range(0, len(rows), self.bulk_update_size):
+                self._bulk_update(model, shape, rows[i : i + self.bulk_update_size])
+
+    def _can_bulk_update(self, model, columns, filters, extra):
+        connection = connections[router.db_for_write(model)]
+        if connection.vendor != "postgresql":
+            return False
+
+        try:
+            for name in filters:
+                if "__" in name:
+                    return False
+                self._get_field(model, name)
+        except Exception:
+            return False
+
+        for name, value in (extra or {}).items():
+            if isinstance(value, BaseExpression):
+                if name != "score" or not self._has_score_clause(model, columns, extra):
+                    return False
+
+        return True
+
+    def _has_score_clause(self, model, column_names, extra_names):
+        from sentry.models import Group
+
+        # See the corresponding hack in ``process``.
+        return model is Group and "last_seen" in extra_names and "times_seen" in column_names
+
+    def _get_field(self, model, name):
+        if name == "pk":
+            return model._meta.pk
+        return model._meta.get_field(name)
+
+    def _coerce_filter_value(self, value):
+        if isinstance(value, Model):
+            return value.pk
+        return value
+
+    def _bulk_update(self, model, shape, rows):
+        filter_names, column_names, extra_names = shape
+        using = router.db_for_write(model)
+        connection = connections[using]
+        qn = connection.ops.quote_name
+
+        fields = [
+            self._get_field(model, name) for name in filter_names + column_names + extra_names
+        ]
+        table = qn(model._meta.db_table)
+
+        set_clauses = []
+        for field in fields[len(filter_names) : len(filter_names) + len(column_names)]:
+            column = qn(field.column)
+            set_clauses.append(f"{column} = COALESCE({table}.{column}, 0) + v.{column}")
+        for field in fields[len(filter_names) + len(column_names) :]:
+            column = qn(field.column)
+            set_clauses.append(f"{column} = v.{column}")
+
+        if self._has_score_clause(model, column_names, extra_names):
+            # Equivalent of ``ScoreClause``, evaluated against the old times_seen.
+            set_clauses.append(
+                f"{qn('score')} = log({table}.{qn('times_seen')} + v.{qn('times_seen')}) * 600"
+                f" + extract(epoch from v.{qn('last_seen')})::int"
+            )
+
+        placeholder = "(%s)" % ", ".join(
+            f"CAST(%s AS {field.db_type(connection)})" for field in fields
+        )
+        params = []
+        for filter_values, (columns, filters, extra) in rows:
+            params.extend(
+                field.get_db_prep_save(value, connection)
+                for field, value in zip(
+                    fields,
+                    filter_values
+                    + tuple(columns[name] for name in column_names)
+                    + tuple(extra[name] for name in extra_names),
+                )
+            )
+
+        filter_columns = [qn(field.column) for field in fields[: len(filter_names)]]
+        sql = (
+            "UPDATE {table} SET {sets} FROM (VALUES {values}) AS v ({names}) "
+            "WHERE {where} RETURNING {returning}"
+        ).format(
+            table=table,
+            sets=", ".join(set_clauses),
+            values=", ".join([placeholder] * len(rows)),
+            names=", ".join(qn(field.column) for field in fields),
+            where=" AND ".join(f"{table}.{column} = v.{column}" for column in filter_columns),
+            returning=", ".join(f"{table}.{column}" for column in filter_columns),
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            updated = {tuple(row) for row in cursor.fetchall()}
+
+        for filter_values, (columns, filters, extra) in rows:
+            prepped = tuple(
+                field.get_db_prep_save(value, connection)
+                for field, value in zip(fields, filter_values)
+            )
+            if prepped not in updated:
+                # The row does not exist yet and needs to be created.
+                self.process(model, columns, filters, extra)
+                continue
+
+            buffer_incr_complete.send_robust(
+                model=model,
+                columns=columns,
+                filters=filters,
+                extra=extra,
+                created=False,
+                sender=model,
+            )
@@ -51,12 +51,24 @@ class RedisBuffer(Buffer):
     key_expire = 60 * 60  # 1 hour
     pending_key = "b:p"
 
-    def __init__(self, pending_partitions=1, incr_batch_size=2, **options):
+    def __init__(
+        self,
+        pending_partitions=1,
+        incr_batch_size=2,
+        bulk_flush=False,
+        bulk_flush_size=1000,
+        **options,
+    ):
         self.cluster, options = get_cluster_from_options("SENTRY_BUFFER_OPTIONS", options)
         self.pending_partitions = pending_partitions
         self.incr_batch_size = incr_batch_size
+        # When enabled, pending keys are flushed in large batches, and all
+        # updates of one batch are merged and applied as bulk updates.
+        self.bulk_flush = bulk_flush
+        self.bulk_flush_size = bulk_flush_size
         assert self.pending_partitions > 0
         assert self.incr_batch_size > 0
+        assert self.bulk_flush_size > 0
 
     def validate(self):
         try:
@@ -210,7 +222,9 @@ class RedisBuffer(Buffer):
         if not client.set(lock_key, "1", nx=True, ex=60):
             return
 
-        pending_buffer = PendingBuffer(self.incr_batch_size)
+        pending_buffer = PendingBuffer(
+            self.bulk_flush_size if self.bulk_flush else self.incr_batch_size
+        )
 
         try:
             keycount = 0
@@ -243,9 +257,63 @@ class RedisBuffer(Buffer):
         if key is not None:
             batch_keys = [key]
 
+        if self.bulk_flush and len(batch_keys) > 1:
+            self._process_batch_incr(batch_keys)
+            return
+
         for key in batch_keys:
             self._process_single_incr(key)
 
+    def _process_batch_incr(self, keys):
+        lock_keys = [self._make_lock_key(key) for key in keys]
+
+        # prevent a stampede due to the way we use celery etas + duplicate
+        # tasks, see ``_process_single_incr``
+        with self.cluster.map() as conn:
+            locks = [conn.set(lock_key, "1", nx=True, ex=10) for lock_key in lock_keys]
+
+        locked_keys = []
+        for key, lock in zip(keys, locks):
+            if lock.value:
+                locked_keys.append(key)
+            else:
+                metrics.incr("buffer.revoked", tags={"reason": "locked"}, skip_internal=False)
+                self.logger.debug("buffer.revoked.locked", extra={"redis_key": key})
+
+        try:
+            with self.cluster.map() as conn:
+                results = []
+                for key in locked_keys:
+                    results.append((key, conn.hgetall(key)))
+                    conn.zrem(self._make_pending_key_from_key(key), key)
+                    conn.delete(key)
+
+            items_by_model = {}
+            for key, result in results:
+                values = {force_text(k): v for k, v in result.value.items()}
+
+                if not values:
+                    metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
+                    self.logger.debug("buffer.revoked.empty", extra={"redis_key": key})
+                    continue
+
+                model, incr_values, filters, extra_values, signal_only = self._load_incr(values)
+                items_by_model.setdefault(model, []).append(
+                    (incr_values, filters, extra_values, signal_only)
+                )
+
+            for model, items in items_by_model.items():
+                with metrics.timer(
+                    "buffer.process_batch",
+                    tags={"module": model.__module__, "model": model.__name__},
+                ):
+                    super().process_batch(model, items)
+        finally:
+            with self.cluster.map() as conn:
+                for key, lock in zip(keys, locks):
+                    if lock.value:
+                        conn.delete(self._make_lock_key(key))
+
     def _process_single_incr(self, key):
         client = self.cluster.get_routing_client()
         lock_key = self._make_lock_key(key)
@@ -276,32 +344,39 @@ class RedisBuffer(Buffer):
                 self.logger.debug("buffer.revoked.empty", extra={"redis_key": key})
                 return
 
-            # XXX(py3): Note that ``import_string`` explicitly wants a str in
-            # python2, so we'll decode (for python3) and then translate back to
-            # a byte string (in python2) for import_string.
-            model = import_string(str(values.pop("m").decode("utf-8")))  # NOQA
-
-            if values["f"].startswith(b"{"):
-                filters = self._load_values(json.loads(values.pop("f").decode("utf-8")))
-            else:
-                # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                filters = pickle.loads(values.pop("f"))
-
-            incr_values = {}
-            extra_values = {}
-            signal_only = None
-            for k, v in values.items():
-                if k.startswith("i+"):
-                    incr_values[k[2:]] = int(v)
-                elif k.startswith("e+"):
-                    if v.startswith(b"["):
-                        extra_values[k[2:]] = self._load_value(json.loads(v.decode("utf-8")))
-                    else:
-                        # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                        extra_values[k[2:]] = pickle.loads(v)
-                elif k == "s":
-                    signal_only = bool(int(v))  # Should be 1 if set
-
-            super().process(model, incr_values, filters, extra_values, signal_only)
+            super().process(*self._load_incr(values))
         finally:
             client.delete(lock_key)
+
+    def _load_incr(self, values):
+        """
+        Loads the ``(model, columns, filters, extra, signal_only)`` arguments
+        for ``Buffer.process`` from the hash that has been written by ``incr``.
+        """
+        # XXX(py3): Note that ``import_string`` explicitly wants a str in
+        # python2, so we'll decode (for python3) and then translate back to
+        # a byte string (in python2) for import_string.
+        model = import_string(str(values.pop("m").decode("utf-8")))  # NOQA
+
+        if values["f"].startswith(b"{"):
+            filters = self._load_values(json.loads(values.pop("f").decode("utf-8")))
+        else:
+            # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+            filters = pickle.loads(values.pop("f"))
+
+        incr_values = {}
+        extra_values = {}
+        signal_only = None
+        for k, v in values.items():
+            if k.startswith("i+"):
+                incr_values[k[2:]] = int(v)
+            elif k.startswith("e+"):
+                if v.startswith(b"["):
+                    extra_values[k[2:]] = self._load_value(json.loads(v.decode("utf-8")))
+                else:
+                    # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+                    extra_values[k[2:]] = pickle.loads(v)
+            elif k == "s":
+                signal_only = bool(int(v))  # Should be 1 if set
+
+        return model, incr_values, filters, extra_values, signal_only
@@ -1,5 +1,5 @@
 import logging
-from typing import TYPE_CHECKING, Any, Iterable, Mapping, Optional
+from typing import TYPE_CHECKING, Any, Iterable, Mapping, Optional, Sequence
 
 from sentry.utils.imports import import_string
 from sentry.utils.services import Service
@@ -118,6 +118,7 @@ class Backend(Service):  # type: ignore
         increment_delay: Optional[int] = None,
         maximum_delay: Optional[int] = None,
         timestamp: Optional[float] = None,
+        sample_keys: Optional[Sequence[str]] = None,
     ) -> bool:
         """
         Add a record to a timeline.
@@ -130,6 +131,12 @@ class Backend(Service):  # type: ignore
 
         The return value this function indicates whether or not the timeline is
         ready for immediate digestion.
+
+        If ``sample_keys`` are provided, backends may digest a sample of the
+        timeline rather than all of its records: the latest record added with
+        each of the sample keys, as well as the oldest record of the timeline.
+        Records added without sample keys are only digested if no record of the
+        timeline has sample keys.
         """
         raise NotImplementedError
 
@@ -1,5 +1,5 @@
 from contextlib import contextmanager
-from typing import TYPE_CHECKING, Any, Iterable, Optional
+from typing import TYPE_CHECKING, Any, Iterable, Optional, Sequence
 
 from sentry.digests.backends.base import Backend
 
@@ -16,6 +16,7 @@ class DummyBackend(Backend):
         increment_delay: Optional[int] = None,
         maximum_delay: Optional[int] = None,
         timestamp: Optional[float] = None,
+        sample_keys: Optional[Sequence[str]] = None,
     ) -> bool:
         pass
 
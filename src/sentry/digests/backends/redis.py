@@ -1,7 +1,7 @@
 import logging
 import time
 from contextlib import contextmanager
-from typing import Any, Iterable, Optional, Tuple
+from typing import Any, Iterable, Optional, Sequence, Tuple
 
 from rb.clients import LocalClient
 from redis.exceptions import ResponseError
@@ -44,14 +44,30 @@ class RedisBackend(Backend):
         redis:6379> GET "d:t:mail:p:1:r:433be20b807c4cd49a132de69c0f6c55"
         [ binary content ]
 
+    Records that are added with sample keys are also indexed by them: a hash
+    maps each sample key to the latest record added with it. Once a timeline
+    has a sample index, only the records it refers to (and the oldest record)
+    are read when the timeline is digested, and the remaining records are
+    deleted when the digest is closed:
+
+    .. code::
+
+        redis:6379> HGETALL "d:t:mail:p:1:s"
+        1) "1:2"
+        2) "433be20b807c4cd49a132de69c0f6c55"
+        3) "1:2:t"
+        4) "1444847625"
+        ...
+
     When the timeline is ready to be digested, the timeline set is renamed,
     creating a digest set (in this case the key would be ``d:t:mail:p:1:d``),
     that represents a snapshot of the timeline contents at that point in time.
     (If the digest set already exists, the timeline contents are instead
-    unioned into the digest set and then the timeline is cleared.) This allows
-    new records to be added to the timeline that will be processed after the
-    next scheduling interval without the risk of data loss due to race
-    conditions between the record addition and digest generation and delivery.
+    unioned into the digest set and then the timeline is cleared. The sample
+    index is moved or merged the same way.) This allows new records to be added
+    to the timeline that will be processed after the next scheduling interval
+    without the risk of data loss due to race conditions between the record
+    addition and digest generation and delivery.
 
     Schedules are modeled as two sorted sets -- one for ``waiting`` items, and
     one for ``ready`` items. Items in the ``waiting`` set are scored by the
@@ -105,6 +121,7 @@ class RedisBackend(Backend):
         increment_delay: Optional[int] = None,
         maximum_delay: Optional[int] = None,
         timestamp: Optional[float] = None,
+        sample_keys: Optional[Sequence[str]] = None,
     ) -> bool:
         if timestamp is None:
             timestamp = time.time()
@@ -134,6 +151,7 @@ class RedisBackend(Backend):
                     maximum_delay,
                     self.capacity if self.capacity else -1,
                     self.truncation_chance,
+                    *(sample_keys or ()),
                 ],
             )
         )
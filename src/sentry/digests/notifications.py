@@ -60,6 +60,14 @@ def event_to_record(event: Event, rules: Sequence[Rule]) -> Record:
     )
 
 
+def get_sample_keys(record: Record) -> Sequence[str]:
+    """
+    Digests only show the latest record of every group for each rule, so the
+    records of a timeline are sampled by rule and group.
+    """
+    return [f"{rule_id}:{record.value.event.group_id}" for rule_id in record.value.rules]
+
+
 def fetch_state(project: "Project", records: Sequence[Record]) -> Mapping[str, Any]:
     # This reads a little strange, but remember that records are returned in
     # reverse chronological order, and we query the database in chronological
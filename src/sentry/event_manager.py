@@ -14,7 +14,17 @@ from django.db.models import Func
 from django.utils.encoding import force_text
 from pytz import UTC
 
-from sentry import buffer, eventstore, eventstream, eventtypes, features, options, quotas, tsdb
+from sentry import (
+    buffer,
+    eventstore,
+    eventstream,
+    eventtypes,
+    features,
+    nodestore,
+    options,
+    quotas,
+    tsdb,
+)
 from sentry.attachments import MissingAttachmentChunks, attachment_cache
 from sentry.constants import (
     DEFAULT_STORE_NORMALIZER_ARGS,
@@ -334,32 +344,91 @@ class EventManager:
                 "organization", Organization.objects.get_from_cache(id=project.organization_id)
             )
 
-        job = {"data": self._data, "project_id": project_id, "raw": raw, "start_time": start_time}
-        jobs = [job]
+        job = {
+            "data": self._data,
+            "project_id": project_id,
+            "raw": raw,
+            "start_time": start_time,
+            "cache_key": cache_key,
+        }
 
-        is_reprocessed = is_reprocessed_event(job["data"])
+        _save_error_events_impl([job], projects)
 
-        with sentry_sdk.start_span(op="event_manager.save.pull_out_data"):
-            _pull_out_data(jobs, projects)
+        if "discarded" in job:
+            raise job["discarded"]
 
-        with sentry_sdk.start_span(op="event_manager.save.get_or_create_release_many"):
-            _get_or_create_release_many(jobs, projects)
+        self._data = job["event"].data.data
 
-        with sentry_sdk.start_span(op="event_manager.save.get_event_user_many"):
-            _get_event_user_many(jobs, projects)
+        return job["event"]
+
+
+@metrics.wraps("event_manager.save_error_events")
+def save_error_events(jobs, projects, on_saving=None):
+    """
+    Saves a batch of already normalized error events.
+
+    This is the batched counterpart of ``EventManager.save`` for events that
+    do not need to be normalized anymore: releases, environments and event
+    users are looked up once per batch, and the nodestore and eventstream
+    writes are issued together for all events.
+
+    Every job needs at least ``data``, ``project_id`` and ``start_time``, and
+    may carry ``raw`` and the ``cache_key`` the event was stored under.
+    Events that are discarded based on their hash are refunded and get the
+    ``HashDiscarded`` exception set as ``job["discarded"]``; all other jobs
+    are returned.
+
+    ``on_saving`` is called with every job right before its first write that
+    must not be repeated, so that callers know which events cannot be saved
+    again if saving the batch fails.
+    """
+    with metrics.timer("event_manager.save_error_events.collect_organization_ids"):
+        organization_ids = {project.organization_id for project in projects.values()}
+
+    with metrics.timer("event_manager.save_error_events.fetch_organizations"):
+        organizations = {
+            o.id: o for o in Organization.objects.get_many_from_cache(organization_ids)
+        }
+
+    with metrics.timer("event_manager.save_error_events.set_organization_cache"):
+        for project in projects.values():
+            try:
+                project.set_cached_field_value(
+                    "organization", organizations[project.organization_id]
+                )
+            except KeyError:
+                continue
+
+    for job in jobs:
+        job.setdefault("raw", False)
+        job.setdefault("cache_key", None)
+
+    return _save_error_events_impl(jobs, projects, on_saving=on_saving)
 
-        job["project_key"] = None
-        if job["key_id"] is not None:
-            with metrics.timer("event_manager.load_project_key"):
-                try:
-                    job["project_key"] = ProjectKey.objects.get_from_cache(id=job["key_id"])
-                except ProjectKey.DoesNotExist:
-                    pass
 
-        _derive_plugin_tags_many(jobs, projects)
-        _derive_interface_tags_many(jobs)
+def _save_error_events_impl(jobs, projects, on_saving=None):
+    for job in jobs:
+        job["is_reprocessed"] = is_reprocessed_event(job["data"])
+
+    with sentry_sdk.start_span(op="event_manager.save.pull_out_data"):
+        _pull_out_data(jobs, projects)
+
+    with sentry_sdk.start_span(op="event_manager.save.get_or_create_release_many"):
+        _get_or_create_release_many(jobs, projects)
+
+    with sentry_sdk.start_span(op="event_manager.save.get_event_user_many"):
+        _get_event_user_many(jobs, projects)
+
+    _get_project_key_many(jobs)
+
+    _derive_plugin_tags_many(jobs, projects)
+    _derive_interface_tags_many(jobs)
+
+    do_background_grouping_before = options.get("store.background-grouping-before")
+
+    for job in jobs:
+        project = projects[job["project_id"]]
 
-        do_background_grouping_before = options.get("store.background-grouping-before")
         if do_background_grouping_before:
             _run_background_grouping(project, job)
 
@@ -391,7 +460,7 @@ class EventManager:
         ):
             hashes = _calculate_event_grouping(project, job["event"], grouping_config)
 
-        hashes = CalculatedHashes(
+        job["hashes"] = CalculatedHashes(
             hashes=hashes.hashes + (secondary_hashes and secondary_hashes.hashes or []),
             hierarchical_hashes=hashes.hierarchical_hashes,
             tree_labels=hashes.tree_labels,
@@ -400,10 +469,15 @@ class EventManager:
         if not do_background_grouping_before:
             _run_background_grouping(project, job)
 
-        if hashes.tree_labels:
-            job["finest_tree_label"] = hashes.finest_tree_label
+        if job["hashes"].tree_labels:
+            job["finest_tree_label"] = job["hashes"].finest_tree_label
 
-        _materialize_metadata_many(jobs)
+    _materialize_metadata_many(jobs)
+
+    saved_jobs = []
+    for job in jobs:
+        if on_saving is not None:
+            on_saving(job)
 
         kwargs = {
             "platform": job["platform"],
@@ -425,21 +499,22 @@ class EventManager:
         # based on the group counter.
         with metrics.timer("event_manager.get_attachments"):
             with sentry_sdk.start_span(op="event_manager.save.get_attachments"):
-                attachments = get_attachments(cache_key, job)
+                job["attachments"] = get_attachments(job["cache_key"], job)
 
         try:
             with sentry_sdk.start_span(op="event_manager.save.save_aggregate_fn"):
                 job["group"], job["is_new"], job["is_regression"] = _save_aggregate(
                     event=job["event"],
-                    hashes=hashes,
+                    hashes=job["hashes"],
                     release=job["release"],
                     metadata=dict(job["event_metadata"]),
                     received_timestamp=job["received_timestamp"],
                     **kwargs,
                 )
-        except HashDiscarded:
-            discard_event(job, attachments)
-            raise
+        except HashDiscarded as e:
+            discard_event(job, job["attachments"])
+            job["discarded"] = e
+            continue
 
         job["event"].group = job["group"]
 
@@ -447,8 +522,13 @@ class EventManager:
         # XXX(markus): No clue what this does
         job["event"].data.bind_ref(job["event"])
 
-        _get_or_create_environment_many(jobs, projects)
+        saved_jobs.append(job)
+
+    jobs = saved_jobs
+
+    _get_or_create_environment_many(jobs, projects)
 
+    for job in jobs:
         if job["group"]:
             group_environment, job["is_new_group_environment"] = GroupEnvironment.get_or_create(
                 group_id=job["group"].id,
@@ -458,8 +538,9 @@ class EventManager:
         else:
             job["is_new_group_environment"] = False
 
-        _get_or_create_release_associated_models(jobs, projects)
+    _get_or_create_release_associated_models(jobs, projects)
 
+    for job in jobs:
         if job["release"] and job["group"]:
             job["grouprelease"] = GroupRelease.get_or_create(
                 group=job["group"],
@@ -468,25 +549,30 @@ class EventManager:
                 datetime=job["event"].datetime,
             )
 
-        _tsdb_record_all_metrics(jobs)
+    _tsdb_record_all_metrics(jobs)
 
+    for job in jobs:
         if job["group"]:
-            UserReport.objects.filter(project_id=project.id, event_id=job["event"].event_id).update(
-                group_id=job["group"].id, environment_id=job["environment"].id
-            )
+            UserReport.objects.filter(
+                project_id=job["project_id"], event_id=job["event"].event_id
+            ).update(group_id=job["group"].id, environment_id=job["environment"].id)
 
         with metrics.timer("event_manager.filter_attachments_for_group"):
-            attachments = filter_attachments_for_group(attachments, job)
+            job["attachments"] = filter_attachments_for_group(job["attachments"], job)
 
-        # XXX: DO NOT MUTATE THE EVENT PAYLOAD AFTER THIS POINT
-        _materialize_event_metrics(jobs)
+    # XXX: DO NOT MUTATE THE EVENT PAYLOAD AFTER THIS POINT
+    _materialize_event_metrics(jobs)
 
-        for attachment in attachments:
+    for job in jobs:
+        for attachment in job["attachments"]:
             key = f"bytes.stored.{attachment.type}"
             old_bytes = job["event_metrics"].get(key) or 0
             job["event_metrics"][key] = old_bytes + attachment.size
 
-        _nodestore_save_many(jobs)
+    _nodestore_save_many(jobs)
+
+    for job in jobs:
+        project = projects[job["project_id"]]
         save_unprocessed_event(project, job["event"].event_id)
 
         if job["release"]:
@@ -506,27 +592,28 @@ class EventManager:
                         "environment_id": job["environment"].id,
                     },
                 )
-        if not raw:
+        if not job["raw"]:
             if not project.first_event:
                 project.update(first_event=job["event"].datetime)
                 first_event_received.send_robust(
                     project=project, event=job["event"], sender=Project
                 )
 
-        if is_reprocessed:
+        if job["is_reprocessed"]:
             safe_execute(delete_old_primary_hash, job["event"], _with_transaction=False)
 
-        _eventstream_insert_many(jobs)
+    _eventstream_insert_many(jobs)
 
+    for job in jobs:
         # Do this last to ensure signals get emitted even if connection to the
         # file store breaks temporarily.
         #
         # We do not need this for reprocessed events as for those we update the
         # group_id on existing models in post_process_group, which already does
         # this because of indiv. attachments.
-        if not is_reprocessed:
+        if not job["is_reprocessed"]:
             with metrics.timer("event_manager.save_attachments"):
-                save_attachments(cache_key, attachments, job)
+                save_attachments(job["cache_key"], job["attachments"], job)
 
         metric_tags = {"from_relay": "_relay_processed" in job["data"]}
 
@@ -542,11 +629,9 @@ class EventManager:
             tags=metric_tags,
         )
 
-        _track_outcome_accepted_many(jobs)
-
-        self._data = job["event"].data.data
+    _track_outcome_accepted_many(jobs)
 
-        return job["event"]
+    return jobs
 
 
 @metrics.wraps("event_manager.background_grouping")
@@ -664,9 +749,21 @@ def _get_or_create_release_many(jobs, projects):
 
 @metrics.wraps("save_event.get_event_user_many")
 def _get_event_user_many(jobs, projects):
+    # Prime the event user cache with a single roundtrip for the entire batch,
+    # so that only users we have not seen recently need to hit the database.
+    known_euser_ids = {}
+    if len(jobs) > 1:
+        cache_keys = set()
+        for job in jobs:
+            euser = _build_event_user(projects[job["project_id"]], job["data"])
+            if euser is not None:
+                cache_keys.add(_get_event_user_cache_key(euser))
+        if cache_keys:
+            known_euser_ids = cache.get_many(cache_keys)
+
     for job in jobs:
         data = job["data"]
-        user = _get_event_user(projects[job["project_id"]], data)
+        user = _get_event_user(projects[job["project_id"]], data, known_euser_ids)
 
         if user:
             pop_tag(data, "user")
@@ -735,10 +832,30 @@ def _materialize_metadata_many(jobs):
 
 @metrics.wraps("save_event.get_or_create_environment_many")
 def _get_or_create_environment_many(jobs, projects):
+    environments = {}
+
     for job in jobs:
-        job["environment"] = Environment.get_or_create(
-            project=projects[job["project_id"]], name=job["environment"]
-        )
+        environment_key = (job["project_id"], job["environment"])
+        environment = environments.get(environment_key)
+        if environment is None:
+            environment = environments[environment_key] = Environment.get_or_create(
+                project=projects[job["project_id"]], name=job["environment"]
+            )
+
+        job["environment"] = environment
+
+
+@metrics.wraps("save_event.get_project_key_many")
+def _get_project_key_many(jobs):
+    key_ids = {job["key_id"] for job in jobs if job["key_id"] is not None}
+
+    project_keys = {}
+    if key_ids:
+        with metrics.timer("event_manager.load_project_key"):
+            project_keys = {pk.id: pk for pk in ProjectKey.objects.get_many_from_cache(key_ids)}
+
+    for job in jobs:
+        job["project_key"] = project_keys.get(job["key_id"])
 
 
 @metrics.wraps("save_event.get_or_create_release_associated_models")
@@ -823,21 +940,22 @@ def _tsdb_record_all_metrics(jobs):
 @metrics.wraps("save_event.nodestore_save_many")
 def _nodestore_save_many(jobs):
     inserted_time = datetime.utcnow().replace(tzinfo=UTC).timestamp()
-    for job in jobs:
-        # Write the event to Nodestore
-        subkeys = {}
+    # Write all events of the batch to Nodestore together
+    with nodestore.buffered_writes():
+        for job in jobs:
+            subkeys = {}
 
-        if job["group"]:
-            event = job["event"]
-            data = event_processing_store.get(
-                cache_key_for_event({"project": event.project_id, "event_id": event.event_id}),
-                unprocessed=True,
-            )
-            if data is not None:
-                subkeys["unprocessed"] = data
+            if job["group"]:
+                event = job["event"]
+                data = event_processing_store.get(
+                    cache_key_for_event({"project": event.project_id, "event_id": event.event_id}),
+                    unprocessed=True,
+                )
+                if data is not None:
+                    subkeys["unprocessed"] = data
 
-        job["event"].data["nodestore_insert"] = inserted_time
-        job["event"].data.save(subkeys=subkeys)
+            job["event"].data["nodestore_insert"] = inserted_time
+            job["event"].data.save(subkeys=subkeys)
 
 
 @metrics.wraps("save_event.eventstream_insert_many")
@@ -895,19 +1013,20 @@ def _get_event_instance(data, project_id):
     )
 
 
-def _get_event_user(project, data):
+def _get_event_user(project, data, known_euser_ids=None):
     with metrics.timer("event_manager.get_event_user") as metrics_tags:
-        return _get_event_user_impl(project, data, metrics_tags)
+        return _get_event_user_impl(project, data, metrics_tags, known_euser_ids)
+
 
+def _get_event_user_cache_key(euser):
+    return f"euserid:1:{euser.project_id}:{euser.hash}"
 
-def _get_event_user_impl(project, data, metrics_tags):
+
+def _build_event_user(project, data):
     user_data = data.get("user")
     if not user_data:
-        metrics_tags["event_has_user"] = "false"
         return
 
-    metrics_tags["event_has_user"] = "true"
-
     ip_address = user_data.get("ip_address")
 
     if ip_address:
@@ -928,8 +1047,26 @@ def _get_event_user_impl(project, data, metrics_tags):
     if not euser.hash:
         return
 
-    cache_key = f"euserid:1:{project.id}:{euser.hash}"
-    euser_id = cache.get(cache_key)
+    return euser
+
+
+def _get_event_user_impl(project, data, metrics_tags, known_euser_ids=None):
+    user_data = data.get("user")
+    if not user_data:
+        metrics_tags["event_has_user"] = "false"
+        return
+
+    metrics_tags["event_has_user"] = "true"
+
+    euser = _build_event_user(project, data)
+    if euser is None:
+        return
+
+    cache_key = _get_event_user_cache_key(euser)
+    if known_euser_ids is not None and cache_key in known_euser_ids:
+        euser_id = known_euser_ids[cache_key]
+    else:
+        euser_id = cache.get(cache_key)
     if euser_id is None:
         metrics_tags["cache_hit"] = "false"
         try:
@@ -949,6 +1086,10 @@ def _get_event_user_impl(project, data, metrics_tags):
                     euser.update(name=user_data["name"])
                 e_userid = euser.id
             cache.set(cache_key, e_userid, 3600)
+
+        if known_euser_ids is not None:
+            # Later events of the same batch can skip the database entirely.
+            known_euser_ids[cache_key] = euser.id
     else:
         metrics_tags["cache_hit"] = "true"
 
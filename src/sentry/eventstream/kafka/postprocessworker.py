@@ -1,15 +1,16 @@
 import logging
 import random
+from collections import defaultdict
 from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from contextlib import contextmanager
-from typing import Any, Generator, Mapping, Optional, Sequence
+from typing import Any, Generator, List, Mapping, MutableMapping, Optional, Sequence
 
 from sentry import options
 from sentry.eventstream.kafka.protocol import (
     get_task_kwargs_for_message,
     get_task_kwargs_for_message_from_headers,
 )
-from sentry.tasks.post_process import post_process_group
+from sentry.tasks.post_process import post_process_group, post_process_group_batch
 from sentry.utils import metrics
 from sentry.utils.batching_kafka_consumer import AbstractBatchWorker
 from sentry.utils.cache import cache_key_for_event
@@ -21,6 +22,7 @@ _DURATION_METRIC = "eventstream.duration"
 _CONCURRENCY_METRIC = "eventstream.concurrency"
 _MESSAGES_METRIC = "eventstream.messages"
 _CONCURRENCY_OPTION = "post-process-forwarder:concurrency"
+_BATCH_TASKS_OPTION = "post-process-forwarder:batch-tasks"
 
 
 @contextmanager
@@ -82,6 +84,35 @@ def dispatch_post_process_group_task(
         )
 
 
+def dispatch_post_process_group_batch(batch: Sequence[Mapping[str, Any]]) -> None:
+    """
+    Dispatches one ``post_process_group_batch`` task per project for the task
+    kwargs of a batch of messages, preserving the order of the messages.
+    """
+    events_by_project: MutableMapping[int, List[Mapping[str, Any]]] = defaultdict(list)
+    for task_kwargs in batch:
+        if task_kwargs.get("skip_consume"):
+            logger.info("post_process.skip.raw_event", extra={"event_id": task_kwargs["event_id"]})
+            continue
+
+        project_id = task_kwargs["project_id"]
+        events_by_project[project_id].append(
+            {
+                "is_new": task_kwargs["is_new"],
+                "is_regression": task_kwargs["is_regression"],
+                "is_new_group_environment": task_kwargs["is_new_group_environment"],
+                "primary_hash": task_kwargs["primary_hash"],
+                "cache_key": cache_key_for_event(
+                    {"project": project_id, "event_id": task_kwargs["event_id"]}
+                ),
+                "group_id": task_kwargs["group_id"],
+            }
+        )
+
+    for project_id, events in events_by_project.items():
+        post_process_group_batch.delay(project_id=project_id, events=events)
+
+
 def _get_task_kwargs_and_dispatch(message: Message):
     task_kwargs = _get_task_kwargs(message)
     if not task_kwargs:
@@ -91,6 +122,15 @@ def _get_task_kwargs_and_dispatch(message: Message):
     dispatch_post_process_group_task(**task_kwargs)
 
 
+def _get_task_kwargs_for_batch(message: Message) -> Optional[Mapping[str, Any]]:
+    task_kwargs = _get_task_kwargs(message)
+    if not task_kwargs:
+        return None
+
+    _record_metrics(message.partition(), task_kwargs)
+    return task_kwargs
+
+
 class PostProcessForwarderWorker(AbstractBatchWorker):
     """
     Implementation of the AbstractBatchWorker which would be used for post process forwarder.
@@ -112,6 +152,9 @@ class PostProcessForwarderWorker(AbstractBatchWorker):
         is stored in the batch of batching_kafka_consumer and provided as an argument to flush_batch. If None is
         returned, the batching_kafka_consumer will not add the return value to the batch.
         """
+        if options.get(_BATCH_TASKS_OPTION):
+            # The task kwargs are dispatched together in flush_batch.
+            return self.__executor.submit(_get_task_kwargs_for_batch, message)
         return self.__executor.submit(_get_task_kwargs_and_dispatch, message)
 
     def flush_batch(self, batch: Sequence[Future]) -> None:
@@ -126,6 +169,12 @@ class PostProcessForwarderWorker(AbstractBatchWorker):
                 if exc is not None:
                     raise exc
 
+            # Only futures of batched messages have results.
+            batched = [future.result() for future in batch]
+            batched = [task_kwargs for task_kwargs in batched if task_kwargs]
+            if batched:
+                dispatch_post_process_group_batch(batched)
+
         # Check if the concurrency settings have changed. If yes, then shutdown the existing executor
         # and create a new one with the new settings
         new_concurrency = options.get(_CONCURRENCY_OPTION)
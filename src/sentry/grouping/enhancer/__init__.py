@@ -19,6 +19,7 @@ from .matchers import (
     FrameMatch,
     Match,
     create_match_frame,
+    get_index_values,
 )
 
 # Grammar is defined in EBNF syntax.
@@ -70,6 +71,11 @@ _        = space*
 VERSIONS = [1, 2]
 LATEST_VERSION = VERSIONS[-1]
 
+# Maps the cache keys of enhancements to their rule indexes, see
+# ``Enhancements._get_rule_index``.
+_rule_index_cache = {}
+_RULE_INDEX_CACHE_SIZE = 1000
+
 
 class StacktraceState:
     def __init__(self):
@@ -96,6 +102,54 @@ class StacktraceState:
         return f"{hint} by stack trace rule ({description})"
 
 
+class RuleIndex:
+    """Indexes rules by literal prefixes of their frame matchers, so that
+    for every rule only the frames that it can possibly match have to be
+    checked by its matchers.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self._unindexed = []
+        # Maps field -> (prefix -> [rule position], sorted prefix lengths)
+        self._index = {}
+
+        for position, rule in enumerate(rules):
+            keys = rule.index_keys
+            if keys is None:
+                self._unindexed.append(position)
+                continue
+
+            for field, prefix in keys:
+                prefixes, _ = self._index.setdefault(field, ({}, []))
+                prefixes.setdefault(prefix, []).append(position)
+
+        for field, (prefixes, _) in self._index.items():
+            self._index[field] = (prefixes, sorted({len(prefix) for prefix in prefixes}))
+
+    def get_frame_indices(self, match_frames):
+        """Returns the indices of the frames that each rule can match."""
+        rv = [[] for _ in self.rules]
+
+        for idx, match_frame in enumerate(match_frames):
+            positions = set()
+            for field, (prefixes, lengths) in self._index.items():
+                for value in get_index_values(match_frame, field):
+                    for length in lengths:
+                        if length > len(value):
+                            break
+                        positions.update(prefixes.get(value[:length], ()))
+
+            for position in positions:
+                rv[position].append(idx)
+
+        all_indices = range(len(match_frames))
+        for position in self._unindexed:
+            rv[position] = all_indices
+
+        return rv
+
+
 class Enhancements:
 
     # NOTE: You must add a version to ``VERSIONS`` any time attributes are added
@@ -116,6 +170,33 @@ class Enhancements:
         self._modifier_rules = [rule for rule in self.iter_rules() if rule.is_modifier]
         self._updater_rules = [rule for rule in self.iter_rules() if rule.is_updater]
 
+        # Rule indexes are shared between all instances with the same cache
+        # key, which is the id of built-in enhancements and the serialized
+        # config of loaded ones.
+        self._cache_key = id
+        self._rule_indexes = {}
+
+    def _get_rule_index(self, kind):
+        rule_index = self._rule_indexes.get(kind)
+        if rule_index is not None:
+            return rule_index
+
+        cache_key = None
+        if self._cache_key is not None:
+            cache_key = (self._cache_key, kind)
+            rule_index = _rule_index_cache.get(cache_key)
+
+        if rule_index is None:
+            rules = self._modifier_rules if kind == "modifier" else self._updater_rules
+            rule_index = RuleIndex(rules)
+            if cache_key is not None:
+                if len(_rule_index_cache) >= _RULE_INDEX_CACHE_SIZE:
+                    _rule_index_cache.clear()
+                _rule_index_cache[cache_key] = rule_index
+
+        self._rule_indexes[kind] = rule_index
+        return rule_index
+
     def apply_modifications_to_frame(self, frames, platform, exception_data):
         """This applies the frame modifications to the frames itself.  This
         does not affect grouping.
@@ -124,10 +205,14 @@ class Enhancements:
         cache = {}
 
         match_frames = [create_match_frame(frame, platform) for frame in frames]
+        frame_indices = self._get_rule_index("modifier").get_frame_indices(match_frames)
+
+        for rule, indices in zip(self._modifier_rules, frame_indices):
+            if not indices:
+                continue
 
-        for rule in self._modifier_rules:
             for idx, action in rule.get_matching_frame_actions(
-                match_frames, platform, exception_data, cache
+                match_frames, platform, exception_data, cache, frame_indices=indices
             ):
                 action.apply_modifications_to_frame(frames, match_frames, idx, rule=rule)
 
@@ -136,13 +221,16 @@ class Enhancements:
         cache = {}
 
         match_frames = [create_match_frame(frame, platform) for frame in frames]
+        frame_indices = self._get_rule_index("updater").get_frame_indices(match_frames)
 
         stacktrace_state = StacktraceState()
         # Apply direct frame actions and update the stack state alongside
-        for rule in self._updater_rules:
+        for rule, indices in zip(self._updater_rules, frame_indices):
+            if not indices:
+                continue
 
             for idx, action in rule.get_matching_frame_actions(
-                match_frames, platform, exception_data, cache
+                match_frames, platform, exception_data, cache, frame_indices=indices
             ):
                 action.update_frame_components_contributions(components, frames, idx, rule=rule)
                 action.modify_stacktrace_state(stacktrace_state, rule)
@@ -253,12 +341,15 @@ class Enhancements:
             data = data.encode("ascii", "ignore")
         padded = data + b"=" * (4 - (len(data) % 4))
         try:
-            return cls._from_config_structure(
+            rv = cls._from_config_structure(
                 msgpack.loads(zlib.decompress(base64.urlsafe_b64decode(padded)), raw=False)
             )
         except (LookupError, AttributeError, TypeError, ValueError) as e:
             raise ValueError("invalid stack trace rule config: %s" % e)
 
+        rv._cache_key = data
+        return rv
+
     @classmethod
     def from_config_string(self, s, bases=None, id=None):
         try:
@@ -289,6 +380,26 @@ class Rule:
         self._is_updater = any(action.is_updater for action in actions)
         self._is_modifier = any(action.is_modifier for action in actions)
 
+        # Index by the matcher with the longest literal prefix, a frame has to
+        # match all matchers anyway. Families only partition frames coarsely,
+        # so they are used as a last resort.
+        self._index_keys = None
+        best_score = -1
+        for matcher in self._other_matchers:
+            keys = matcher.get_index_keys()
+            if keys is None:
+                continue
+
+            score = min(0 if field == "family" else len(prefix) for field, prefix in keys)
+            if score > best_score:
+                self._index_keys = keys
+                best_score = score
+
+    @property
+    def index_keys(self):
+        """See `Match.get_index_keys`."""
+        return self._index_keys
+
     @property
     def matcher_description(self):
         rv = " ".join(x.description for x in self.matchers)
@@ -312,9 +423,13 @@ class Rule:
             matchers[matcher.key] = matcher.pattern
         return {"match": matchers, "actions": [str(x) for x in self.actions]}
 
-    def get_matching_frame_actions(self, frames, platform, exception_data=None, cache=None):
+    def get_matching_frame_actions(
+        self, frames, platform, exception_data=None, cache=None, frame_indices=None
+    ):
         """Given a frame returns all the matching actions based on this rule.
         If the rule does not match `None` is returned.
+
+        If given, only the frames at ``frame_indices`` are considered.
         """
         if not self.matchers:
             return []
@@ -326,8 +441,11 @@ class Rule:
 
         rv = []
 
+        if frame_indices is None:
+            frame_indices = range(len(frames))
+
         # 2 - Check if frame matchers match
-        for idx, frame in enumerate(frames):
+        for idx in frame_indices:
             if all(
                 m.matches_frame(frames, idx, platform, exception_data, cache)
                 for m in self._other_matchers
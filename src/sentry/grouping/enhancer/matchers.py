@@ -1,3 +1,4 @@
+import re
 from typing import Optional
 
 from sentry.grouping.utils import get_rule_bool
@@ -25,6 +26,9 @@ SHORT_MATCH_KEYS = {v: k for k, v in MATCH_KEYS.items()}
 
 assert len(SHORT_MATCH_KEYS) == len(MATCH_KEYS)  # assert short key names are not reused
 
+# Characters that can start a non-literal part of a glob pattern
+_GLOB_SPECIAL_CHARS_RE = re.compile(rb"[*?\[\]{}\\!]")
+
 FAMILIES = {"native": "N", "javascript": "J", "all": "a"}
 REVERSE_FAMILIES = {v: k for k, v in FAMILIES.items()}
 
@@ -81,12 +85,43 @@ def create_match_frame(frame_data: dict, platform: Optional[str]) -> dict:
     return match_frame
 
 
+def get_literal_prefix(pattern):
+    """Returns the part of a glob pattern before its first wildcard."""
+    match = _GLOB_SPECIAL_CHARS_RE.search(pattern)
+    if match is None:
+        return pattern
+    return pattern[: match.start()]
+
+
+def get_index_values(match_frame, field):
+    """Returns the values of a match frame that the keys returned by
+    `Match.get_index_keys` are looked up with."""
+    value = match_frame.get(field)
+    if value is None:
+        return ()
+
+    if field in ("package", "path"):
+        # See `path_like_match`
+        value = value.replace(b"\\", b"/")
+        if not value.startswith(b"/"):
+            return (value, b"/" + value)
+
+    return (value,)
+
+
 class Match:
     description = None
 
     def matches_frame(self, frames, idx, platform, exception_data, cache):
         raise NotImplementedError()
 
+    def get_index_keys(self):
+        """Returns a list of ``(field, prefix)`` tuples. A frame can only be
+        matched if one of its index values for ``field`` starts with the
+        corresponding prefix. `None` means that any frame can be matched.
+        """
+        return None
+
     def _to_config_structure(self, version):
         raise NotImplementedError()
 
@@ -174,6 +209,16 @@ class FrameMatch(Match):
         # Implement is subclasses
         raise NotImplementedError
 
+    def _get_prefix_index_keys(self):
+        if self.negated:
+            return None
+
+        prefix = get_literal_prefix(self._encoded_pattern)
+        if not prefix:
+            return None
+
+        return [(self.field, prefix)]
+
     def _to_config_structure(self, version):
         if self.key == "family":
             arg = "".join(_f for _f in [FAMILIES.get(x) for x in self.pattern.split(",")] if _f)
@@ -207,6 +252,9 @@ class PathLikeMatch(FrameMatch):
 
         return cached(cache, path_like_match, self._encoded_pattern, value)
 
+    def get_index_keys(self):
+        return self._get_prefix_index_keys()
+
 
 class PackageMatch(PathLikeMatch):
 
@@ -229,6 +277,12 @@ class FamilyMatch(FrameMatch):
 
         return match_frame["family"] in self._flags
 
+    def get_index_keys(self):
+        if self.negated or b"all" in self._flags:
+            return None
+
+        return [("family", flag) for flag in self._flags]
+
 
 class InAppMatch(FrameMatch):
     def __init__(self, *args, **kwargs):
@@ -241,10 +295,16 @@ class InAppMatch(FrameMatch):
 
 
 class FunctionMatch(FrameMatch):
+
+    field = "function"
+
     def _positive_frame_match(self, match_frame, platform, exception_data, cache):
 
         return cached(cache, glob_match, match_frame["function"], self._encoded_pattern)
 
+    def get_index_keys(self):
+        return self._get_prefix_index_keys()
+
 
 class FrameFieldMatch(FrameMatch):
     def _positive_frame_match(self, match_frame, platform, exception_data, cache):
@@ -254,6 +314,9 @@ class FrameFieldMatch(FrameMatch):
 
         return cached(cache, glob_match, field, self._encoded_pattern)
 
+    def get_index_keys(self):
+        return self._get_prefix_index_keys()
+
 
 class ModuleMatch(FrameFieldMatch):
 
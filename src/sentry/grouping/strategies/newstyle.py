@@ -1,5 +1,7 @@
 import re
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
 
 from sentry.eventstore.models import Event
 from sentry.grouping.component import GroupingComponent, calculate_tree_label
@@ -61,6 +63,46 @@ RECURSION_COMPARISON_FIELDS = [
 # TODO(markus)
 StacktraceEncoderReturnValue = Any
 
+# The number of frame components that are kept around per process, see
+# `FrameComponentCache`.
+FRAME_COMPONENT_CACHE_SIZE = 10000
+
+
+class FrameComponentCache:
+    """
+    Caches the components of frames across events. The same frames recur in
+    most events of a project, and their components only depend on the
+    grouping config and the contents of the frame.
+
+    Enhancements are applied to the components afterwards, so they are not
+    part of the cache key.
+    """
+
+    def __init__(self, max_size: int = FRAME_COMPONENT_CACHE_SIZE):
+        self.max_size = max_size
+        self._items: "OrderedDict[Tuple[Any, ...], GroupingComponent]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Tuple[Any, ...]) -> Optional[GroupingComponent]:
+        with self._lock:
+            component = self._items.get(key)
+            if component is not None:
+                self._items.move_to_end(key)
+        return component
+
+    def set(self, key: Tuple[Any, ...], component: GroupingComponent) -> None:
+        with self._lock:
+            self._items[key] = component
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+frame_component_cache = FrameComponentCache()
+
 
 def is_recursion_v1(frame1: Frame, frame2: Frame) -> bool:
     """
@@ -299,7 +341,39 @@ def frame(
 ) -> ReturnedVariants:
     frame = interface
     platform = frame.platform or event.platform
+    sourcemap_used = bool(frame.data and frame.data.get("sourcemap") is not None)
+
+    # Everything but the variant and the recursion flag in the context is
+    # determined by the grouping config.
+    cache_key = (
+        context.config.id,
+        context["is_recursion"],
+        platform,
+        frame.abs_path,
+        frame.filename,
+        frame.module,
+        frame.function,
+        frame.raw_function,
+        frame.context_line,
+        frame.package,
+        sourcemap_used,
+    )
+    rv = frame_component_cache.get(cache_key)
+    if rv is None:
+        rv = _get_frame_component(frame, platform, sourcemap_used, context)
+        frame_component_cache.set(cache_key, rv)
+
+    # Callers update the components, the cached ones must stay untouched
+    rv = rv.deep_copy()
+    if rv.contributes and rv.tree_label:
+        rv.tree_label["datapath"] = frame.datapath
+
+    return {context["variant"]: rv}
+
 
+def _get_frame_component(
+    frame: Frame, platform: Optional[str], sourcemap_used: bool, context: GroupingContext
+) -> GroupingComponent:
     # Safari throws [native code] frames in for calls like ``forEach``
     # whereas Chrome ignores these. Let's remove it from the hashing algo
     # so that they're more likely to group together
@@ -333,7 +407,7 @@ def frame(
         function=frame.function,
         raw_function=frame.raw_function,
         platform=platform,
-        sourcemap_used=frame.data and frame.data.get("sourcemap") is not None,
+        sourcemap_used=sourcemap_used,
         context_line_available=context_line_available,
     )
 
@@ -421,14 +495,15 @@ def frame(
                 tree_label.update(value.tree_label)
 
         if tree_label and context["hierarchical_grouping"]:
-            tree_label["datapath"] = frame.datapath
+            # The datapath is added by the caller, as it differs between
+            # events.
             rv.tree_label = tree_label
         else:
             # The frame contributes (somehow) but we have nothing meaningful to
             # show.
             rv.tree_label = None
 
-    return {context["variant"]: rv}
+    return rv
 
 
 def get_contextline_component(
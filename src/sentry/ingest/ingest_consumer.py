@@ -2,6 +2,7 @@ import functools
 import logging
 import random
 import time
+from collections import defaultdict
 from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from typing import (
     Any,
@@ -31,10 +32,11 @@ from sentry.ingest.userreport import Conflict, save_userreport
 from sentry.killswitches import killswitch_matches_context
 from sentry.models import Project
 from sentry.signals import event_accepted
-from sentry.tasks.store import preprocess_event
+from sentry.tasks.store import preprocess_event, save_event_batch, should_process
 from sentry.utils import json, metrics
 from sentry.utils.batching_kafka_consumer import AbstractBatchWorker
 from sentry.utils.cache import cache_key_for_event
+from sentry.utils.canonical import CanonicalKeyDict
 from sentry.utils.dates import to_datetime
 from sentry.utils.kafka import create_batching_kafka_consumer
 from sentry.utils.sdk import mark_scope_as_unsafe
@@ -56,15 +58,33 @@ class AsyncResult(NamedTuple):  # TODO: Use Generic[T] with 3.7+
 Message = Any
 
 
+class LoadedEvent(NamedTuple):
+    data: Any
+    has_attachments: bool
+    # Resumes processing once the event has been put into the processing store.
+    dispatch: Callable[[str], None]
+    # Finishes bookkeeping for events that have been saved without dispatching.
+    mark_accepted: Callable[[], None]
+
+
 class IngestConsumerWorker(AbstractBatchWorker):
-    def __init__(self, process_event_executor: Optional[ThreadPoolExecutor] = None) -> None:
+    def __init__(
+        self,
+        process_event_executor: Optional[ThreadPoolExecutor] = None,
+        save_events_in_batch: bool = False,
+    ) -> None:
         self.__process_event_executor = process_event_executor
         if self.__process_event_executor is None:
             self.__process_event = process_event
+            self.__dispatch_event = dispatch_event
         else:
             self.__process_event = functools.partial(
                 process_event_async, self.__process_event_executor
             )
+            self.__dispatch_event = functools.partial(
+                dispatch_event_async, self.__process_event_executor
+            )
+        self.__save_events_in_batch = save_events_in_batch
 
     def process_message(self, message) -> Message:
         message = msgpack.unpackb(message.value(), use_list=False)
@@ -94,6 +114,10 @@ class IngestConsumerWorker(AbstractBatchWorker):
             ]
         ] = []
 
+        # Only populated if events are saved in batches, otherwise events are
+        # processed individually along with all other messages.
+        event_messages = []
+
         projects_to_fetch = set()
 
         with metrics.timer("ingest_consumer.prepare_messages"):
@@ -102,7 +126,10 @@ class IngestConsumerWorker(AbstractBatchWorker):
                 projects_to_fetch.add(message["project_id"])
 
                 if message_type == "event":
-                    other_messages.append((self.__process_event, message))
+                    if self.__save_events_in_batch:
+                        event_messages.append(message)
+                    else:
+                        other_messages.append((self.__process_event, message))
                 elif message_type == "attachment_chunk":
                     attachment_chunks.append(message)
                 elif message_type == "attachment":
@@ -124,6 +151,13 @@ class IngestConsumerWorker(AbstractBatchWorker):
                 for attachment_chunk in attachment_chunks:
                     process_attachment_chunk(attachment_chunk, projects=projects)
 
+        if event_messages:
+            with metrics.timer("ingest_consumer.process_event_batch"):
+                # Events which cannot be saved right away still need to go
+                # through the regular pipeline.
+                for loaded_event in process_event_batch(event_messages, projects):
+                    other_messages.append((self.__dispatch_event, loaded_event))
+
         if other_messages:
             with metrics.timer("ingest_consumer.process_other_messages_batch"):
                 other_messages_flush_start = time.monotonic()
@@ -170,17 +204,14 @@ def trace_func(**span_kwargs):
 
 @metrics.wraps("ingest_consumer.process_event")
 def _do_process_event(message: Message, projects: Mapping[int, Project]) -> None:
-    result = _load_event(message, projects)
-    if result is None:
+    loaded_event = _load_event(message, projects)
+    if loaded_event is None:
         return
 
-    data, callback = result
-    callback(_store_event(data))
+    loaded_event.dispatch(_store_event(loaded_event.data))
 
 
-def _load_event(
-    message: Message, projects: Mapping[int, Project]
-) -> Optional[Tuple[Any, Callable[[str], None]]]:
+def _load_event(message: Message, projects: Mapping[int, Project]) -> Optional[LoadedEvent]:
     """
     Perform some initial filtering and deserialize the message payload. If the
     event should be stored, the deserialized payload is returned along with a
@@ -291,13 +322,21 @@ def _load_event(
                 project=project,
             )
 
+        mark_accepted()
+
+    def mark_accepted() -> None:
         # remember for an 1 hour that we saved this event (deduplication protection)
         cache.set(deduplication_key, "", CACHE_TIMEOUT)
 
         # emit event_accepted once everything is done
         event_accepted.send_robust(ip=remote_addr, data=data, project=project, sender=process_event)
 
-    return data, dispatch_task
+    return LoadedEvent(
+        data=data,
+        has_attachments=bool(attachments),
+        dispatch=dispatch_task,
+        mark_accepted=mark_accepted,
+    )
 
 
 def _store_event(data) -> str:
@@ -312,17 +351,101 @@ def process_event(message: Message, projects: Mapping[int, Project]) -> None:
 def process_event_async(
     executor: ThreadPoolExecutor, message: Message, projects: Mapping[int, Project]
 ) -> Optional["AsyncResult[str]"]:
-    result = _load_event(message, projects)
-    if result is None:
+    loaded_event = _load_event(message, projects)
+    if loaded_event is None:
         return None
 
-    data, callback = result
+    return dispatch_event_async(executor, loaded_event, projects)
+
+
+def dispatch_event(loaded_event: LoadedEvent, projects: Mapping[int, Project]) -> None:
+    loaded_event.dispatch(_store_event(loaded_event.data))
+
+
+def dispatch_event_async(
+    executor: ThreadPoolExecutor, loaded_event: LoadedEvent, projects: Mapping[int, Project]
+) -> "AsyncResult[str]":
     return AsyncResult(
-        executor.submit(_store_event, data),
-        lambda future: callback(future.result()),
+        executor.submit(_store_event, loaded_event.data),
+        lambda future: loaded_event.dispatch(future.result()),
     )
 
 
+def _can_save_in_batch(loaded_event: LoadedEvent) -> bool:
+    """
+    Whether an event can be saved straight from the consumer, skipping
+    preprocessing. This is only the case for error events that need neither
+    symbolication nor stacktrace processing, and that do not have attachments
+    which first have to be put into the attachment cache.
+    """
+    from sentry.lang.native.processing import should_process_with_symbolicator
+
+    data = CanonicalKeyDict(loaded_event.data)
+    if loaded_event.has_attachments or data.get("type") == "transaction":
+        return False
+
+    return not should_process_with_symbolicator(data) and not should_process(data)
+
+
+@trace_func(name="ingest_consumer.process_event_batch")
+@metrics.wraps("ingest_consumer.process_event_batch")
+def process_event_batch(
+    messages: Sequence[Message], projects: Mapping[int, Project]
+) -> Sequence[LoadedEvent]:
+    """
+    Saves all events of a batch that are ready to be saved together, see
+    ``save_event_batch``. All other events are returned and still need to be
+    dispatched to preprocessing.
+
+    Events are saved in one chunk per project. If saving a chunk fails, all
+    of its events that saving has not started for are returned as well, so
+    that they are retried through ``preprocess_event`` and ``save_event``.
+    Events that may have been written in part are never saved a second time.
+    """
+    to_save = defaultdict(list)
+    to_dispatch = []
+
+    for message in messages:
+        loaded_event = _load_event(message, projects)
+        if loaded_event is None:
+            continue
+
+        if _can_save_in_batch(loaded_event):
+            to_save[loaded_event.data["project"]].append(
+                (loaded_event, float(message["start_time"]))
+            )
+        else:
+            to_dispatch.append(loaded_event)
+
+    for chunk in to_save.values():
+        started = set()
+
+        def on_saving(index: int) -> None:
+            # Remember every event as soon as saving it starts, so that a
+            # failure later in the chunk does not cause it to be saved again.
+            started.add(index)
+            chunk[index][0].mark_accepted()
+
+        try:
+            save_event_batch(
+                [(loaded_event.data, start_time) for loaded_event, start_time in chunk],
+                projects,
+                on_saving=on_saving,
+            )
+        except Exception:
+            logger.exception("Failed to save event batch, falling back to preprocessing")
+            to_dispatch.extend(
+                loaded_event
+                for index, (loaded_event, _) in enumerate(chunk)
+                if index not in started
+            )
+            metrics.incr("ingest_consumer.process_event_batch.failed", amount=len(started))
+        else:
+            metrics.incr("ingest_consumer.process_event_batch.saved", amount=len(started))
+
+    return to_dispatch
+
+
 @trace_func(name="ingest_consumer.process_attachment_chunk")
 @metrics.wraps("ingest_consumer.process_attachment_chunk")
 def process_attachment_chunk(message, projects):
@@ -411,7 +534,11 @@ def process_userreport(message, projects) -> None:
 
 
 def get_ingest_consumer(
-    consumer_types, once=False, executor: Optional[ThreadPoolExecutor] = None, **options
+    consumer_types,
+    once=False,
+    executor: Optional[ThreadPoolExecutor] = None,
+    save_events_in_batch: bool = False,
+    **options,
 ):
     """
     Handles events coming via a kafka queue.
@@ -420,5 +547,7 @@ def get_ingest_consumer(
     """
     topic_names = {ConsumerType.get_topic_name(consumer_type) for consumer_type in consumer_types}
     return create_batching_kafka_consumer(
-        topic_names=topic_names, worker=IngestConsumerWorker(executor), **options
+        topic_names=topic_names,
+        worker=IngestConsumerWorker(executor, save_events_in_batch=save_events_in_batch),
+        **options,
     )
@@ -1,8 +1,13 @@
+import threading
+from collections import OrderedDict
+
 from symbolic import SourceView
 
+from sentry import options
+from sentry.utils import metrics
 from sentry.utils.strings import codec_lookup
 
-__all__ = ["SourceCache", "SourceMapCache"]
+__all__ = ["SourceCache", "SourceMapCache", "ViewCache", "view_cache"]
 
 
 def is_utf8(codec):
@@ -10,6 +15,23 @@ def is_utf8(codec):
     return name in ("utf-8", "ascii")
 
 
+def make_source_view(source, encoding=None):
+    if isinstance(source, SourceView):
+        return source
+
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+    # If an encoding is provided and it's not utf-8 compatible
+    # we try to re-encoding the source and create a source view
+    # from it.
+    elif encoding is not None and not is_utf8(encoding):
+        try:
+            source = source.decode(encoding).encode("utf-8")
+        except UnicodeError:
+            pass
+    return SourceView.from_bytes(source)
+
+
 class SourceCache:
     def __init__(self):
         self._cache = {}
@@ -38,20 +60,7 @@ class SourceCache:
 
     def add(self, url, source, encoding=None):
         url = self._get_canonical_url(url)
-
-        if not isinstance(source, SourceView):
-            if isinstance(source, str):
-                source = source.encode("utf-8")
-            # If an encoding is provided and it's not utf-8 compatible
-            # we try to re-encoding the source and create a source view
-            # from it.
-            elif encoding is not None and not is_utf8(encoding):
-                try:
-                    source = source.decode(encoding).encode("utf-8")
-                except UnicodeError:
-                    pass
-            source = SourceView.from_bytes(source)
-        self._cache[url] = source
+        self._cache[url] = make_source_view(source, encoding)
 
     def add_error(self, url, error):
         url = self._get_canonical_url(url)
@@ -90,3 +99,61 @@ class SourceMapCache:
             sourcemap = self.get(sourcemap_url)
             return (sourcemap_url, sourcemap)
         return (None, None)
+
+
+class ViewCache:
+    """
+    Stores parsed source views and source map views across events, so that
+    a worker process parses every file only once.
+
+    Keys must include a checksum of the file contents, which means entries
+    never become stale. The cache holds views of files with a total size of
+    up to the ``sourcemaps.view-cache-size`` option and evicts the least
+    recently used views first.
+    """
+
+    def __init__(self):
+        self._cache = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get_or_create(self, key, size, create, kind):
+        """
+        Returns the view cached for ``key`` or creates it by calling
+        ``create``. ``size`` is the size of the file the view is parsed from.
+        """
+        key = (kind, key)
+        max_size = options.get("sourcemaps.view-cache-size")
+        if size > max_size:
+            return create()
+
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+
+        if entry is not None:
+            metrics.incr("sourcemaps.view_cache.hit", tags={"type": kind}, skip_internal=True)
+            return entry[0]
+
+        metrics.incr("sourcemaps.view_cache.miss", tags={"type": kind}, skip_internal=True)
+        view = create()
+
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = (view, size)
+                self._size += size
+
+            while self._size > max_size:
+                _, (_, evicted_size) = self._cache.popitem(last=False)
+                self._size -= evicted_size
+
+        return view
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._size = 0
+
+
+view_cache = ViewCache()
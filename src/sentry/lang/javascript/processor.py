@@ -1,5 +1,6 @@
 import base64
 import errno
+import hashlib
 import logging
 import re
 import sys
@@ -8,7 +9,7 @@ import zlib
 from datetime import datetime
 from io import BytesIO
 from os.path import splitext
-from typing import IO, Optional, Tuple
+from typing import IO, Optional, Tuple, Union
 from urllib.parse import urlsplit
 
 import sentry_sdk
@@ -21,7 +22,12 @@ from symbolic import SourceMapView
 from sentry import http, options
 from sentry.interfaces.stacktrace import Stacktrace
 from sentry.models import EventError, Organization, ReleaseFile
-from sentry.models.releasefile import ARTIFACT_INDEX_FILENAME, ReleaseArchive, read_artifact_index
+from sentry.models.releasefile import (
+    ARTIFACT_INDEX_FILENAME,
+    IndexedReleaseArchive,
+    ReleaseArchive,
+    read_artifact_index,
+)
 from sentry.stacktraces.processing import StacktraceProcessor
 from sentry.utils import json, metrics
 
@@ -36,7 +42,7 @@ from sentry.utils.retries import ConditionalRetryPolicy, exponential_delay
 from sentry.utils.safe import get_path
 from sentry.utils.urls import non_standard_url_join
 
-from .cache import SourceCache, SourceMapCache
+from .cache import SourceCache, SourceMapCache, make_source_view, view_cache
 
 __all__ = ["JavaScriptStacktraceProcessor"]
 
@@ -383,7 +389,9 @@ def fetch_release_file(filename, release, dist=None):
 
 
 @metrics.wraps("sourcemaps.get_from_archive")
-def get_from_archive(url: str, archive: ReleaseArchive) -> Tuple[bytes, dict]:
+def get_from_archive(
+    url: str, archive: Union[ReleaseArchive, IndexedReleaseArchive]
+) -> Tuple[bytes, dict]:
     candidates = ReleaseFile.normalize(url)
     for candidate in candidates:
         try:
@@ -432,13 +440,16 @@ def get_index_entry(release, dist, url) -> Optional[dict]:
 
 
 @metrics.wraps("sourcemaps.fetch_release_archive")
-def fetch_release_archive_for_url(release, dist, url) -> Optional[IO]:
+def fetch_release_archive_for_url(release, dist, url) -> Optional[Union[IO, IndexedReleaseArchive]]:
     """Fetch release archive and cache if possible.
 
     Multiple archives might have been uploaded, so we need the URL
     to get the correct archive from the artifact index.
 
-    If return value is not empty, the caller is responsible for closing the stream.
+    Archives that are large enough for the disk cache are returned as
+    ``IndexedReleaseArchive``, all others as a stream.
+
+    If return value is not empty, the caller is responsible for closing it.
     """
     with sentry_sdk.start_span(op="fetch_release_archive_for_url.get_index_entry"):
         info = get_index_entry(release, dist, url)
@@ -474,9 +485,25 @@ def fetch_release_archive_for_url(release, dist, url) -> Optional[IO]:
             cache.set(cache_key, -1, 60)
             return None
         else:
+            file_size = releasefile.file.size
+            if (
+                options.get("releasefile.cache-limit")
+                <= file_size
+                <= options.get("releasefile.cache-max-archive-size")
+            ):
+                # Large archives are stored on disk once and memory mapped, so
+                # they do not have to be read in full for every artifact.
+                try:
+                    with sentry_sdk.start_span(op="fetch_release_archive_for_url.get_archive"):
+                        return fetch_retry_policy(lambda: ReleaseFile.cache.getarchive(releasefile))
+                except Exception:
+                    logger.error("sourcemaps.read_archive_failed", exc_info=sys.exc_info())
+
+                    return None
+
             try:
                 with sentry_sdk.start_span(op="fetch_release_archive_for_url.fetch_releasefile"):
-                    if releasefile.file.size <= options.get("releasefile.cache-max-archive-size"):
+                    if file_size <= options.get("releasefile.cache-max-archive-size"):
                         getfile = lambda: ReleaseFile.cache.getfile(releasefile)
                     else:
                         # For very large ZIP archives, pulling the entire file into cache takes too long.
@@ -532,8 +559,11 @@ def fetch_release_artifact(url, release, dist):
         return result_from_cache(url, result)
 
     start = time.monotonic()
+    archive = None
     archive_file = fetch_release_archive_for_url(release, dist, url)
-    if archive_file is not None:
+    if isinstance(archive_file, IndexedReleaseArchive):
+        archive = archive_file
+    elif archive_file is not None:
         try:
             archive = ReleaseArchive(archive_file)
         except Exception as exc:
@@ -545,39 +575,36 @@ def fetch_release_artifact(url, release, dist):
                 extra={"contents": archive_file.read(256)},
             )
             # TODO(jjbayer): cache error and return here
-        else:
-            with archive:
-                try:
-                    fp, headers = get_from_archive(url, archive)
-                except KeyError:
-                    # The manifest mapped the url to an archive, but the file
-                    # is not there.
-                    logger.error(
-                        "Release artifact %r not found in archive %s", url, archive_file.id
-                    )
-                    cache.set(cache_key, -1, 60)
-                    metrics.timing(
-                        "sourcemaps.release_artifact_from_archive", time.monotonic() - start
-                    )
-                    return None
-                except Exception as exc:
-                    logger.error("Failed to read %s from release %s", url, release.id, exc_info=exc)
-                    # TODO(jjbayer): cache error and return here
-                else:
-                    result = fetch_and_cache_artifact(
-                        url,
-                        lambda: fp,
-                        cache_key,
-                        cache_key_meta,
-                        headers,
-                        # Cannot use `compress_file` because `ZipExtFile` does not support chunks
-                        compress_fn=compress,
-                    )
-                    metrics.timing(
-                        "sourcemaps.release_artifact_from_archive", time.monotonic() - start
-                    )
 
-                    return result
+    if archive is not None:
+        with archive:
+            try:
+                fp, headers = get_from_archive(url, archive)
+            except KeyError:
+                # The manifest mapped the url to an archive, but the file
+                # is not there.
+                logger.error(
+                    "Release artifact %r not found in archive of release %s", url, release.id
+                )
+                cache.set(cache_key, -1, 60)
+                metrics.timing("sourcemaps.release_artifact_from_archive", time.monotonic() - start)
+                return None
+            except Exception as exc:
+                logger.error("Failed to read %s from release %s", url, release.id, exc_info=exc)
+                # TODO(jjbayer): cache error and return here
+            else:
+                result = fetch_and_cache_artifact(
+                    url,
+                    lambda: fp,
+                    cache_key,
+                    cache_key_meta,
+                    headers,
+                    # Cannot use `compress_file` because `ZipExtFile` does not support chunks
+                    compress_fn=compress,
+                )
+                metrics.timing("sourcemaps.release_artifact_from_archive", time.monotonic() - start)
+
+                return result
 
     # Fall back to maintain compatibility with old releases and versions of
     # sentry-cli which upload files individually
@@ -739,12 +766,31 @@ def fetch_sourcemap(url, project=None, release=None, dist=None, allow_scraping=T
             allow_scraping=allow_scraping,
         )
         body = result.body
-    try:
-        return SourceMapView.from_json_bytes(body)
-    except Exception as exc:
-        # This is in debug because the product shows an error already.
-        logger.debug(str(exc), exc_info=True)
-        raise UnparseableSourcemap({"url": http.expose_url(url)})
+
+    def parse():
+        try:
+            return SourceMapView.from_json_bytes(body)
+        except Exception as exc:
+            # This is in debug because the product shows an error already.
+            logger.debug(str(exc), exc_info=True)
+            raise UnparseableSourcemap({"url": http.expose_url(url)})
+
+    # The contents of data URIs are part of the url already.
+    key = get_view_cache_key(None if is_data_uri(url) else url, release, dist, body)
+    return view_cache.get_or_create(key, len(body), parse, "sourcemap")
+
+
+def get_view_cache_key(url, release, dist, body, *extra):
+    """
+    Returns the key of a file's parsed view in the process-wide view cache,
+    which changes with the contents of the file.
+    """
+    return (
+        release.id if release else None,
+        dist.id if dist else None,
+        url,
+        hashlib.sha1(body).hexdigest(),
+    ) + extra
 
 
 def is_data_uri(url):
@@ -1155,7 +1201,13 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
             # either way, there's no more for us to do here, since we don't have
             # a valid file to cache
             return
-        cache.add(filename, result.body, result.encoding)
+        source_view = view_cache.get_or_create(
+            get_view_cache_key(filename, self.release, self.dist, result.body, result.encoding),
+            len(result.body),
+            lambda: make_source_view(result.body, result.encoding),
+            "source",
+        )
+        cache.add(filename, source_view)
         cache.alias(result.url, filename)
 
         sourcemap_url = discover_sourcemap(result)
@@ -2,6 +2,7 @@ import base64
 import logging
 import random
 import sys
+import threading
 import time
 import uuid
 from copy import deepcopy
@@ -11,6 +12,7 @@ import jsonschema
 import sentry_sdk
 from django.conf import settings
 from django.urls import reverse
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
 
 from sentry import features, options
@@ -25,6 +27,10 @@ MAX_ATTEMPTS = 3
 REQUEST_CACHE_TIMEOUT = 3600
 INTERNAL_SOURCE_NAME = "sentry:project"
 
+# The number of keep-alive connections to symbolicator that are kept open per
+# process.
+POOL_SIZE = 10
+
 logger = logging.getLogger(__name__)
 
 VALID_LAYOUTS = ("native", "symstore", "symstore_index2", "ssqp", "unified", "debuginfod")
@@ -482,6 +488,31 @@ def get_sources_for_project(project):
     return sources
 
 
+_pooled_session = None
+_pooled_session_lock = threading.Lock()
+
+
+def get_pooled_session():
+    """
+    Returns the HTTP session that all symbolicator requests of this process
+    share, so that connections to symbolicator are kept alive between events
+    instead of being established for every one of them.
+
+    Only connections are shared: every event still creates and polls its own
+    symbolicator task from the worker symbolicating it.
+    """
+    global _pooled_session
+    with _pooled_session_lock:
+        if _pooled_session is None:
+            session = Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _pooled_session = session
+
+    return _pooled_session
+
+
 class SymbolicatorSession:
 
     # used in x-sentry-worker-id http header
@@ -525,12 +556,12 @@ class SymbolicatorSession:
 
     def open(self):
         if self.session is None:
-            self.session = Session()
+            self.session = get_pooled_session()
 
     def close(self):
-        if self.session is not None:
-            self.session.close()
-            self.session = None
+        # The pooled session outlives this one, so its connections can be
+        # reused by the next event.
+        self.session = None
 
     def _ensure_open(self):
         if not self.session:
@@ -3,7 +3,7 @@ from typing import Any, Mapping, Optional, Sequence
 
 from sentry import digests
 from sentry.digests import get_option_key as get_digest_option_key
-from sentry.digests.notifications import event_to_record, unsplit_key
+from sentry.digests.notifications import event_to_record, get_sample_keys, unsplit_key
 from sentry.models import NotificationSetting, Project, ProjectOption
 from sentry.notifications.notifications.activity import EMAIL_CLASSES_BY_TYPE
 from sentry.notifications.notifications.digest import DigestNotification
@@ -61,11 +61,13 @@ class MailAdapter:
 
             digest_key = unsplit_key(event.group.project, target_type, target_identifier)
             extra["digest_key"] = digest_key
+            record = event_to_record(event, rules)
             immediate_delivery = digests.add(
                 digest_key,
-                event_to_record(event, rules),
+                record,
                 increment_delay=get_digest_option("increment_delay"),
                 maximum_delay=get_digest_option("maximum_delay"),
+                sample_keys=get_sample_keys(record),
             )
             if immediate_delivery:
                 deliver_digest.delay(digest_key)
@@ -3,6 +3,7 @@ import mmap
 import os
 import tempfile
 import time
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from hashlib import sha1
@@ -38,6 +39,9 @@ UPLOAD_RETRY_TIME = getattr(settings, "SENTRY_UPLOAD_RETRY_TIME", 60)  # 1min
 DEFAULT_BLOB_SIZE = 1024 * 1024  # one mb
 CHUNK_STATE_HEADER = "__state"
 MULTI_BLOB_UPLOAD_CONCURRENCY = 8
+BLOB_FETCH_CONCURRENCY = 4
+# The number of blobs that downloads fetch ahead of the reader.
+DOWNLOAD_READ_AHEAD = 4
 MAX_FILE_SIZE = 2 ** 31  # 2GB is the maximum offset supported by fileblob
 
 
@@ -331,23 +335,36 @@ class File(Model):
         app_label = "sentry"
         db_table = "sentry_file"
 
-    def _get_chunked_blob(self, mode=None, prefetch=False, prefetch_to=None, delete=True):
+    def _get_chunked_blob(
+        self, mode=None, prefetch=False, prefetch_to=None, delete=True, read_ahead=0
+    ):
         return ChunkedFileBlobIndexWrapper(
             FileBlobIndex.objects.filter(file=self).select_related("blob").order_by("offset"),
             mode=mode,
             prefetch=prefetch,
             prefetch_to=prefetch_to,
             delete=delete,
+            read_ahead=read_ahead,
         )
 
-    def getfile(self, mode=None, prefetch=False):
+    def getfile(self, mode=None, prefetch=False, read_ahead=0):
         """Returns a file object.  By default the file is fetched on
         demand but if prefetch is enabled the file is fully prefetched
         into a tempfile before reading can happen.
+
+        With ``read_ahead``, up to that many blobs following the current
+        one are fetched concurrently while the file is being read.
         """
-        impl = self._get_chunked_blob(mode, prefetch)
+        impl = self._get_chunked_blob(mode, prefetch, read_ahead=read_ahead)
         return FileObj(impl, self.name)
 
+    def read_range(self, offset, size):
+        """Reads ``size`` bytes starting at ``offset``, fetching only the
+        blobs that cover this range.
+        """
+        with self._get_chunked_blob() as impl:
+            return impl.read_range(offset, size)
+
     def save_to(self, path):
         """Fetches the file and emplaces it at a certain location.  The
         write is done atomically to a tempfile first and then moved over.
@@ -483,12 +500,23 @@ class FileBlobIndex(Model):
         unique_together = (("file", "blob", "offset"),)
 
 
+def _fetch_blob(blob):
+    with blob.getfile() as f:
+        return io.BytesIO(f.read())
+
+
 class ChunkedFileBlobIndexWrapper:
-    def __init__(self, indexes, mode=None, prefetch=False, prefetch_to=None, delete=True):
+    def __init__(
+        self, indexes, mode=None, prefetch=False, prefetch_to=None, delete=True, read_ahead=0
+    ):
         # eager load from database incase its a queryset
         self._indexes = list(indexes)
         self._curfile = None
         self._curidx = None
+        # Blobs that are fetched ahead of the reader, as (index, future).
+        self._read_ahead = read_ahead
+        self._pending = deque()
+        self._executor = None
         if prefetch:
             self.prefetched = True
             self._prefetch(prefetch_to, delete)
@@ -516,16 +544,42 @@ class ChunkedFileBlobIndexWrapper:
         assert not self.prefetched, "this makes no sense"
         old_file = self._curfile
         try:
-            try:
-                self._curidx = next(self._idxiter)
-                self._curfile = self._curidx.blob.getfile()
-            except StopIteration:
-                self._curidx = None
-                self._curfile = None
+            if self._read_ahead:
+                self._fill_read_ahead()
+                if self._pending:
+                    self._curidx, future = self._pending.popleft()
+                    self._curfile = future.result()
+                    self._fill_read_ahead()
+                else:
+                    self._curidx = None
+                    self._curfile = None
+            else:
+                try:
+                    self._curidx = next(self._idxiter)
+                    self._curfile = self._curidx.blob.getfile()
+                except StopIteration:
+                    self._curidx = None
+                    self._curfile = None
         finally:
             if old_file is not None:
                 old_file.close()
 
+    def _fill_read_ahead(self):
+        """Starts fetching blobs until ``read_ahead`` blobs are in flight."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._read_ahead)
+
+        while len(self._pending) < self._read_ahead:
+            idx = next(self._idxiter, None)
+            if idx is None:
+                break
+            self._pending.append((idx, self._executor.submit(_fetch_blob, idx.blob)))
+
+    def _reset_read_ahead(self):
+        while self._pending:
+            _, future = self._pending.popleft()
+            future.cancel()
+
     @property
     def size(self):
         return sum(i.blob.size for i in self._indexes)
@@ -557,9 +611,14 @@ class ChunkedFileBlobIndexWrapper:
                     mem[offset : offset + len(chunk)] = chunk
                     offset += len(chunk)
 
-        with ThreadPoolExecutor(max_workers=4) as exe:
-            for idx in self._indexes:
-                exe.submit(fetch_file, idx.offset, idx.blob.getfile)
+        with ThreadPoolExecutor(max_workers=BLOB_FETCH_CONCURRENCY) as exe:
+            futures = [
+                exe.submit(fetch_file, idx.offset, idx.blob.getfile) for idx in self._indexes
+            ]
+
+        # Raise errors of any fetch, which would leave zeroes in the file otherwise.
+        for future in futures:
+            future.result()
 
         mem.flush()
         self._curfile = f
@@ -569,6 +628,10 @@ class ChunkedFileBlobIndexWrapper:
             self._curfile.close()
         self._curfile = None
         self._curidx = None
+        self._reset_read_ahead()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
         self.closed = True
 
     def _seek(self, pos):
@@ -587,6 +650,7 @@ class ChunkedFileBlobIndexWrapper:
         for n, idx in enumerate(self._indexes[::-1]):
             if idx.offset <= pos:
                 if idx != self._curidx:
+                    self._reset_read_ahead()
                     self._idxiter = iter(self._indexes[-(n + 1) :])
                     self._nextidx()
                 break
@@ -643,6 +707,42 @@ class ChunkedFileBlobIndexWrapper:
 
         return bytes(result)
 
+    def read_range(self, offset, size):
+        """Reads ``size`` bytes starting at ``offset`` without moving the
+        position of the file.
+
+        Only the blobs that cover the range are fetched, concurrently.
+        """
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+        if offset < 0 or size < 0:
+            raise OSError("Invalid argument")
+
+        if self.prefetched:
+            pos = self._curfile.tell()
+            try:
+                self._curfile.seek(offset)
+                return self._curfile.read(size)
+            finally:
+                self._curfile.seek(pos)
+
+        end = offset + size
+        covering = [
+            idx for idx in self._indexes if idx.offset < end and idx.offset + idx.blob.size > offset
+        ]
+        if not covering:
+            return b""
+
+        with ThreadPoolExecutor(max_workers=min(len(covering), BLOB_FETCH_CONCURRENCY)) as exe:
+            blobs = list(exe.map(lambda idx: _fetch_blob(idx.blob), covering))
+
+        result = bytearray()
+        for idx, blob in zip(covering, blobs):
+            data = blob.getbuffer()
+            result.extend(data[max(offset - idx.offset, 0) : end - idx.offset])
+
+        return bytes(result)
+
 
 class FileBlobOwner(Model):
     __include_in_export__ = False
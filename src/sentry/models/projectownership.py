@@ -7,7 +7,7 @@ from django.utils import timezone
 from sentry.db.models import Model, sane_repr
 from sentry.db.models.fields import FlexibleForeignKey, JSONField
 from sentry.models import ActorTuple
-from sentry.ownership.grammar import Rule, load_schema, resolve_actors
+from sentry.ownership.grammar import Rule, get_ownership_index, resolve_actors
 from sentry.utils import metrics
 from sentry.utils.cache import cache
 
@@ -39,22 +39,6 @@ class ProjectOwnership(Model):
     def get_cache_key(self, project_id):
         return f"projectownership_project_id:1:{project_id}"
 
-    @classmethod
-    def get_combined_schema(self, ownership, codeowners):
-        if codeowners and codeowners.schema:
-            ownership.schema = (
-                codeowners.schema
-                if not ownership.schema
-                else {
-                    **ownership.schema,
-                    "rules": [
-                        *codeowners.schema["rules"],
-                        *ownership.schema["rules"],
-                    ],
-                }
-            )
-        return ownership.schema
-
     @classmethod
     def get_ownership_cached(cls, project_id):
         """
@@ -97,10 +81,12 @@ class ProjectOwnership(Model):
         if not ownership:
             ownership = cls(project_id=project_id)
 
+        # CODEOWNERS rules come first, followed by the issue owners rules.
         codeowners = ProjectCodeOwners.get_codeowners_cached(project_id)
-        ownership.schema = cls.get_combined_schema(ownership, codeowners)
-
-        rules = cls._matching_ownership_rules(ownership, project_id, data)
+        rules = [
+            *(cls._matching_ownership_rules(codeowners, project_id, data) if codeowners else ()),
+            *cls._matching_ownership_rules(ownership, project_id, data),
+        ]
 
         if not rules:
             return cls.Everyone if ownership.fallthrough else [], None
@@ -190,9 +176,8 @@ class ProjectOwnership(Model):
     ) -> Sequence["Rule"]:
         rules = []
         if ownership.schema is not None:
-            for rule in load_schema(ownership.schema):
-                if rule.test(data):
-                    rules.append(rule)
+            key = (ownership._meta.db_table, project_id)
+            rules = get_ownership_index(key, ownership.schema).test(data)
 
         return rules
 
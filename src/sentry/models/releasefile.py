@@ -1,11 +1,14 @@
 import errno
 import logging
+import mmap
 import os
+import struct
 import zipfile
+import zlib
 from contextlib import contextmanager
 from hashlib import sha1
 from io import BytesIO
-from tempfile import TemporaryDirectory
+from tempfile import NamedTemporaryFile, TemporaryDirectory
 from typing import IO, Optional, Tuple
 from urllib.parse import urlsplit, urlunsplit
 
@@ -146,29 +149,50 @@ class ReleaseFileCache:
     def cache_path(self):
         return options.get("releasefile.cache-path")
 
-    def getfile(self, releasefile):
-        cutoff = options.get("releasefile.cache-limit")
-        file_size = releasefile.file.size
-        if file_size < cutoff:
-            metrics.timing("release_file.cache.get.size", file_size, tags={"cutoff": True})
-            return releasefile.file.getfile()
-
+    def _get_file_path(self, releasefile):
         file_id = str(releasefile.file.id)
         organization_id = str(releasefile.organization_id)
-        file_path = os.path.join(self.cache_path, organization_id, file_id)
+        return os.path.join(self.cache_path, organization_id, file_id)
 
-        hit = True
+    def _ensure_cached(self, releasefile, file_path):
+        """Stores the release file at ``file_path`` unless it is there already."""
         try:
             os.stat(file_path)
         except OSError as e:
             if e.errno != errno.ENOENT:
                 raise
             releasefile.file.save_to(file_path)
-            hit = False
+            return False
+
+        return True
+
+    def getfile(self, releasefile):
+        cutoff = options.get("releasefile.cache-limit")
+        file_size = releasefile.file.size
+        if file_size < cutoff:
+            metrics.timing("release_file.cache.get.size", file_size, tags={"cutoff": True})
+            return releasefile.file.getfile()
+
+        file_path = self._get_file_path(releasefile)
+        hit = self._ensure_cached(releasefile, file_path)
 
         metrics.timing("release_file.cache.get.size", file_size, tags={"hit": hit, "cutoff": False})
         return FileObj(open(file_path, "rb"))
 
+    def getarchive(self, releasefile):
+        """Returns an ``IndexedReleaseArchive`` of the release archive, which
+        is stored in the cache and memory mapped.
+
+        The caller is responsible for closing the archive.
+        """
+        file_path = self._get_file_path(releasefile)
+        hit = self._ensure_cached(releasefile, file_path)
+
+        metrics.timing(
+            "release_file.cache.get_archive.size", releasefile.file.size, tags={"hit": hit}
+        )
+        return IndexedReleaseArchive(file_path)
+
     def clear_old_entries(self):
         clear_cached_files(self.cache_path)
 
@@ -225,6 +249,115 @@ class ReleaseArchive:
         return temp_dir
 
 
+class IndexedReleaseArchive:
+    """Read-only, memory mapped view of a release archive on the local disk.
+
+    Reading a file from a ``ReleaseArchive`` requires parsing the central
+    directory, which is slow for archives with thousands of files. This
+    archive stores an index from URLs to the offsets of the files next to
+    the archive instead, so that it is built only once per archive, and
+    reads files directly from the mapped archive.
+    """
+
+    INDEX_SUFFIX = ".index"
+
+    # The size of the fixed part of a local file header, see the ZIP spec.
+    _LOCAL_HEADER_SIZE = 30
+
+    def __init__(self, path: str):
+        self._fileobj = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._fileobj.close()
+            raise
+
+        self._index = self._load_index(path + self.INDEX_SUFFIX)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc, value, tb):
+        self.close()
+
+    def close(self):
+        self._mmap.close()
+        self._fileobj.close()
+
+    def _load_index(self, index_path: str) -> dict:
+        try:
+            with open(index_path, "rb") as f:
+                return json.loads(f.read())
+        except (OSError, ValueError):
+            pass
+
+        index = self._build_index()
+
+        # Write the index atomically, since other processes might read it
+        # while it is being written.
+        try:
+            with NamedTemporaryFile(dir=os.path.dirname(index_path), delete=False) as f:
+                f.write(json.dumps(index).encode("utf-8"))
+            os.replace(f.name, index_path)
+        except OSError:
+            logger.warning("Failed to write index of release archive", exc_info=True)
+
+        return index
+
+    def _build_index(self) -> dict:
+        with metrics.timer("release_file.archive.build_index"):
+            with zipfile.ZipFile(self._fileobj) as zip_file:
+                manifest = json.loads(zip_file.read("manifest.json").decode("utf-8"))
+
+                index = {}
+                for path, entry in manifest.get("files", {}).items():
+                    info = zip_file.getinfo(path)
+                    index[entry["url"]] = {
+                        "offset": self._get_data_offset(info),
+                        "size": info.compress_size,
+                        "compression": info.compress_type,
+                        "crc": info.CRC,
+                        "path": path,
+                        "headers": entry.get("headers", {}),
+                    }
+
+        return index
+
+    def _get_data_offset(self, info: zipfile.ZipInfo) -> int:
+        """Returns the offset of the data of a file, which starts after its
+        local header. Its name and extra fields can differ from the central
+        directory, so their lengths have to be read from the header itself.
+        """
+        start = info.header_offset
+        header = self._mmap[start : start + self._LOCAL_HEADER_SIZE]
+        if header[:4] != zipfile.stringFileHeader:
+            raise zipfile.BadZipFile(f"Bad local file header of {info.filename}")
+
+        name_length, extra_length = struct.unpack("<HH", header[26:30])
+        return start + self._LOCAL_HEADER_SIZE + name_length + extra_length
+
+    def get_file_by_url(self, url: str) -> Tuple[IO, dict]:
+        """Return file-like object and headers.
+
+        May raise ``KeyError``
+        """
+        entry = self._index[url]
+        offset = entry["offset"]
+        data = self._mmap[offset : offset + entry["size"]]
+
+        if entry["compression"] == zipfile.ZIP_DEFLATED:
+            data = zlib.decompress(data, -zlib.MAX_WBITS)
+        elif entry["compression"] != zipfile.ZIP_STORED:
+            # Other compression methods are rare enough to take the slow path.
+            with zipfile.ZipFile(self._fileobj) as zip_file:
+                data = zip_file.read(entry["path"])
+
+        if zlib.crc32(data) != entry["crc"]:
+            raise zipfile.BadZipFile(f"Bad CRC-32 for file {entry['path']}")
+
+        return BytesIO(data), entry["headers"]
+
+
 class _ArtifactIndexData:
     """Holds data of artifact index and keeps track of changes"""
 
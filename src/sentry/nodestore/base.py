@@ -1,9 +1,17 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import timedelta
+from io import BytesIO
 from threading import local
+from time import monotonic
 
 import sentry_sdk
+import zstandard
 from django.core.cache import InvalidCacheBackendError, caches
 
-from sentry.utils import json
+from sentry import options
+from sentry.nodestore import compressor
+from sentry.utils import json, metrics
 from sentry.utils.cache import memoize
 from sentry.utils.services import Service
 
@@ -22,6 +30,133 @@ json_dumps = json.JSONEncoder(
 
 json_loads = json._default_decoder.decode
 
+# Header byte of nodes that have been compressed with a trained zstd
+# dictionary. The id of the dictionary is part of the zstd frame header. Plain
+# nodes are JSON objects and therefore always start with ``{``.
+ZSTD_DICTIONARY_FORMAT = b"\x01"
+
+# Trained zstd dictionaries are stored as files, so that they are not subject
+# to the retention of the nodes compressed with them.
+ZSTD_DICTIONARY_FILE_TYPE = "nodestore.zstd-dictionary"
+
+
+class MissingZstdDictionary(Exception):
+    pass
+
+
+class MissingNodeChunk(Exception):
+    pass
+
+
+class WriteBuffer:
+    """
+    Collects encoded nodes that are written behind, until either ``max_items``
+    nodes or ``max_bytes`` bytes have been collected, or the oldest node has
+    been waiting for more than ``max_delay`` seconds.
+    """
+
+    def __init__(self, max_items=100, max_bytes=1024 * 1024 * 10, max_delay=1.0):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self.clear()
+
+    def clear(self):
+        # Maps ttl -> {id: (bytes_data, cache_item)}, as nodes can only be
+        # written together if they share a ttl.
+        self.pending = {}
+        # Maps checksum -> (bytes_data, ttl, expires_at) of deduplicated
+        # chunks, which are written before the nodes referencing them.
+        self.pending_chunks = {}
+        self.size = 0
+        self.bytes = 0
+        self.started = None
+
+    def get(self, id):
+        for items in self.pending.values():
+            if id in items:
+                return items[id][0]
+
+    def discard(self, id):
+        for items in self.pending.values():
+            removed = items.pop(id, None)
+            if removed is not None:
+                self.size -= 1
+                self.bytes -= len(removed[0])
+
+    def _added(self, bytes_data):
+        self.size += 1
+        self.bytes += len(bytes_data)
+        if self.started is None:
+            self.started = monotonic()
+
+    def add(self, id, bytes_data, cache_item, ttl=None):
+        self.discard(id)
+        self.pending.setdefault(ttl, {})[id] = (bytes_data, cache_item)
+        self._added(bytes_data)
+
+    def chunk_expires_after(self, checksum, timestamp):
+        item = self.pending_chunks.get(checksum)
+        return item is not None and item[2] >= timestamp
+
+    def add_chunk(self, checksum, bytes_data, ttl, expires_at):
+        previous = self.pending_chunks.pop(checksum, None)
+        if previous is not None:
+            self.size -= 1
+            self.bytes -= len(previous[0])
+
+        self.pending_chunks[checksum] = (bytes_data, ttl, expires_at)
+        self._added(bytes_data)
+
+    def should_flush(self):
+        return (
+            self.size >= self.max_items
+            or self.bytes >= self.max_bytes
+            or (self.started is not None and monotonic() - self.started >= self.max_delay)
+        )
+
+
+CHUNK_NODE_ID_PREFIX = "nodestore-chunk:"
+
+
+def get_chunk_node_id(checksum):
+    return f"{CHUNK_NODE_ID_PREFIX}{checksum}"
+
+
+class ChunkCache:
+    """
+    LRU of recently written or read deduplicated chunks, see
+    `NodeStorage.set_subkeys`. Chunks are kept serialized, so that callers
+    can never modify the cached data.
+    """
+
+    def __init__(self, max_size=1000):
+        self.max_size = max_size
+        # Maps checksum -> [bytes_data, expires_at], where ``expires_at`` is
+        # the earliest (monotonic) time the chunk may expire, if it has been
+        # written by this thread.
+        self.items = OrderedDict()
+
+    def get(self, checksum):
+        item = self.items.get(checksum)
+        if item is not None:
+            self.items.move_to_end(checksum)
+            return item[0]
+
+    def expires_after(self, checksum, timestamp):
+        item = self.items.get(checksum)
+        return item is not None and item[1] is not None and item[1] >= timestamp
+
+    def set(self, checksum, bytes_data, expires_at=None):
+        item = self.items.get(checksum)
+        if item is not None and (expires_at is None or (item[1] or 0) > expires_at):
+            expires_at = item[1]
+
+        self.items[checksum] = [bytes_data, expires_at]
+        self.items.move_to_end(checksum)
+        while len(self.items) > self.max_size:
+            self.items.popitem(last=False)
+
 
 class NodeStorage(local, Service):
     """
@@ -56,6 +191,11 @@ class NodeStorage(local, Service):
 
     This is used in reprocessing to store a snapshot of the event from multiple
     stages of the pipeline.
+
+    When the ``nodestore.dedup-interfaces`` option is enabled, parts of nodes
+    that repeat across events (modules, SDK packages, debug images and
+    breadcrumbs) are stored once under the checksum of their contents, see
+    `sentry.nodestore.compressor`.
     """
 
     __all__ = (
@@ -64,12 +204,23 @@ class NodeStorage(local, Service):
         "get",
         "get_multi",
         "set",
+        "set_many",
         "set_subkeys",
+        "set_subkeys_many",
+        "buffered_writes",
+        "set_zstd_dictionary",
         "cleanup",
         "validate",
         "bootstrap",
     )
 
+    # Maps the ids of zstd dictionaries to the dictionaries.
+    _zstd_dictionaries = {}
+
+    # The retention of nodes written without an explicit ttl, if the backend
+    # expires nodes by ttl.
+    default_ttl = None
+
     def delete(self, id):
         """
         >>> nodestore.delete('key1')
@@ -92,6 +243,9 @@ class NodeStorage(local, Service):
         if value is None:
             return None
 
+        if value.startswith(ZSTD_DICTIONARY_FORMAT):
+            value = self._decompress_with_dictionary(value)
+
         lines_iter = iter(value.splitlines())
         try:
             if subkey is not None:
@@ -134,8 +288,10 @@ class NodeStorage(local, Service):
                     return item_from_cache
 
             span.set_tag("subkey", str(subkey))
-            bytes_data = self._get_bytes(id)
-            rv = self._decode(bytes_data, subkey=subkey)
+            bytes_data = self._get_pending_bytes(id)
+            if bytes_data is None:
+                bytes_data = self._get_bytes(id)
+            rv = self._assemble_many({id: self._decode(bytes_data, subkey=subkey)})[id]
             if subkey is None:
                 # set cache item only after we know decoding did not fail
                 self._set_cache_item(id, rv)
@@ -179,10 +335,23 @@ class NodeStorage(local, Service):
             else:
                 uncached_ids = id_list
 
-            items = {
-                id: self._decode(value, subkey=subkey)
-                for id, value in self._get_bytes_multi(uncached_ids).items()
-            }
+            pending = {}
+            for id in uncached_ids:
+                bytes_data = self._get_pending_bytes(id)
+                if bytes_data is not None:
+                    pending[id] = bytes_data
+
+            if pending:
+                bytes_multi = self._get_bytes_multi(
+                    [id for id in uncached_ids if id not in pending]
+                )
+                bytes_multi.update(pending)
+            else:
+                bytes_multi = self._get_bytes_multi(uncached_ids)
+
+            items = self._assemble_many(
+                {id: self._decode(value, subkey=subkey) for id, value in bytes_multi.items()}
+            )
             if subkey is None:
                 self._set_cache_items(items)
                 items.update(cache_items)
@@ -201,12 +370,92 @@ class NodeStorage(local, Service):
         >>> _encode({"unprocessed": {}, None: {"stacktrace": {}}})
         b'{"stacktrace": {}}\nunprocessed\n{}'
         """
-        lines = [json_dumps(data.pop(None)).encode("utf8")]
+        default = data.pop(None)
+        lines = [json_dumps(default).encode("utf8")]
         for key, value in data.items():
             lines.append(key.encode("ascii"))
             lines.append(json_dumps(value).encode("utf8"))
 
-        return b"\n".join(lines)
+        bytes_data = b"\n".join(lines)
+
+        platform = default.get("platform") if isinstance(default, dict) else None
+        dict_id = options.get("nodestore.zstd-dictionaries").get(platform or "other")
+        if dict_id is not None:
+            compressed = self._compress_with_dictionary(bytes_data, dict_id)
+            if compressed is not None:
+                return compressed
+
+        return bytes_data
+
+    def _get_zstd_dictionary(self, dict_id):
+        # Dictionaries are immutable, so they are shared between all threads.
+        dictionaries = NodeStorage._zstd_dictionaries
+        if dict_id not in dictionaries:
+            from sentry.models import File
+
+            file = File.objects.filter(type=ZSTD_DICTIONARY_FILE_TYPE, name=str(dict_id)).first()
+            if file is None:
+                return None
+            with file.getfile() as fp:
+                dictionaries[dict_id] = zstandard.ZstdCompressionDict(fp.read())
+
+        return dictionaries[dict_id]
+
+    def _compress_with_dictionary(self, bytes_data, dict_id):
+        # (De)compressors must not be shared between threads, ``self`` is
+        # thread-local.
+        compressors = self.__dict__.setdefault("_zstd_compressors", {})
+        compressor = compressors.get(dict_id)
+        if compressor is None:
+            dictionary = self._get_zstd_dictionary(dict_id)
+            if dictionary is None:
+                metrics.incr("nodestore.zstd_dictionary.missing", tags={"op": "compress"})
+                return None
+            compressor = compressors[dict_id] = zstandard.ZstdCompressor(dict_data=dictionary)
+
+        return ZSTD_DICTIONARY_FORMAT + compressor.compress(bytes_data)
+
+    def _decompress_with_dictionary(self, value):
+        value = value[len(ZSTD_DICTIONARY_FORMAT) :]
+        dict_id = zstandard.get_frame_parameters(value).dict_id
+
+        decompressors = self.__dict__.setdefault("_zstd_decompressors", {})
+        decompressor = decompressors.get(dict_id)
+        if decompressor is None:
+            dictionary = self._get_zstd_dictionary(dict_id)
+            if dictionary is None:
+                metrics.incr("nodestore.zstd_dictionary.missing", tags={"op": "decompress"})
+                raise MissingZstdDictionary(f"Missing zstd dictionary {dict_id}")
+            decompressor = decompressors[dict_id] = zstandard.ZstdDecompressor(dict_data=dictionary)
+
+        return decompressor.decompress(value)
+
+    def set_zstd_dictionary(self, dict_data):
+        """
+        Store a trained zstd dictionary so that it can be used to compress
+        nodes, and returns its id. Dictionaries are stored as files outside of
+        the nodestore and never expire. They must never be deleted or changed
+        as long as there are nodes that have been compressed with them.
+
+        Nodes are only compressed with a dictionary once its id has been
+        activated for a platform in the ``nodestore.zstd-dictionaries``
+        option.
+
+        >>> dict_data = zstandard.train_dictionary(112640, samples)
+        >>> nodestore.set_zstd_dictionary(dict_data.as_bytes())
+        1234
+        """
+        dict_id = zstandard.ZstdCompressionDict(dict_data).dict_id()
+        if not dict_id:
+            raise ValueError("zstd dictionaries need to have an id")
+
+        from sentry.models import File
+
+        if not File.objects.filter(type=ZSTD_DICTIONARY_FILE_TYPE, name=str(dict_id)).exists():
+            file = File.objects.create(name=str(dict_id), type=ZSTD_DICTIONARY_FILE_TYPE)
+            file.putfile(BytesIO(dict_data))
+
+        return dict_id
 
     def _set_bytes(self, id, data, ttl=None):
         """
@@ -214,6 +463,13 @@ class NodeStorage(local, Service):
         """
         raise NotImplementedError
 
+    def _set_bytes_multi(self, items, ttl=None):
+        """
+        >>> nodestore._set_bytes_multi({'key1': b'{"foo": "bar"}'})
+        """
+        for id, data in items.items():
+            self._set_bytes(id, data, ttl=ttl)
+
     def set(self, id, data, ttl=None):
         """
         Set value for `id`. Note that this deletes existing subkeys for `id` as
@@ -241,11 +497,234 @@ class NodeStorage(local, Service):
             span.set_tag("node_id", id)
             span.set_data("subkeys_count", len(data))
             cache_item = data.get(None)
+            if options.get("nodestore.dedup-interfaces"):
+                data = self._deduplicate(data, ttl=ttl)
             bytes_data = self._encode(data)
+
+            write_buffer = getattr(self, "_write_buffer", None)
+            if write_buffer is not None:
+                span.set_tag("buffered", True)
+                write_buffer.add(id, bytes_data, cache_item, ttl=ttl)
+                if write_buffer.should_flush():
+                    self._flush_write_buffer()
+                return
+
             self._set_bytes(id, bytes_data, ttl=ttl)
             # set cache only after encoding and write to nodestore has succeeded
             self._set_cache_item(id, cache_item)
 
+    @memoize
+    def _chunk_cache(self):
+        return ChunkCache()
+
+    def _deduplicate(self, data, ttl=None):
+        chunks = {}
+        deduplicated = {}
+        for key, value in data.items():
+            if isinstance(value, dict):
+                value, extra_keys = compressor.deduplicate(value)
+                chunks.update(extra_keys)
+            deduplicated[key] = value
+
+        if chunks:
+            self._write_chunks(chunks, ttl=ttl)
+
+        return deduplicated
+
+    def _write_chunks(self, chunks, ttl=None):
+        # Chunks are never deleted together with the nodes referencing them.
+        # Instead, they are written with the retention of the referencing node
+        # plus the refresh interval, and rewritten whenever a node references
+        # them that could otherwise outlive them. Only chunks this thread has
+        # not written recently enough are rewritten.
+        refresh_interval = timedelta(seconds=options.get("nodestore.dedup-refresh-interval"))
+        retention = ttl or self.default_ttl
+        now = monotonic()
+        # Without a known retention, nodes expire by the time they have been
+        # written at, and chunks are kept for the refresh interval longer.
+        node_expires_at = now + (retention.total_seconds() if retention else 0)
+
+        write_buffer = getattr(self, "_write_buffer", None)
+
+        to_write = {}
+        for checksum, chunk in chunks.items():
+            if self._chunk_cache.expires_after(checksum, node_expires_at):
+                continue
+            if write_buffer is not None and write_buffer.chunk_expires_after(
+                checksum, node_expires_at
+            ):
+                continue
+            to_write[checksum] = json_dumps(chunk).encode("utf8")
+
+        metrics.incr(
+            "nodestore.dedup.chunks", amount=len(chunks) - len(to_write), tags={"written": "false"}
+        )
+        if not to_write:
+            return
+
+        metrics.incr("nodestore.dedup.chunks", amount=len(to_write), tags={"written": "true"})
+        chunk_ttl = retention + refresh_interval if retention else None
+        expires_at = node_expires_at + refresh_interval.total_seconds()
+
+        if write_buffer is not None:
+            # Chunks are flushed before the nodes referencing them, see
+            # `_flush_write_buffer`.
+            for checksum, bytes_data in to_write.items():
+                write_buffer.add_chunk(checksum, bytes_data, chunk_ttl, expires_at)
+                self._chunk_cache.set(checksum, bytes_data)
+            return
+
+        self._set_chunks({chunk_ttl: to_write}, {checksum: expires_at for checksum in to_write})
+
+    def _set_chunks(self, chunks_by_ttl, expires_at):
+        for ttl, chunks in chunks_by_ttl.items():
+            self._set_bytes_multi(
+                {
+                    get_chunk_node_id(checksum): bytes_data
+                    for checksum, bytes_data in chunks.items()
+                },
+                ttl=ttl,
+            )
+            # remember the expiry only after the write has succeeded
+            for checksum, bytes_data in chunks.items():
+                self._chunk_cache.set(checksum, bytes_data, expires_at=expires_at[checksum])
+
+    def _get_chunks(self, checksums):
+        chunks = {}
+        missing = []
+        for checksum in checksums:
+            bytes_data = self._chunk_cache.get(checksum)
+            if bytes_data is None:
+                missing.append(checksum)
+            else:
+                chunks[checksum] = bytes_data
+
+        if missing:
+            bytes_multi = self._get_bytes_multi([get_chunk_node_id(c) for c in missing])
+            for checksum in missing:
+                bytes_data = bytes_multi.get(get_chunk_node_id(checksum))
+                if bytes_data is None:
+                    # Never return nodes without the interfaces stored in
+                    # their chunks.
+                    metrics.incr("nodestore.dedup.missing_chunk")
+                    raise MissingNodeChunk(f"Missing nodestore chunk {checksum}")
+
+                chunks[checksum] = bytes_data
+                self._chunk_cache.set(checksum, bytes_data)
+
+        return chunks
+
+    def _assemble_many(self, items):
+        checksums = set()
+        for item in items.values():
+            if isinstance(item, dict):
+                checksums.update(compressor.get_checksums(item))
+
+        if not checksums:
+            return items
+
+        chunks = self._get_chunks(checksums)
+
+        def get_extra_keys(checksums):
+            # Every node gets its own copy of the shared chunks.
+            return {c: json_loads(chunks[c]) for c in checksums}
+
+        return {
+            id: compressor.assemble(item, get_extra_keys) if isinstance(item, dict) else item
+            for id, item in items.items()
+        }
+
+    def set_many(self, items, ttl=None):
+        """
+        Set values for multiple ids at once. Like `set`, this deletes existing
+        subkeys.
+
+        >>> nodestore.set_many({'key1': {'foo': 'bar'}, 'key2': {'foo': 'baz'}})
+        """
+        return self.set_subkeys_many({id: {None: data} for id, data in items.items()}, ttl=ttl)
+
+    def set_subkeys_many(self, items, ttl=None):
+        """
+        Set values and subkeys for multiple ids at once, using as few writes
+        to the backend as possible.
+
+        >>> nodestore.set_subkeys_many({
+        ...    'key1': {None: {'foo': 'bar'}, "reprocessing": {'foo': 'bam'}},
+        ...    'key2': {None: {'foo': 'baz'}},
+        ... })
+        """
+        with self.buffered_writes():
+            for id, data in items.items():
+                self.set_subkeys(id, data, ttl=ttl)
+
+    @contextmanager
+    def buffered_writes(self, max_items=100, max_bytes=1024 * 1024 * 10, max_delay=1.0):
+        """
+        Buffer all writes of the current thread and write them to the backend
+        in batches. The buffer is flushed whenever one of the limits is
+        reached, and when the context manager exits. Reads from the current
+        thread already see buffered nodes before they are flushed.
+
+        Nested calls share the outermost buffer.
+
+        >>> with nodestore.buffered_writes():
+        ...     nodestore.set('key1', {'foo': 'bar'})
+        ...     nodestore.set('key2', {'foo': 'baz'})
+        """
+        if getattr(self, "_write_buffer", None) is not None:
+            yield
+            return
+
+        self._write_buffer = WriteBuffer(
+            max_items=max_items, max_bytes=max_bytes, max_delay=max_delay
+        )
+        try:
+            yield
+            self._flush_write_buffer()
+        finally:
+            self._write_buffer = None
+
+    def _get_pending_bytes(self, id):
+        write_buffer = getattr(self, "_write_buffer", None)
+        if write_buffer is not None:
+            return write_buffer.get(id)
+
+    def _flush_write_buffer(self):
+        write_buffer = self._write_buffer
+        if not write_buffer.size:
+            return
+
+        with sentry_sdk.start_span(op="nodestore.flush_write_buffer") as span:
+            span.set_data("num_ids", write_buffer.size)
+            span.set_data("bytes", write_buffer.bytes)
+            metrics.timing("nodestore.write_buffer.size", write_buffer.size)
+            metrics.timing("nodestore.write_buffer.bytes", write_buffer.bytes)
+
+            pending = write_buffer.pending
+            pending_chunks = write_buffer.pending_chunks
+            write_buffer.clear()
+
+            if pending_chunks:
+                chunks_by_ttl = {}
+                for checksum, (bytes_data, ttl, _) in pending_chunks.items():
+                    chunks_by_ttl.setdefault(ttl, {})[checksum] = bytes_data
+                self._set_chunks(
+                    chunks_by_ttl,
+                    {
+                        checksum: expires_at
+                        for checksum, (_, _, expires_at) in pending_chunks.items()
+                    },
+                )
+
+            for ttl, items in pending.items():
+                self._set_bytes_multi(
+                    {id: bytes_data for id, (bytes_data, _) in items.items()}, ttl=ttl
+                )
+                # set cache only after the write to nodestore has succeeded
+                self._set_cache_items(
+                    {id: cache_item for id, (_, cache_item) in items.items() if cache_item}
+                )
+
     def cleanup(self, cutoff_timestamp):
         raise NotImplementedError
 
@@ -270,13 +749,22 @@ class NodeStorage(local, Service):
             self.cache.set_many(items)
 
     def _delete_cache_item(self, id):
+        self._delete_pending_items([id])
         if self.cache:
             self.cache.delete(id)
 
     def _delete_cache_items(self, id_list):
+        self._delete_pending_items(id_list)
         if self.cache:
             self.cache.delete_many([id for id in id_list])
 
+    def _delete_pending_items(self, id_list):
+        # Deleted nodes must not be written afterwards by a pending flush.
+        write_buffer = getattr(self, "_write_buffer", None)
+        if write_buffer is not None:
+            for id in id_list:
+                write_buffer.discard(id)
+
     @memoize
     def cache(self):
         try:
@@ -56,6 +56,10 @@ class BigtableNodeStorage(NodeStorage):
         self.automatic_expiry = automatic_expiry
         self.skip_deletes = automatic_expiry and "_SENTRY_CLEANUP" in os.environ
 
+    @property
+    def default_ttl(self):
+        return self.store.default_ttl
+
     def _get_bytes(self, id):
         return self.store.get(id)
 
@@ -67,6 +71,11 @@ class BigtableNodeStorage(NodeStorage):
     def _set_bytes(self, id, data, ttl=None):
         self.store.set(id, data, ttl)
 
+    def _set_bytes_multi(self, items, ttl=None):
+        with sentry_sdk.start_span(op="nodestore.bigtable.set_bytes_multi") as span:
+            span.set_tag("num_ids", len(items))
+            self.store.set_many(list(items.items()), ttl)
+
     def delete(self, id):
         if self.skip_deletes:
             return
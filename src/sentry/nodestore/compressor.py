@@ -0,0 +1,184 @@
+"""
+Nodestore compressor is responsible for pulling out repeating data across
+events such that they can be stored only once. For example SDK modules list, or
+debug_meta.
+
+Each deduplicated part of an event is stored under the checksum of its
+contents, see `NodeStorage.set_subkeys`. The remaining, event specific part is
+inlined into the event together with the checksum.
+"""
+
+import hashlib
+
+from sentry.utils import json
+
+PATCHSETS_KEY = "__nodestore_patchsets"
+
+# Checksums must not depend on the order of keys.
+_dumps = json.JSONEncoder(separators=(",", ":"), sort_keys=True).encode
+
+_INTERFACES = {}
+
+
+def _deduplicate_interface(*keys):
+    def inner(f):
+        for k in keys:
+            _INTERFACES[k] = f
+
+        return f
+
+    return inner
+
+
+@_deduplicate_interface("debug_meta")
+class DebugMeta:
+    # Image addresses differ between processes, everything else only changes
+    # with the release.
+    _DEDUP_FIELDS = ("debug_id", "code_id", "code_file", "debug_file")
+
+    @staticmethod
+    def encode(data):
+        dedup = {}
+
+        if data and data.get("images"):
+            images = []
+            for image in data["images"]:
+                if isinstance(image, dict):
+                    image = dict(image)
+                    for name in DebugMeta._DEDUP_FIELDS:
+                        dedup.setdefault(name, []).append(image.pop(name, None))
+                else:
+                    for name in DebugMeta._DEDUP_FIELDS:
+                        dedup.setdefault(name, []).append(None)
+                images.append(image)
+
+            data = dict(data, images=images)
+
+        return dedup, data
+
+    @staticmethod
+    def decode(dedup, data):
+        if data:
+            for i, image in enumerate(data.get("images") or []):
+                for name, arr in dedup.items():
+                    value = arr[i]
+                    if value is not None:
+                        image[name] = value
+
+        return data
+
+
+@_deduplicate_interface("modules")
+class Modules:
+    @staticmethod
+    def encode(data):
+        return data, None
+
+    @staticmethod
+    def decode(dedup, data):
+        return dedup
+
+
+@_deduplicate_interface("sdk")
+class Sdk:
+    @staticmethod
+    def encode(data):
+        if not data or not data.get("packages"):
+            return {}, data
+
+        data = dict(data)
+        return {"packages": data.pop("packages")}, data
+
+    @staticmethod
+    def decode(dedup, data):
+        data = dict(data or {})
+        data["packages"] = dedup["packages"]
+        return data
+
+
+@_deduplicate_interface("breadcrumbs")
+class Breadcrumbs:
+    # Breadcrumbs of an event usually only differ from those of other events
+    # by their timestamps, which are therefore inlined.
+
+    @staticmethod
+    def encode(data):
+        if not data or not data.get("values"):
+            return {}, data
+
+        templates = []
+        timestamps = []
+        for crumb in data["values"]:
+            timestamp = None
+            if isinstance(crumb, dict) and crumb.get("timestamp") is not None:
+                crumb = dict(crumb)
+                timestamp = crumb.pop("timestamp")
+            templates.append(crumb)
+            timestamps.append(timestamp)
+
+        return {"values": templates}, dict(data, values=timestamps)
+
+    @staticmethod
+    def decode(dedup, data):
+        values = []
+        for crumb, timestamp in zip(dedup["values"], data["values"]):
+            if timestamp is not None:
+                crumb["timestamp"] = timestamp
+            values.append(crumb)
+
+        return dict(data, values=values)
+
+
+def get_checksum(serialized):
+    return hashlib.md5(serialized).hexdigest()
+
+
+def deduplicate(data):
+    """
+    Split the deduplicated parts off of `data`, which is not modified. Returns
+    the remaining data and the deduplicated parts by their checksums.
+    """
+    patchsets = []
+    extra_keys = {}
+
+    for key, interface in _INTERFACES.items():
+        if key not in data:
+            continue
+
+        to_deduplicate, to_inline = interface.encode(data[key])
+        if not to_deduplicate:
+            continue
+
+        to_deduplicate_serialized = _dumps(to_deduplicate).encode("utf8")
+        checksum = get_checksum(to_deduplicate_serialized)
+        extra_keys[checksum] = to_deduplicate
+        patchsets.append([key, checksum, to_inline])
+
+    if patchsets:
+        data = dict(data)
+        for key, _, _ in patchsets:
+            del data[key]
+        data[PATCHSETS_KEY] = patchsets
+
+    return data, extra_keys
+
+
+def get_checksums(data):
+    return [checksum for _, checksum, _ in data.get(PATCHSETS_KEY) or ()]
+
+
+def assemble(data, get_extra_keys):
+    """
+    Reverse `deduplicate`. `get_extra_keys` must return the deduplicated parts
+    of all checksums it is passed, or raise.
+    """
+    if not data.get(PATCHSETS_KEY):
+        return data
+
+    deduplicated_interfaces = get_extra_keys(get_checksums(data))
+
+    for key, checksum, inlined in data[PATCHSETS_KEY]:
+        data[key] = _INTERFACES[key].decode(deduplicated_interfaces[checksum], inlined)
+
+    del data[PATCHSETS_KEY]
+    return data
@@ -1,18 +1,44 @@
+import base64
 import logging
 import math
 import pickle
+import zlib
+from datetime import timedelta
 
+from django.db import connections, router
 from django.utils import timezone
 
+from sentry import options
 from sentry.db.models import create_or_update
-from sentry.nodestore.base import NodeStorage
-from sentry.utils.strings import compress, decompress
+from sentry.nodestore.base import (
+    CHUNK_NODE_ID_PREFIX,
+    ZSTD_DICTIONARY_FORMAT,
+    MissingZstdDictionary,
+    NodeStorage,
+)
+from sentry.utils.strings import compress
 
 from .models import Node
 
 logger = logging.getLogger("sentry")
 
 
+def compress_node(data):
+    # Nodes compressed with a zstd dictionary are only base64 encoded, as
+    # compressing them a second time with zlib does not save any space.
+    if data.startswith(ZSTD_DICTIONARY_FORMAT):
+        return base64.b64encode(data).decode("utf-8")
+    return compress(data)
+
+
+def decompress_node(value):
+    # zlib streams never start with the zstd dictionary format byte.
+    data = base64.b64decode(value)
+    if data.startswith(ZSTD_DICTIONARY_FORMAT):
+        return data
+    return zlib.decompress(data)
+
+
 class DjangoNodeStorage(NodeStorage):
     def delete(self, id):
         Node.objects.filter(id=id).delete()
@@ -23,13 +49,17 @@ class DjangoNodeStorage(NodeStorage):
             return None
 
         try:
-            if value.startswith(b"{"):
+            if value.startswith(b"{") or value.startswith(ZSTD_DICTIONARY_FORMAT):
                 return NodeStorage._decode(self, value, subkey=subkey)
 
             if subkey is None:
                 return pickle.loads(value)
 
             return None
+        except MissingZstdDictionary:
+            # Never pretend that nodes compressed with a missing dictionary
+            # are empty.
+            raise
         except Exception as e:
             logger.exception(e)
             return {}
@@ -37,19 +67,60 @@ class DjangoNodeStorage(NodeStorage):
     def _get_bytes(self, id):
         try:
             data = Node.objects.get(id=id).data
-            return decompress(data)
+            return decompress_node(data)
         except Node.DoesNotExist:
             return None
 
     def _get_bytes_multi(self, id_list):
-        return {n.id: decompress(n.data) for n in Node.objects.filter(id__in=id_list)}
+        return {n.id: decompress_node(n.data) for n in Node.objects.filter(id__in=id_list)}
 
     def delete_multi(self, id_list):
         Node.objects.filter(id__in=id_list).delete()
         self._delete_cache_items(id_list)
 
+    def _get_timestamp(self, id, now):
+        # Nodes are cleaned up by their timestamp. Deduplicated chunks are
+        # referenced by nodes written up to the refresh interval after them,
+        # so they are kept that much longer.
+        if id.startswith(CHUNK_NODE_ID_PREFIX):
+            return now + timedelta(seconds=options.get("nodestore.dedup-refresh-interval"))
+        return now
+
     def _set_bytes(self, id, data, ttl=None):
-        create_or_update(Node, id=id, values={"data": compress(data), "timestamp": timezone.now()})
+        create_or_update(
+            Node,
+            id=id,
+            values={
+                "data": compress_node(data),
+                "timestamp": self._get_timestamp(id, timezone.now()),
+            },
+        )
+
+    def _set_bytes_multi(self, items, ttl=None):
+        if len(items) == 1:
+            ((id, data),) = items.items()
+            return self._set_bytes(id, data, ttl=ttl)
+
+        connection = connections[router.db_for_write(Node)]
+        timestamp = timezone.now()
+
+        params = []
+        for id, data in items.items():
+            params.extend((id, compress_node(data), self._get_timestamp(id, timestamp)))
+
+        # Upsert all nodes with a single statement instead of one
+        # UPDATE (and potentially INSERT) per node.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {Node._meta.db_table} (id, data, timestamp)
+                VALUES {", ".join(["(%s, %s, %s)"] * len(items))}
+                ON CONFLICT (id) DO UPDATE SET
+                    data = EXCLUDED.data,
+                    timestamp = EXCLUDED.timestamp
+                """,
+                params,
+            )
 
     def cleanup(self, cutoff_timestamp):
         from sentry.db.deletion import BulkDeleteQuery
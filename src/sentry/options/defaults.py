@@ -57,6 +57,9 @@ register(
     default=1024 * 1024 * 1024,
     flags=FLAG_PRIORITIZE_DISK,
 )
+# The total size of the files whose parsed source views and source maps are
+# kept in memory by every JavaScript processing worker.
+register("sourcemaps.view-cache-size", type=Int, default=64 * 1024 * 1024)
 
 
 # Mail
@@ -281,6 +284,17 @@ register("outcomes.tsdb-in-consumer-sample-rate", default=0.0)  # unused
 register("nodedata.cache-sample-rate", default=0.0, flags=FLAG_PRIORITIZE_DISK)
 register("nodedata.cache-on-save", default=False, flags=FLAG_PRIORITIZE_DISK)
 
+# Maps platforms to the ids of trained zstd dictionaries that are used to
+# compress new nodes, see `sentry nodestore train-dictionary`.
+register("nodestore.zstd-dictionaries", type=Dict, default={}, flags=FLAG_PRIORITIZE_DISK)
+
+# Store parts of nodes that repeat across events only once, see
+# `sentry.nodestore.compressor`. Deduplicated chunks are kept for the refresh
+# interval (in seconds) longer than the nodes referencing them, and rewritten
+# at the latest after the interval to extend their lifetime.
+register("nodestore.dedup-interfaces", default=False, flags=FLAG_PRIORITIZE_DISK)
+register("nodestore.dedup-refresh-interval", default=3600, flags=FLAG_PRIORITIZE_DISK)
+
 # Use nodestore for eventstore.get_events
 register("eventstore.use-nodestore", default=False, flags=FLAG_PRIORITIZE_DISK)
 
@@ -365,6 +379,9 @@ register("eventstream:kafka-headers", default=False)
 register("post-process-forwarder:kafka-headers", default=False)
 # Number of threads to use for post processing
 register("post-process-forwarder:concurrency", default=1)
+# Submit one post_process_group_batch task per project and batch instead of
+# one post_process_group task per event
+register("post-process-forwarder:batch-tasks", default=False)
 
 # Subscription queries sampling rate
 register("subscriptions-query.sample-rate", default=0.01)
@@ -374,3 +391,16 @@ register("subscriptions-query.sample-rate", default=0.01)
 # This is to allow gradual rollout of metrics collection for symbolication requests and can be
 # removed once it is fully rolled out.
 register("symbolicate-event.low-priority.metrics.submission-rate", default=0.0)
+
+# Assign projects to the low priority symbolication queue based on the metrics above, in addition
+# to the `store.symbolicate-event-lpq-*` killswitches.
+register("symbolicate-event.low-priority.auto-routing", default=False)
+# The number of seconds of metrics that projects are scored on.
+register("symbolicate-event.low-priority.window", default=300)
+# Projects are demoted once their rate of events (per second) or their 90th percentile of
+# symbolication times (in seconds) exceeds these limits...
+register("symbolicate-event.low-priority.demote-rate", default=50.0)
+register("symbolicate-event.low-priority.demote-duration", default=60)
+# ...and promoted once both are below these, which should be well below the limits.
+register("symbolicate-event.low-priority.promote-rate", default=25.0)
+register("symbolicate-event.low-priority.promote-duration", default=30)
@@ -1,6 +1,6 @@
 import operator
 import re
-from collections import namedtuple
+from collections import OrderedDict, defaultdict, namedtuple
 from functools import reduce
 from typing import Iterable, List, Mapping, Pattern, Tuple
 
@@ -119,12 +119,7 @@ class Matcher(namedtuple("Matcher", "type pattern")):
         return url and glob_match(url, self.pattern, ignorecase=True)
 
     def test_frames(self, data, keys):
-        for frame in _iter_frames(data):
-            value = next((frame.get(key) for key in keys if frame.get(key)), None)
-
-            if not value:
-                continue
-
+        for value in _iter_frame_values(data, keys):
             if glob_match(value, self.pattern, ignorecase=True, path_normalize=True):
                 return True
 
@@ -145,13 +140,7 @@ class Matcher(namedtuple("Matcher", "type pattern")):
         https://docs.github.com/en/github/creating-cloning-and-archiving-repositories/creating-a-repository-on-github/about-code-owners
         """
         spec = _path_to_regex(self.pattern)
-        keys = ["filename", "abs_path"]
-        for frame in _iter_frames(data):
-            value = next((frame.get(key) for key in keys if frame.get(key)), None)
-
-            if not value:
-                continue
-
+        for value in _iter_frame_values(data, ["filename", "abs_path"]):
             if spec.search(value):
                 return True
 
@@ -339,6 +328,177 @@ def _iter_frames(data):
             continue
 
 
+def _iter_frame_values(data, keys):
+    """Yields the first non-empty value of the given keys of every frame."""
+    for frame in _iter_frames(data):
+        value = next((frame.get(key) for key in keys if frame.get(key)), None)
+        if value:
+            yield value
+
+
+# Characters with a special meaning in glob patterns. Patterns without them
+# only match values equal to the pattern.
+GLOB_CHARS = frozenset("*?[]{}\\")
+
+
+class _PathTrieNode:
+    __slots__ = ("children", "rules")
+
+    def __init__(self):
+        self.children = {}
+        # (rule index, matches_dir) pairs of the patterns ending at this node.
+        self.rules = []
+
+
+class OwnershipIndex:
+    """
+    A compiled list of ownership rules, which finds the rules matching an event
+    without testing every rule against every frame:
+
+    - `codeowners` patterns without wildcards are looked up segment by segment,
+      in a trie for anchored patterns and in a map of names for floating ones.
+    - `tags.*` patterns without wildcards are looked up in a map of tag values.
+    - All other patterns are matched as before, but every distinct matcher is
+      tested only once, against frame values collected once per event.
+
+    `test` returns the same rules, in the same order, as testing every rule.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self._path_trie = _PathTrieNode()
+        self._path_names = defaultdict(list)
+        self._tags = defaultdict(list)
+        self._matchers = defaultdict(list)
+        self._codeowners_regexes = {}
+
+        for index, rule in enumerate(rules):
+            matcher = rule.matcher
+            if matcher.type == CODEOWNERS and self._add_codeowners(index, matcher.pattern):
+                continue
+            if matcher.type.startswith("tags.") and not GLOB_CHARS.intersection(matcher.pattern):
+                self._tags[matcher.type[5:], matcher.pattern].append(index)
+                continue
+            if matcher.type == CODEOWNERS and matcher.pattern not in self._codeowners_regexes:
+                self._codeowners_regexes[matcher.pattern] = _path_to_regex(matcher.pattern)
+            self._matchers[matcher].append(index)
+
+    def _add_codeowners(self, index, pattern):
+        """
+        Adds a `codeowners` pattern without wildcards to the lookup tables, see
+        `_path_to_regex` for the semantics this mirrors. Returns False for
+        patterns that have to be matched with a regex.
+        """
+        if "*" in pattern or "?" in pattern or pattern.startswith("\\"):
+            return False
+
+        slash_pos = pattern.find("/")
+        anchored = slash_pos > -1 and slash_pos != len(pattern) - 1
+        matches_dir = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        if not pattern:
+            return False
+
+        if not anchored:
+            self._path_names[pattern].append((index, matches_dir))
+            return True
+
+        # Anchored patterns starting with a slash also match paths without one.
+        paths = [pattern.split("/")]
+        if pattern.startswith("/"):
+            paths.append(pattern[1:].split("/"))
+
+        for segments in paths:
+            node = self._path_trie
+            for segment in segments:
+                node = node.children.setdefault(segment, _PathTrieNode())
+            node.rules.append((index, matches_dir))
+
+        return True
+
+    def _match_codeowners(self, value, matched):
+        segments = value.split("/")
+
+        # A pattern matches a name or a path prefix followed by the end of the
+        # value, or by a slash. Directory patterns need the slash.
+        last = len(segments) - 1
+        for position, segment in enumerate(segments):
+            for index, matches_dir in self._path_names.get(segment, ()):
+                if not matches_dir or position < last:
+                    matched.add(index)
+
+        node = self._path_trie
+        for position, segment in enumerate(segments):
+            node = node.children.get(segment)
+            if node is None:
+                break
+            for index, matches_dir in node.rules:
+                if not matches_dir or position < last:
+                    matched.add(index)
+
+    def test(self, data):
+        matched = set()
+
+        paths = set(_iter_frame_values(data, ["filename", "abs_path"]))
+        if self._path_names or self._path_trie.children:
+            for value in paths:
+                self._match_codeowners(value, matched)
+
+        if self._tags:
+            for k, v in get_path(data, "tags", filter=True) or ():
+                matched.update(self._tags.get((k, v), ()))
+
+        modules = None
+        for matcher, indexes in self._matchers.items():
+            if matcher.type == CODEOWNERS:
+                spec = self._codeowners_regexes[matcher.pattern]
+                passed = any(spec.search(value) for value in paths)
+            elif matcher.type == PATH:
+                passed = any(
+                    glob_match(value, matcher.pattern, ignorecase=True, path_normalize=True)
+                    for value in paths
+                )
+            elif matcher.type == MODULE:
+                if modules is None:
+                    modules = set(_iter_frame_values(data, ["module"]))
+                passed = any(
+                    glob_match(value, matcher.pattern, ignorecase=True, path_normalize=True)
+                    for value in modules
+                )
+            else:
+                passed = matcher.test(data)
+
+            if passed:
+                matched.update(indexes)
+
+        return [self.rules[index] for index in sorted(matched)]
+
+
+# The maximum number of compiled ownership indexes kept in memory.
+OWNERSHIP_INDEX_CACHE_SIZE = 1000
+
+_ownership_indexes = OrderedDict()
+
+
+def get_ownership_index(key, schema):
+    """
+    Returns the `OwnershipIndex` of a schema. The index compiled for `key` is
+    reused in this process as long as the schema it was compiled from is equal.
+    """
+    cached = _ownership_indexes.get(key)
+    if cached is not None and cached[0] == schema:
+        _ownership_indexes.move_to_end(key)
+        return cached[1]
+
+    index = OwnershipIndex(load_schema(schema))
+    _ownership_indexes[key] = (schema, index)
+    _ownership_indexes.move_to_end(key)
+    while len(_ownership_indexes) > OWNERSHIP_INDEX_CACHE_SIZE:
+        _ownership_indexes.popitem(last=False)
+
+    return index
+
+
 def parse_rules(data):
     """Convert a raw text input into a Rule tree"""
     tree = ownership_grammar.parse(data)
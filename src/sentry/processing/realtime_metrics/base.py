@@ -1,10 +1,37 @@
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple
+
 from sentry.utils.services import Service
 
 
+class BucketedCount(NamedTuple):
+    """The count of events in the time-window bucket starting at "timestamp"."""
+
+    timestamp: int
+    count: int
+
+
+def bucket_range(start: int, end: int, bucket_size: int) -> List[int]:
+    """Returns the timestamps of all buckets of "bucket_size" that overlap with "start" to "end"."""
+    return list(range(start - start % bucket_size, end + 1, bucket_size))
+
+
 class RealtimeMetricsStore(Service):  # type: ignore
     """A service for storing metrics about incoming requests within a given time window."""
 
-    __all__ = ("increment_project_event_counter", "increment_project_duration_counter", "validate")
+    __all__ = (
+        "increment_project_event_counter",
+        "increment_project_duration_counter",
+        "increment_multi",
+        "projects",
+        "get_counts_timeseries",
+        "get_counts_timeseries_multi",
+        "get_durations_histogram",
+        "get_durations_histogram_multi",
+        "get_lpq_projects",
+        "add_project_to_lpq",
+        "remove_projects_from_lpq",
+        "validate",
+    )
 
     def increment_project_event_counter(self, project_id: int, timestamp: int) -> None:
         """Increment the event counter for the given project_id.
@@ -26,3 +53,61 @@ class RealtimeMetricsStore(Service):  # type: ignore
         the time of the event in seconds since the UNIX epoch and "duration" the processing time in seconds.
         """
         pass
+
+    def increment_multi(
+        self,
+        events: Iterable[Tuple[int, int]] = (),
+        durations: Iterable[Tuple[int, int, int]] = (),
+    ) -> None:
+        """Increments the event and duration counters of any number of projects at once.
+
+        "events" are (project_id, timestamp) pairs and "durations" are (project_id, timestamp,
+        duration) triples, which are counted like by "increment_project_event_counter" and
+        "increment_project_duration_counter" respectively.
+        """
+        pass
+
+    def projects(self) -> Iterable[int]:
+        """Returns the IDs of all projects whose event counters have been incremented recently."""
+        return []
+
+    def get_counts_timeseries(self, project_id: int, start: int, end: int) -> List[BucketedCount]:
+        """Returns the event counts of the given project_id from "start" to "end".
+
+        The counts are returned per time-window bucket, ordered by timestamp, for every bucket
+        that overlaps with the range. Buckets without events have a count of 0.
+        """
+        return []
+
+    def get_counts_timeseries_multi(
+        self, project_ids: Iterable[int], start: int, end: int
+    ) -> Dict[int, List[BucketedCount]]:
+        """Like "get_counts_timeseries", but for any number of projects at once."""
+        return {project_id: [] for project_id in project_ids}
+
+    def get_durations_histogram(self, project_id: int, start: int, end: int) -> Dict[int, int]:
+        """Returns the processing time histogram of the given project_id from "start" to "end".
+
+        The histogram maps processing times, rounded down to 10 seconds, to the number of
+        events that took that long, summed up over all time-window buckets that overlap with
+        the range.
+        """
+        return {}
+
+    def get_durations_histogram_multi(
+        self, project_ids: Iterable[int], start: int, end: int
+    ) -> Dict[int, Dict[int, int]]:
+        """Like "get_durations_histogram", but for any number of projects at once."""
+        return {project_id: {} for project_id in project_ids}
+
+    def get_lpq_projects(self) -> Set[int]:
+        """Returns the IDs of all projects that are assigned to the low priority queue."""
+        return set()
+
+    def add_project_to_lpq(self, project_id: int) -> None:
+        """Assigns the given project_id to the low priority queue."""
+        pass
+
+    def remove_projects_from_lpq(self, project_ids: Set[int]) -> None:
+        """Removes the given project_ids from the low priority queue."""
+        pass
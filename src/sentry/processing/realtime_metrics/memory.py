@@ -0,0 +1,120 @@
+import datetime
+import time
+from collections import defaultdict
+from typing import DefaultDict, Dict, Iterable, List, Set, Tuple
+
+from sentry.exceptions import InvalidConfiguration
+
+from . import base
+
+
+class MemoryRealtimeMetricsStore(base.RealtimeMetricsStore):
+    """An implementation of RealtimeMetricsStore that keeps all metrics in process memory.
+
+    This behaves like RedisRealtimeMetricsStore, except that entries never expire: "projects"
+    drops projects only based on the time of their last event. It is meant for tests and
+    development setups that do not need to share metrics between processes.
+    """
+
+    def __init__(
+        self,
+        counter_bucket_size: int = 10,
+        counter_ttl: datetime.timedelta = datetime.timedelta(seconds=300),
+        histogram_bucket_size: int = 10,
+        histogram_ttl: datetime.timedelta = datetime.timedelta(seconds=300),
+        **kwargs: object,
+    ) -> None:
+        self._counter_bucket_size = counter_bucket_size
+        self._counter_ttl = counter_ttl.total_seconds()
+        self._histogram_bucket_size = histogram_bucket_size
+        self._histogram_ttl = histogram_ttl.total_seconds()
+
+        self._counters: DefaultDict[Tuple[int, int], int] = defaultdict(int)
+        self._histograms: DefaultDict[Tuple[int, int], DefaultDict[int, int]] = defaultdict(
+            lambda: defaultdict(int)
+        )
+        self._last_seen: Dict[int, int] = {}
+        self._lpq_projects: Set[int] = set()
+
+    def validate(self) -> None:
+        if self._counter_bucket_size <= 0:
+            raise InvalidConfiguration("counter bucket size must be at least 1")
+
+        if self._histogram_bucket_size <= 0:
+            raise InvalidConfiguration("histogram bucket size must be at least 1")
+
+    def increment_project_event_counter(self, project_id: int, timestamp: int) -> None:
+        self.increment_multi(events=[(project_id, timestamp)])
+
+    def increment_project_duration_counter(
+        self, project_id: int, timestamp: int, duration: int
+    ) -> None:
+        self.increment_multi(durations=[(project_id, timestamp, duration)])
+
+    def increment_multi(
+        self,
+        events: Iterable[Tuple[int, int]] = (),
+        durations: Iterable[Tuple[int, int, int]] = (),
+    ) -> None:
+        for project_id, timestamp in events:
+            bucket_timestamp = timestamp - timestamp % self._counter_bucket_size
+            self._counters[project_id, bucket_timestamp] += 1
+            self._last_seen[project_id] = max(timestamp, self._last_seen.get(project_id, timestamp))
+
+        for project_id, timestamp, duration in durations:
+            bucket_timestamp = timestamp - timestamp % self._histogram_bucket_size
+            self._histograms[project_id, bucket_timestamp][duration - duration % 10] += 1
+
+    def projects(self) -> Iterable[int]:
+        expired_before = time.time() - self._counter_ttl
+        for project_id, timestamp in list(self._last_seen.items()):
+            if timestamp < expired_before:
+                del self._last_seen[project_id]
+
+        return list(self._last_seen)
+
+    def get_counts_timeseries(
+        self, project_id: int, start: int, end: int
+    ) -> List[base.BucketedCount]:
+        return self.get_counts_timeseries_multi([project_id], start, end)[project_id]
+
+    def get_counts_timeseries_multi(
+        self, project_ids: Iterable[int], start: int, end: int
+    ) -> Dict[int, List[base.BucketedCount]]:
+        timestamps = base.bucket_range(start, end, self._counter_bucket_size)
+        return {
+            project_id: [
+                base.BucketedCount(
+                    timestamp=timestamp, count=self._counters.get((project_id, timestamp), 0)
+                )
+                for timestamp in timestamps
+            ]
+            for project_id in project_ids
+        }
+
+    def get_durations_histogram(self, project_id: int, start: int, end: int) -> Dict[int, int]:
+        return self.get_durations_histogram_multi([project_id], start, end)[project_id]
+
+    def get_durations_histogram_multi(
+        self, project_ids: Iterable[int], start: int, end: int
+    ) -> Dict[int, Dict[int, int]]:
+        timestamps = base.bucket_range(start, end, self._histogram_bucket_size)
+
+        histograms: Dict[int, Dict[int, int]] = {}
+        for project_id in project_ids:
+            histogram: DefaultDict[int, int] = defaultdict(int)
+            for timestamp in timestamps:
+                for duration, count in self._histograms.get((project_id, timestamp), {}).items():
+                    histogram[duration] += count
+            histograms[project_id] = dict(histogram)
+
+        return histograms
+
+    def get_lpq_projects(self) -> Set[int]:
+        return set(self._lpq_projects)
+
+    def add_project_to_lpq(self, project_id: int) -> None:
+        self._lpq_projects.add(project_id)
+
+    def remove_projects_from_lpq(self, project_ids: Set[int]) -> None:
+        self._lpq_projects -= project_ids
@@ -1,4 +1,7 @@
 import datetime
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
 
 from sentry.exceptions import InvalidConfiguration
 from sentry.utils import redis
@@ -34,6 +37,8 @@ class RedisRealtimeMetricsStore(base.RealtimeMetricsStore):
         self._histogram_bucket_size = histogram_bucket_size
         self._histogram_ttl = int(histogram_ttl / datetime.timedelta(milliseconds=1))
         self._prefix = "symbolicate_event_low_priority"
+        self._projects_key = f"{self._prefix}:projects"
+        self._lpq_key = f"{self._prefix}:lpq_projects"
 
     def validate(self) -> None:
         if self._counter_bucket_size <= 0:
@@ -50,16 +55,7 @@ class RedisRealtimeMetricsStore(base.RealtimeMetricsStore):
         time-window bucket with "timestamp" providing the time of the event
         in seconds since the UNIX epoch (i.e., as returned by time.time()).
         """
-
-        if self._counter_bucket_size > 1:
-            timestamp -= timestamp % self._counter_bucket_size
-
-        key = f"{self._prefix}:counter:{self._counter_bucket_size}:{project_id}:{timestamp}"
-
-        with self.cluster.pipeline() as pipeline:
-            pipeline.incr(key)
-            pipeline.pexpire(key, self._counter_ttl)
-            pipeline.execute()
+        self.increment_multi(events=[(project_id, timestamp)])
 
     def increment_project_duration_counter(
         self, project_id: int, timestamp: int, duration: int
@@ -70,13 +66,150 @@ class RedisRealtimeMetricsStore(base.RealtimeMetricsStore):
         Calling this increments the counter of the current time-window bucket with "timestamp" providing
         the time of the event in seconds since the UNIX epoch and "duration" the processing time in seconds.
         """
-        if self._histogram_bucket_size > 1:
-            timestamp -= timestamp % self._histogram_bucket_size
+        self.increment_multi(durations=[(project_id, timestamp, duration)])
+
+    def increment_multi(
+        self,
+        events: Iterable[Tuple[int, int]] = (),
+        durations: Iterable[Tuple[int, int, int]] = (),
+    ) -> None:
+        """Increments the event and duration counters of any number of projects at once.
 
-        key = f"{self._prefix}:histogram:{self._histogram_bucket_size}:{project_id}:{timestamp}"
-        duration -= duration % 10
+        "events" are (project_id, timestamp) pairs and "durations" are (project_id, timestamp,
+        duration) triples, which are counted like by "increment_project_event_counter" and
+        "increment_project_duration_counter" respectively. All counters are updated with a
+        single pipeline, in which every counter is incremented once.
+        """
+        counters: Dict[str, int] = defaultdict(int)
+        last_seen: Dict[int, int] = {}
+        for project_id, timestamp in events:
+            bucket_timestamp = timestamp - timestamp % self._counter_bucket_size
+            counters[self._counter_key(project_id, bucket_timestamp)] += 1
+            last_seen[project_id] = max(timestamp, last_seen.get(project_id, timestamp))
+
+        histograms: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        for project_id, timestamp, duration in durations:
+            bucket_timestamp = timestamp - timestamp % self._histogram_bucket_size
+            key = self._histogram_key(project_id, bucket_timestamp)
+            histograms[key][duration - duration % 10] += 1
+
+        if not counters and not histograms:
+            return
 
         with self.cluster.pipeline() as pipeline:
-            pipeline.hincrby(key, duration, 1)
-            pipeline.pexpire(key, self._histogram_ttl)
+            for key, count in counters.items():
+                pipeline.incrby(key, count)
+                pipeline.pexpire(key, self._counter_ttl)
+
+            for key, histogram in histograms.items():
+                for duration, count in histogram.items():
+                    pipeline.hincrby(key, duration, count)
+                pipeline.pexpire(key, self._histogram_ttl)
+
+            if last_seen:
+                pipeline.zadd(self._projects_key, last_seen)
+
             pipeline.execute()
+
+    def _counter_key(self, project_id: int, timestamp: int) -> str:
+        return f"{self._prefix}:counter:{self._counter_bucket_size}:{project_id}:{timestamp}"
+
+    def _histogram_key(self, project_id: int, timestamp: int) -> str:
+        return f"{self._prefix}:histogram:{self._histogram_bucket_size}:{project_id}:{timestamp}"
+
+    def projects(self) -> Iterable[int]:
+        """Returns the IDs of all projects whose event counters have been incremented recently.
+
+        Projects are forgotten once their last event counter has expired.
+        """
+        expired_before = int(time.time() - self._counter_ttl / 1000)
+
+        with self.cluster.pipeline() as pipeline:
+            pipeline.zremrangebyscore(self._projects_key, "-inf", f"({expired_before}")
+            pipeline.zrange(self._projects_key, 0, -1)
+            _, project_ids = pipeline.execute()
+
+        return [int(project_id) for project_id in project_ids]
+
+    def get_counts_timeseries(
+        self, project_id: int, start: int, end: int
+    ) -> List[base.BucketedCount]:
+        """Returns the event counts of the given project_id from "start" to "end".
+
+        The counts are returned per time-window bucket, ordered by timestamp, for every bucket
+        that overlaps with the range. Buckets without events have a count of 0.
+        """
+        return self.get_counts_timeseries_multi([project_id], start, end)[project_id]
+
+    def get_counts_timeseries_multi(
+        self, project_ids: Iterable[int], start: int, end: int
+    ) -> Dict[int, List[base.BucketedCount]]:
+        """Like "get_counts_timeseries", but for any number of projects at once.
+
+        All counters are read with a single MGET.
+        """
+        project_ids = list(project_ids)
+        timestamps = base.bucket_range(start, end, self._counter_bucket_size)
+
+        keys = [
+            self._counter_key(project_id, timestamp)
+            for project_id in project_ids
+            for timestamp in timestamps
+        ]
+        counts = iter(self.cluster.mget(keys) if keys else ())
+
+        return {
+            project_id: [
+                base.BucketedCount(timestamp=timestamp, count=int(next(counts) or 0))
+                for timestamp in timestamps
+            ]
+            for project_id in project_ids
+        }
+
+    def get_durations_histogram(self, project_id: int, start: int, end: int) -> Dict[int, int]:
+        """Returns the processing time histogram of the given project_id from "start" to "end".
+
+        The histogram maps processing times, rounded down to 10 seconds, to the number of
+        events that took that long, summed up over all time-window buckets that overlap with
+        the range.
+        """
+        return self.get_durations_histogram_multi([project_id], start, end)[project_id]
+
+    def get_durations_histogram_multi(
+        self, project_ids: Iterable[int], start: int, end: int
+    ) -> Dict[int, Dict[int, int]]:
+        """Like "get_durations_histogram", but for any number of projects at once.
+
+        All histograms are read with a single pipeline of HGETALLs.
+        """
+        project_ids = list(project_ids)
+        timestamps = base.bucket_range(start, end, self._histogram_bucket_size)
+
+        with self.cluster.pipeline() as pipeline:
+            for project_id in project_ids:
+                for timestamp in timestamps:
+                    pipeline.hgetall(self._histogram_key(project_id, timestamp))
+            buckets = iter(pipeline.execute())
+
+        histograms: Dict[int, Dict[int, int]] = {}
+        for project_id in project_ids:
+            histogram = histograms[project_id] = defaultdict(int)
+            for _ in timestamps:
+                for duration, count in next(buckets).items():
+                    histogram[int(duration)] += int(count)
+            histograms[project_id] = dict(histogram)
+
+        return histograms
+
+    def get_lpq_projects(self) -> Set[int]:
+        """Returns the IDs of all projects that are assigned to the low priority queue."""
+        return {int(project_id) for project_id in self.cluster.smembers(self._lpq_key)}
+
+    def add_project_to_lpq(self, project_id: int) -> None:
+        """Assigns the given project_id to the low priority queue."""
+        self.cluster.sadd(self._lpq_key, project_id)
+
+    def remove_projects_from_lpq(self, project_ids: Set[int]) -> None:
+        """Removes the given project_ids from the low priority queue."""
+        if project_ids:
+            self.cluster.srem(self._lpq_key, *project_ids)
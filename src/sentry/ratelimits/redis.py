@@ -1,3 +1,4 @@
+from threading import Lock
 from time import time
 
 from redis.exceptions import RedisError
@@ -6,7 +7,9 @@ from sentry_sdk import capture_exception
 from sentry.exceptions import InvalidConfiguration
 from sentry.ratelimits.base import RateLimiter
 from sentry.utils.hashlib import md5_text
-from sentry.utils.redis import get_cluster_from_options
+from sentry.utils.redis import get_cluster_from_options, load_script
+
+sliding_window = load_script("ratelimits/sliding_window.lua")
 
 
 class RedisRateLimiter(RateLimiter):
@@ -44,3 +47,100 @@ class RedisRateLimiter(RateLimiter):
             # can't be updated. We do want to know when that happens.
             capture_exception(e)
             return False
+
+
+class Lease:
+    def __init__(self, tokens, expires_at, limited=False):
+        self.tokens = tokens
+        self.expires_at = expires_at
+        self.limited = limited
+
+
+class LeasedRedisRateLimiter(RedisRateLimiter):
+    """
+    A sliding window rate limiter that leases blocks of tokens from Redis
+    into the local process, and decides locally until the lease is used up or
+    expires. Denials are cached locally for the same time.
+
+    Tokens of a lease count as used as soon as they are leased, so a key can
+    be limited early by up to ``lease_size - 1`` tokens per process. Leasing
+    can be configured per key prefix, the longest matching prefix wins::
+
+        SENTRY_RATELIMITER_OPTIONS = {
+            "lease_size": 1,
+            "lease_ttl": 1,
+            "prefixes": {
+                "plugin-notify:": {"lease_size": 5, "lease_ttl": 10},
+            },
+        }
+
+    With a lease size of 1, every call that is not denied locally goes to
+    Redis.
+    """
+
+    # The number of local leases after which expired ones are dropped.
+    max_leases = 10000
+
+    def __init__(self, lease_size=1, lease_ttl=1.0, prefixes=None, **options):
+        super().__init__(**options)
+        self.lease_size = lease_size
+        self.lease_ttl = lease_ttl
+        self.prefixes = sorted((prefixes or {}).items(), key=lambda item: -len(item[0]))
+        self._leases = {}
+        self._lock = Lock()
+
+    def _get_lease_config(self, key):
+        for prefix, config in self.prefixes:
+            if key.startswith(prefix):
+                return (
+                    config.get("lease_size", self.lease_size),
+                    config.get("lease_ttl", self.lease_ttl),
+                )
+        return self.lease_size, self.lease_ttl
+
+    def _acquire_lease(self, key, limit, window, now, requested):
+        bucket = int(now / window)
+        keys = [f"{key}:{bucket}", f"{key}:{bucket - 1}"]
+        args = [limit, window, now - bucket * window, requested]
+
+        client = self.cluster.get_local_client_for_key(key)
+        return int(sliding_window(client, keys, args))
+
+    def is_limited(self, key, limit, project=None, window=None):
+        if window is None:
+            window = self.window
+
+        lease_size, lease_ttl = self._get_lease_config(key)
+
+        key_hex = md5_text(key).hexdigest()
+        if project:
+            key = f"rll:{key_hex}:{project.id}:{window}"
+        else:
+            key = f"rll:{key_hex}:{window}"
+
+        now = time()
+        with self._lock:
+            lease = self._leases.get(key)
+            if lease is not None and lease.expires_at > now:
+                if lease.limited:
+                    return True
+                if lease.tokens:
+                    lease.tokens -= 1
+                    return False
+
+        try:
+            granted = self._acquire_lease(key, limit, window, now, max(min(lease_size, limit), 1))
+        except RedisError as e:
+            # We don't want rate limited endpoints to fail when ratelimits
+            # can't be updated. We do want to know when that happens.
+            capture_exception(e)
+            return False
+
+        with self._lock:
+            if len(self._leases) >= self.max_leases:
+                self._leases = {k: v for k, v in self._leases.items() if v.expires_at > now}
+
+            # One of the granted tokens is used right away.
+            self._leases[key] = Lease(max(granted - 1, 0), now + lease_ttl, limited=not granted)
+
+        return not granted
@@ -2,7 +2,7 @@ from sentry.utils.services import Service
 
 
 class ProjectConfigCache(Service):
-    __all__ = ("set_many", "delete_many", "get")
+    __all__ = ("set_many", "set_many_serialized", "delete_many", "get", "get_many_serialized")
 
     def __init__(self, **options):
         pass
@@ -10,8 +10,21 @@ class ProjectConfigCache(Service):
     def set_many(self, configs):
         pass
 
+    def set_many_serialized(self, configs):
+        """
+        Like `set_many`, but takes configs that have already been serialized to
+        JSON.
+        """
+
     def delete_many(self, project_ids):
         pass
 
     def get(self, project_id):
         raise NotImplementedError()
+
+    def get_many_serialized(self, keys):
+        """
+        Returns the cached configs of the given keys as serialized JSON
+        bytes, leaving out keys that are not cached.
+        """
+        return {}
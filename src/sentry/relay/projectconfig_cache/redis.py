@@ -25,6 +25,11 @@ class RedisProjectConfigCache(ProjectConfigCache):
             return self.cluster.get_local_client_for_key(routing_key)
 
     def set_many(self, configs):
+        self.set_many_serialized(
+            {project_id: json.dumps(config) for project_id, config in configs.items()}
+        )
+
+    def set_many_serialized(self, configs):
         for project_id, config in configs.items():
             # XXX(markus): Figure out how to do pipelining here. We may have
             # multiple routing keys (-> multiple clients).
@@ -34,7 +39,7 @@ class RedisProjectConfigCache(ProjectConfigCache):
 
             key = self.__get_redis_key(project_id)
             client = self.__get_redis_client(key)
-            client.setex(key, REDIS_CACHE_TIMEOUT, json.dumps(config))
+            client.setex(key, REDIS_CACHE_TIMEOUT, config)
 
     def delete_many(self, project_ids):
         for project_id in project_ids:
@@ -55,3 +60,21 @@ class RedisProjectConfigCache(ProjectConfigCache):
         if rv is not None:
             return json.loads(rv)
         return None
+
+    def get_many_serialized(self, keys):
+        keys = list(keys)
+        redis_keys = [self.__get_redis_key(key) for key in keys]
+
+        if self.is_redis_cluster:
+            values = self.cluster.mget(redis_keys)
+        else:
+            with self.cluster.map() as client:
+                promises = [client.get(redis_key) for redis_key in redis_keys]
+            values = [promise.value for promise in promises]
+
+        rv = {}
+        for key, value in zip(keys, values):
+            if value is not None:
+                # Redis Cluster clients decode responses.
+                rv[key] = value.encode("utf8") if isinstance(value, str) else value
+        return rv
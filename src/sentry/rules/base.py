@@ -47,6 +47,9 @@ class RuleDescriptor(type):
 class RuleBase(metaclass=RuleDescriptor):
     label = None
     form_cls = None
+    # Whether evaluating the rule needs to query a data store. The rule processor
+    # evaluates cheap conditions and filters of a rule first.
+    is_expensive = False
 
     logger = logging.getLogger("sentry.rules")
 
@@ -85,8 +88,18 @@ class RuleBase(metaclass=RuleDescriptor):
 
 
 class EventState:
-    def __init__(self, is_new, is_regression, is_new_group_environment, has_reappeared):
+    def __init__(
+        self,
+        is_new,
+        is_regression,
+        is_new_group_environment,
+        has_reappeared,
+        frequency_query_planner=None,
+    ):
         self.is_new = is_new
         self.is_regression = is_regression
         self.is_new_group_environment = is_new_group_environment
         self.has_reappeared = has_reappeared
+        # A `FrequencyQueryPlanner` shared by the frequency conditions of all
+        # rules evaluated for the event, if any.
+        self.frequency_query_planner = frequency_query_planner
@@ -76,10 +76,46 @@ class EventFrequencyForm(forms.Form):
             return
 
 
+class FrequencyQueryPlanner:
+    """
+    Shares the TSDB reads of the frequency conditions evaluated for one event, so
+    that conditions of different rules asking for the same model, time window and
+    environment only query it once. All windows end at the same time, `end`, so
+    that equal intervals of different rules line up.
+
+    Reads are only issued once a condition needing them is evaluated, so rules
+    that are rejected by their cheaper conditions first never query TSDB.
+    """
+
+    def __init__(self, end=None):
+        self.tsdb = tsdb
+        self.end = end or timezone.now()
+        self._results = {}
+
+    def get(self, method, model, key, start, end, environment_id):
+        lookup = (method, model, start, end, environment_id, key)
+        try:
+            return self._results[lookup]
+        except KeyError:
+            pass
+
+        rv = self._results[lookup] = getattr(self.tsdb, method)(
+            model=model,
+            keys=[key],
+            start=start,
+            end=end,
+            environment_id=environment_id,
+            use_cache=True,
+        )[key]
+        metrics.incr("rules.conditions.frequency_planner.reads")
+        return rv
+
+
 class BaseEventFrequencyCondition(EventCondition):
     intervals = standard_intervals
     form_cls = EventFrequencyForm
     label = NotImplemented  # subclass must implement
+    is_expensive = True
 
     def __init__(self, *args, **kwargs):
         self.tsdb = kwargs.pop("tsdb", tsdb)
@@ -109,11 +145,18 @@ class BaseEventFrequencyCondition(EventCondition):
         if not interval:
             return False
 
-        current_value = self.get_rate(event, interval, self.rule.environment_id)
+        current_value = self.get_rate(
+            event, interval, self.rule.environment_id, planner=state.frequency_query_planner
+        )
         return current_value > value
 
-    def query(self, event, start, end, environment_id):
-        query_result = self.query_hook(event, start, end, environment_id)
+    def query(self, event, start, end, environment_id, planner=None):
+        lookup = self.get_tsdb_lookup()
+        if planner is not None and planner.tsdb is self.tsdb and lookup is not None:
+            method, model = lookup
+            query_result = planner.get(method, model, event.group_id, start, end, environment_id)
+        else:
+            query_result = self.query_hook(event, start, end, environment_id)
         metrics.incr(
             "rules.conditions.queried_snuba",
             tags={
@@ -127,19 +170,43 @@ class BaseEventFrequencyCondition(EventCondition):
         """ """
         raise NotImplementedError  # subclass must implement
 
-    def get_rate(self, event, interval, environment_id):
+    def get_tsdb_lookup(self):
+        """
+        Returns the TSDB method and model that `query_hook` reads the frequency
+        of a group from, if it is a plain TSDB read that can be batched.
+        """
+        return None
+
+    def get_windows(self, interval, end):
+        """
+        Returns the time windows to query, the comparison window last if the
+        condition compares against an earlier period.
+        """
         _, duration = self.intervals[interval]
-        end = timezone.now()
-        result = self.query(event, end - duration, end, environment_id=environment_id)
+        windows = [(end - duration, end)]
         comparison_type = self.get_option("comparisonType", COMPARISON_TYPE_COUNT)
         if comparison_type == COMPARISON_TYPE_PERCENT:
             comparison_interval = comparison_intervals[self.get_option("comparisonInterval")][1]
             comparison_end = end - comparison_interval
+            windows.append((comparison_end - duration, comparison_end))
+        return windows
+
+    def get_rate(self, event, interval, environment_id, planner=None):
+        end = planner.end if planner is not None else timezone.now()
+        windows = self.get_windows(interval, end)
+        start, end = windows[0]
+        result = self.query(event, start, end, environment_id=environment_id, planner=planner)
+        if len(windows) > 1:
             # TODO: Figure out if there's a way we can do this less frequently. All queries are
             # automatically cached for 10s. We could consider trying to cache this and the main
             # query for 20s to reduce the load.
+            comparison_start, comparison_end = windows[1]
             comparison_result = self.query(
-                event, comparison_end - duration, comparison_end, environment_id=environment_id
+                event,
+                comparison_start,
+                comparison_end,
+                environment_id=environment_id,
+                planner=planner,
             )
             result = (
                 int(max(0, ((result / comparison_result) * 100) - 100))
@@ -164,6 +231,9 @@ class BaseEventFrequencyCondition(EventCondition):
 class EventFrequencyCondition(BaseEventFrequencyCondition):
     label = "The issue is seen more than {value} times in {interval}"
 
+    def get_tsdb_lookup(self):
+        return "get_sums", self.tsdb.models.group
+
     def query_hook(self, event, start, end, environment_id):
         return self.tsdb.get_sums(
             model=self.tsdb.models.group,
@@ -178,6 +248,9 @@ class EventFrequencyCondition(BaseEventFrequencyCondition):
 class EventUniqueUserFrequencyCondition(BaseEventFrequencyCondition):
     label = "The issue is seen by more than {value} users in {interval}"
 
+    def get_tsdb_lookup(self):
+        return "get_distinct_counts_totals", self.tsdb.models.users_affected_by_group
+
     def query_hook(self, event, start, end, environment_id):
         return self.tsdb.get_distinct_counts_totals(
             model=self.tsdb.models.users_affected_by_group,
@@ -8,6 +8,7 @@ class AssignedToFilter(EventFilter):
     form_cls = AssignedToForm
     label = "The issue is assigned to {targetType}"
     prompt = "The issue is assigned to {no one/team/member}"
+    is_expensive = True
 
     form_fields = {"targetType": {"type": "assignee", "choices": ASSIGNEE_CHOICES}}
 
@@ -25,6 +25,7 @@ def clear_release_project_cache(instance, **kwargs):
 
 class LatestReleaseFilter(EventFilter):
     label = "The event is from the latest release"
+    is_expensive = True
 
     def get_latest_release(self, event):
         cache_key = get_project_release_cache_key(event.group.project_id)
@@ -1,5 +1,5 @@
 import logging
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 from datetime import timedelta
 from random import randrange
 from typing import Mapping, Sequence, Set
@@ -10,11 +10,116 @@ from django.utils import timezone
 from sentry import analytics
 from sentry.models import GroupRuleStatus, Rule
 from sentry.rules import EventState, rules
+from sentry.rules.conditions.event_frequency import FrequencyQueryPlanner
+from sentry.utils import metrics
 from sentry.utils.hashlib import hash_values
 from sentry.utils.safe import safe_execute
 
 RuleFuture = namedtuple("RuleFuture", ["rule", "kwargs"])
 
+# A condition or filter of a compiled rule. Conditions with the same `key` are
+# configured identically and are only evaluated once per event.
+CompiledCondition = namedtuple("CompiledCondition", ["key", "instance"])
+
+# The maximum number of projects whose rule plans are kept in memory.
+RULE_PLAN_CACHE_SIZE = 1000
+
+logger = logging.getLogger("sentry.rules")
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class CompiledRule:
+    """
+    The conditions and filters of a rule, resolved and instantiated once. Cheap
+    conditions and filters are ordered before expensive ones, so that the latter
+    are only evaluated if the match cannot be decided without them.
+    """
+
+    def __init__(self, project, rule, registry):
+        self.condition_match = rule.data.get("action_match") or Rule.DEFAULT_CONDITION_MATCH
+        self.filter_match = rule.data.get("filter_match") or Rule.DEFAULT_FILTER_MATCH
+        self.frequency = rule.data.get("frequency") or Rule.DEFAULT_FREQUENCY
+
+        self.conditions = []
+        self.filters = []
+        for data in rule.data.get("conditions", ()):
+            key = (data["id"], rule.environment_id, _freeze(data))
+            condition_cls = registry.get(data["id"])
+            if condition_cls is None:
+                logger.warning("Unregistered condition or filter %r", data["id"])
+                self.filters.append(CompiledCondition(key=key, instance=None))
+                continue
+
+            compiled = CompiledCondition(
+                key=key, instance=condition_cls(project, data=data, rule=rule)
+            )
+            if condition_cls.rule_type == "condition/event":
+                self.conditions.append(compiled)
+            else:
+                self.filters.append(compiled)
+
+        self.conditions.sort(key=self._is_expensive)
+        self.filters.sort(key=self._is_expensive)
+
+        # Conditions and filters must both pass, so cheap filters are evaluated
+        # before conditions that are expensive.
+        self.filters_first = any(self._is_expensive(c) for c in self.conditions) and not any(
+            self._is_expensive(f) for f in self.filters
+        )
+
+    @staticmethod
+    def _is_expensive(compiled):
+        return compiled.instance is not None and compiled.instance.is_expensive
+
+
+class RulePlan:
+    """
+    The compiled rules of a project. A plan is valid as long as the rules of the
+    project are unchanged, see `get_signature`.
+    """
+
+    def __init__(self, project, rules_list, registry):
+        self.signature = self.get_signature(rules_list)
+        self.registry = registry
+        self.rules = {rule.id: CompiledRule(project, rule, registry) for rule in rules_list}
+
+    @staticmethod
+    def get_signature(rules_list):
+        return [(rule.id, rule.date_added, rule.environment_id, rule.data) for rule in rules_list]
+
+    def is_valid(self, rules_list, registry):
+        return self.registry is registry and self.signature == self.get_signature(rules_list)
+
+
+_rule_plans = OrderedDict()
+
+
+def get_rule_plan(project, rules_list):
+    """
+    Returns the plan for the given rules of a project, compiling it if the rules
+    changed since it was last used in this process.
+    """
+    plan = _rule_plans.get(project.id)
+    if plan is not None and plan.is_valid(rules_list, rules):
+        _rule_plans.move_to_end(project.id)
+        metrics.incr("rules.plan_cache.hit", skip_internal=True)
+        return plan
+
+    metrics.incr("rules.plan_cache.miss", skip_internal=True)
+    plan = _rule_plans[project.id] = RulePlan(project, rules_list, rules)
+    _rule_plans.move_to_end(project.id)
+    while len(_rule_plans) > RULE_PLAN_CACHE_SIZE:
+        _rule_plans.popitem(last=False)
+
+    return plan
+
 
 class RuleProcessor:
     logger = logging.getLogger("sentry.rules")
@@ -30,6 +135,8 @@ class RuleProcessor:
         self.has_reappeared = has_reappeared
 
         self.grouped_futures = {}
+        self.condition_results = {}
+        self.frequency_query_planner = None
 
     def get_rules(self):
         """
@@ -100,22 +207,38 @@ class RuleProcessor:
 
         return rule_statuses
 
-    def condition_matches(self, condition, state, rule):
-        condition_cls = rules.get(condition["id"])
-        if condition_cls is None:
-            self.logger.warning("Unregistered condition %r", condition["id"])
+    def compiled_condition_matches(self, compiled, state):
+        """
+        Evaluates a condition of a compiled rule. The result is shared with all
+        identically configured conditions of other rules.
+        """
+        if compiled.instance is None:
             return
 
-        condition_inst = condition_cls(self.project, data=condition, rule=rule)
-        return safe_execute(condition_inst.passes, self.event, state, _with_transaction=False)
+        try:
+            return self.condition_results[compiled.key]
+        except KeyError:
+            pass
 
-    def get_rule_type(self, condition):
-        rule_cls = rules.get(condition["id"])
-        if rule_cls is None:
-            self.logger.warning("Unregistered condition or filter %r", condition["id"])
-            return
+        rv = self.condition_results[compiled.key] = safe_execute(
+            compiled.instance.passes, self.event, state, _with_transaction=False
+        )
+        return rv
+
+    def compiled_conditions_match(self, rule, compiled_conditions, match_name, kind, state):
+        """
+        Evaluates the conditions or filters of a compiled rule, which pass if
+        there are none.
+        """
+        if not compiled_conditions:
+            return True
+
+        match_func = self.get_match_function(match_name)
+        if not match_func:
+            self.logger.error("Unsupported %s_match %r for rule %d", kind, match_name, rule.id)
+            return False
 
-        return rule_cls.rule_type
+        return match_func(self.compiled_condition_matches(c, state) for c in compiled_conditions)
 
     def get_state(self):
         return EventState(
@@ -123,6 +246,7 @@ class RuleProcessor:
             is_regression=self.is_regression,
             is_new_group_environment=self.is_new_group_environment,
             has_reappeared=self.has_reappeared,
+            frequency_query_planner=self.frequency_query_planner,
         )
 
     def get_match_function(self, match_name):
@@ -134,17 +258,16 @@ class RuleProcessor:
             return lambda bool_iter: not any(bool_iter)
         return None
 
-    def apply_rule(self, rule, status):
+    def apply_rule(self, rule, status, compiled=None):
         """
         If all conditions and filters pass, execute every action.
 
         :param rule: `Rule` object
+        :param compiled: the `CompiledRule` of the rule, compiled on demand if omitted
         :return: void
         """
-        condition_match = rule.data.get("action_match") or Rule.DEFAULT_CONDITION_MATCH
-        filter_match = rule.data.get("filter_match") or Rule.DEFAULT_FILTER_MATCH
-        rule_condition_list = rule.data.get("conditions", ())
-        frequency = rule.data.get("frequency") or Rule.DEFAULT_FREQUENCY
+        if compiled is None:
+            compiled = CompiledRule(self.project, rule, rules)
 
         if (
             rule.environment_id is not None
@@ -153,54 +276,30 @@ class RuleProcessor:
             return
 
         now = timezone.now()
-        freq_offset = now - timedelta(minutes=frequency)
+        freq_offset = now - timedelta(minutes=compiled.frequency)
         if status.last_active and status.last_active > freq_offset:
             return
 
         state = self.get_state()
 
-        condition_list = []
-        filter_list = []
-        for rule_cond in rule_condition_list:
-            if self.get_rule_type(rule_cond) == "condition/event":
-                condition_list.append(rule_cond)
-            else:
-                filter_list.append(rule_cond)
-
-        # if conditions exist evaluate them, otherwise move to the filters section
-        if condition_list:
-            condition_iter = (self.condition_matches(c, state, rule) for c in condition_list)
-
-            condition_func = self.get_match_function(condition_match)
-            if condition_func:
-                condition_passed = condition_func(condition_iter)
-            else:
-                self.logger.error(
-                    "Unsupported condition_match %r for rule %d", condition_match, rule.id
-                )
+        checks = [
+            (compiled.conditions, compiled.condition_match, "condition"),
+            (compiled.filters, compiled.filter_match, "filter"),
+        ]
+        if compiled.filters_first:
+            checks.reverse()
+
+        for compiled_conditions, match_name, kind in checks:
+            if not self.compiled_conditions_match(
+                rule, compiled_conditions, match_name, kind, state
+            ):
                 return
 
-            if not condition_passed:
-                return
-
-        # if filters exist evaluate them, otherwise pass
-        if filter_list:
-            filter_iter = (self.condition_matches(f, state, rule) for f in filter_list)
-            filter_func = self.get_match_function(filter_match)
-            if filter_func:
-                passed = filter_func(filter_iter)
-            else:
-                self.logger.error("Unsupported filter_match %r for rule %d", filter_match, rule.id)
-                return
-        else:
-            passed = True
-
-        if passed:
-            passed = (
-                GroupRuleStatus.objects.filter(id=status.id)
-                .exclude(last_active__gt=freq_offset)
-                .update(last_active=now)
-            )
+        passed = (
+            GroupRuleStatus.objects.filter(id=status.id)
+            .exclude(last_active__gt=freq_offset)
+            .update(last_active=now)
+        )
 
         if not passed:
             return
@@ -243,8 +342,24 @@ class RuleProcessor:
             return {}.values()
 
         self.grouped_futures.clear()
-        rules = self.get_rules()
-        rule_statuses = self.bulk_get_rule_status(rules)
-        for rule in rules:
-            self.apply_rule(rule, rule_statuses[rule.id])
+        self.condition_results.clear()
+        rules_list = self.get_rules()
+        plan = get_rule_plan(self.project, rules_list)
+
+        # Rules of other environments never fire, so skip fetching their statuses.
+        if any(rule.environment_id is not None for rule in rules_list):
+            environment_id = self.event.get_environment().id
+            rules_list = [
+                rule
+                for rule in rules_list
+                if rule.environment_id is None or rule.environment_id == environment_id
+            ]
+
+        rule_statuses = self.bulk_get_rule_status(rules_list)
+
+        # Conditions of different rules share their frequency reads for the event.
+        self.frequency_query_planner = FrequencyQueryPlanner()
+
+        for rule in rules_list:
+            self.apply_rule(rule, rule_statuses[rule.id], plan.rules[rule.id])
         return self.grouped_futures.values()
@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+import click
+
+from sentry.runner.decorators import configuration
+
+
+@click.group()
+def nodestore():
+    "Manage the nodestore."
+
+
+@nodestore.command("train-dictionary")
+@click.option("--platform", required=True, help="The platform to train the dictionary for.")
+@click.option(
+    "--project",
+    "project_ids",
+    type=int,
+    multiple=True,
+    required=True,
+    help="The projects to sample events from, can be repeated.",
+)
+@click.option("--samples", default=2000, show_default=True, help="The number of nodes to sample.")
+@click.option(
+    "--days", default=7, show_default=True, help="Sample nodes written in the last N days."
+)
+@click.option(
+    "--size",
+    default=112640,
+    show_default=True,
+    help="The maximum size of the dictionary in bytes.",
+)
+@click.option(
+    "--activate",
+    default=False,
+    is_flag=True,
+    help="Compress new nodes of the platform with the dictionary.",
+)
+@configuration
+def train_dictionary(platform, project_ids, samples, days, size, activate):
+    """
+    Train a zstd dictionary from sampled nodes of one platform.
+
+        sentry nodestore train-dictionary --platform java --project 1 --project 2
+
+    The dictionary is stored as a file that never expires. Once it has been
+    activated, new nodes of the platform are compressed with it, while all
+    existing nodes stay readable.
+    """
+    import zstandard
+    from django.utils import timezone
+
+    from sentry import eventstore, options
+    from sentry import nodestore as nodestore_service
+    from sentry.eventstore.models import Event
+    from sentry.nodestore.base import json_dumps
+
+    end = timezone.now()
+    events = eventstore.get_unfetched_events(
+        eventstore.Filter(
+            project_ids=list(project_ids),
+            conditions=[["platform", "=", platform]],
+            start=end - timedelta(days=days),
+            end=end,
+        ),
+        limit=samples,
+        referrer="nodestore.train_dictionary",
+    )
+
+    node_ids = [Event.generate_node_id(event.project_id, event.event_id) for event in events]
+    nodes = nodestore_service.get_multi(node_ids)
+    training_data = [json_dumps(node).encode("utf8") for node in nodes.values() if node]
+
+    if not training_data:
+        raise click.ClickException(f"Found no nodes for platform {platform!r}.")
+
+    click.echo(f"Training dictionary from {len(training_data)} nodes...")
+    dictionary = zstandard.train_dictionary(size, training_data)
+    dict_id = nodestore_service.set_zstd_dictionary(dictionary.as_bytes())
+    click.echo(f"Stored dictionary {dict_id} ({len(dictionary.as_bytes())} bytes).")
+
+    if activate:
+        dictionaries = dict(options.get("nodestore.zstd-dictionaries"))
+        dictionaries[platform] = dict_id
+        options.set("nodestore.zstd-dictionaries", dictionaries)
+        click.echo(f"Activated dictionary {dict_id} for platform {platform!r}.")
@@ -478,6 +478,12 @@ def batching_kafka_options(group):
     default=None,
     help="Thread pool size (only utilitized for message types that support concurrent processing)",
 )
+@click.option(
+    "--save-events-in-batch",
+    default=False,
+    is_flag=True,
+    help="Save error events that need no further processing directly from the consumer, one batch at a time.",
+)
 @configuration
 def ingest_consumer(consumer_types, all_consumer_types, **options):
     """
@@ -252,11 +252,49 @@ local function truncate_digest(configuration, timeline_id, capacity)
     )
 end
 
-local function add_record_to_timeline(configuration, timeline_id, record_id, value, timestamp, delay_increment, delay_maximum, timeline_capacity, truncation_chance)
+-- The sample index of a timeline maps each sample key to the latest record
+-- added with that key (and the field "<sample key>:t" to its timestamp.)
+local function sample_index_update(key, sample_id, record_id, timestamp)
+    local latest = tonumber(redis.call('HGET', key, sample_id .. ':t'))
+    if latest == nil or timestamp >= latest then
+        redis.call('HMSET', key, sample_id, record_id, sample_id .. ':t', timestamp)
+    end
+end
+
+local function sample_index_merge(source, destination)
+    if redis.call('EXISTS', source) == 0 then
+        return
+    end
+
+    if redis.call('EXISTS', destination) == 0 then
+        redis.call('RENAME', source, destination)
+        return
+    end
+
+    local fields = redis.call('HGETALL', source)
+    for i = 1, #fields, 2 do
+        local sample_id = fields[i]
+        if string.sub(sample_id, -2) ~= ':t' then
+            local timestamp = tonumber(redis.call('HGET', source, sample_id .. ':t'))
+            sample_index_update(destination, sample_id, fields[i + 1], timestamp)
+        end
+    end
+    redis.call('DEL', source)
+end
+
+local function add_record_to_timeline(configuration, timeline_id, record_id, value, timestamp, delay_increment, delay_maximum, timeline_capacity, truncation_chance, sample_ids)
     redis.call('SETEX', configuration:get_timeline_record_key(timeline_id, record_id), configuration.ttl, value)
     redis.call('ZADD', configuration:get_timeline_key(timeline_id), timestamp, record_id)
     redis.call('EXPIRE', configuration:get_timeline_key(timeline_id), configuration.ttl)
 
+    if #sample_ids > 0 then
+        local sample_key = configuration:get_timeline_sample_key(timeline_id)
+        for _, sample_id in ipairs(sample_ids) do
+            sample_index_update(sample_key, sample_id, record_id, timestamp)
+        end
+        redis.call('EXPIRE', sample_key, configuration.ttl)
+    end
+
     local ready = add_timeline_to_schedule(configuration, timeline_id, timestamp, delay_increment, delay_maximum)
 
     if timeline_capacity > 0 and math.random() < truncation_chance then
@@ -266,6 +304,47 @@ local function add_record_to_timeline(configuration, timeline_id, record_id, val
     return ready
 end
 
+-- Returns the latest record of every sample key, as well as the oldest record
+-- of the digest so that the sample spans the same time as the whole digest,
+-- in the same format and order as ZREVRANGE ... WITHSCORES.
+local function sample_digest(digest_key, sample_key)
+    local selected = {}
+    local records = {}
+
+    local function add(record_id, score)
+        if score ~= false and selected[record_id] == nil then
+            selected[record_id] = true
+            records[#records + 1] = {record_id, score, tonumber(score)}
+        end
+    end
+
+    local fields = redis.call('HGETALL', sample_key)
+    for i = 1, #fields, 2 do
+        if string.sub(fields[i], -2) ~= ':t' then
+            add(fields[i + 1], redis.call('ZSCORE', digest_key, fields[i + 1]))
+        end
+    end
+
+    local oldest = redis.call('ZRANGE', digest_key, 0, 0, 'WITHSCORES')
+    if #oldest > 0 then
+        add(oldest[1], oldest[2])
+    end
+
+    table.sort(records, function (a, b)
+        if a[3] ~= b[3] then
+            return a[3] > b[3]
+        end
+        return a[1] > b[1]
+    end)
+
+    local result = {}
+    for i, record in ipairs(records) do
+        result[i * 2 - 1] = record[1]
+        result[i * 2] = record[2]
+    end
+    return result
+end
+
 local function digest_timeline(configuration, timeline_id, timeline_capacity)
     -- Check to ensure that the timeline is in the correct state.
     if redis.call('ZSCORE', configuration:get_schedule_ready_key(), timeline_id) == false then
@@ -294,8 +373,18 @@ local function digest_timeline(configuration, timeline_id, timeline_capacity)
         redis.call('EXPIRE', digest_key, configuration.ttl)
     end
 
+    local digest_sample_key = configuration:get_timeline_digest_sample_key(timeline_id)
+    sample_index_merge(configuration:get_timeline_sample_key(timeline_id), digest_sample_key)
+
+    local records = nil
+    if redis.call('EXISTS', digest_sample_key) == 1 then
+        redis.call('EXPIRE', digest_sample_key, configuration.ttl)
+        records = sample_digest(digest_key, digest_sample_key)
+    else
+        records = redis.call('ZREVRANGE', digest_key, 0, -1, 'WITHSCORES')
+    end
+
     local results = {}
-    local records = redis.call('ZREVRANGE', digest_key, 0, -1, 'WITHSCORES')
     local i = 0
     for key, score in zrange_scored_iterator(records) do
         i = i + 1
@@ -324,10 +413,19 @@ local function close_digest(configuration, timeline_id, delay_minimum, record_id
         redis.call('DEL', unpack(record_key_chunk))
     end
 
+    -- A sampled digest only returned some of its records, the others are
+    -- removed along with the sample index.
+    local removed = #record_ids
+    local digest_sample_key = configuration:get_timeline_digest_sample_key(timeline_id)
+    if redis.call('EXISTS', digest_sample_key) == 1 then
+        removed = removed + truncate_digest(configuration, timeline_id, 0)
+        redis.call('DEL', digest_sample_key)
+    end
+
     -- If this digest didn't contain any data (no record IDs) and there isn't
     -- any data left in the timeline or digest sets, we can safely remove this
     -- timeline reference from all schedule sets.
-    if #record_ids > 0 or redis.call('ZCARD', timeline_key) > 0 or redis.call('ZCARD', digest_key) > 0 then
+    if removed > 0 or redis.call('ZCARD', timeline_key) > 0 or redis.call('ZCARD', digest_key) > 0 then
         redis.call('SETEX', configuration:get_timeline_last_processed_timestamp_key(timeline_id), configuration.ttl, configuration.timestamp)
         redis.call('ZREM', configuration:get_schedule_ready_key(), timeline_id)
         redis.call('ZADD', configuration:get_schedule_waiting_key(), configuration.timestamp + delay_minimum, timeline_id)
@@ -341,6 +439,8 @@ end
 local function delete_timeline(configuration, timeline_id)
     truncate_timeline(configuration, timeline_id, 0)
     truncate_digest(configuration, timeline_id, 0)
+    redis.call('DEL', configuration:get_timeline_sample_key(timeline_id))
+    redis.call('DEL', configuration:get_timeline_digest_sample_key(timeline_id))
     redis.call('DEL', configuration:get_timeline_last_processed_timestamp_key(timeline_id))
     redis.call('ZREM', configuration:get_schedule_ready_key(), timeline_id)
     redis.call('ZREM', configuration:get_schedule_waiting_key(), timeline_id)
@@ -372,6 +472,14 @@ local configuration_argument_parser = object_argument_parser({
         return string.format('%s:t:%s:d', self.namespace, timeline_id)
     end
 
+    function configuration:get_timeline_sample_key(timeline_id)
+        return string.format('%s:t:%s:s', self.namespace, timeline_id)
+    end
+
+    function configuration:get_timeline_digest_sample_key(timeline_id)
+        return string.format('%s:t:%s:d:s', self.namespace, timeline_id)
+    end
+
     function configuration:get_timeline_last_processed_timestamp_key(timeline_id)
         return string.format('%s:t:%s:l', self.namespace, timeline_id)
     end
@@ -399,7 +507,7 @@ local commands = {
         return maintenance(configuration, deadline)
     end,
     ADD = function (cursor, arguments)
-        local cursor, configuration, arguments = multiple_argument_parser(
+        local cursor, configuration, arguments, sample_ids = multiple_argument_parser(
             configuration_argument_parser,
             object_argument_parser({
                 {"timeline_id", argument_parser()},
@@ -410,7 +518,8 @@ local commands = {
                 {"delay_maximum", argument_parser(tonumber)},
                 {"timeline_capacity", argument_parser(tonumber)},
                 {"truncation_chance", argument_parser(tonumber)},
-            })
+            }),
+            variadic_argument_parser(argument_parser())
         )(cursor, arguments)
         return add_record_to_timeline(
             configuration,
@@ -421,7 +530,8 @@ local commands = {
             arguments.delay_increment,
             arguments.delay_maximum,
             arguments.timeline_capacity,
-            arguments.truncation_chance
+            arguments.truncation_chance,
+            sample_ids
         )
     end,
     DELETE = function (cursor, arguments)
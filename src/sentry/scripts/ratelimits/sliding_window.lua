@@ -0,0 +1,32 @@
+-- Lease up to ``requested`` tokens from a sliding window rate limit.
+--
+-- The window is approximated from the counters of the current and the
+-- previous fixed window: the count of the previous window is weighted by how
+-- much of it still overlaps with the sliding window that ends now.
+--
+--   KEYS = {current window counter, previous window counter}
+--   ARGV = {limit, window (seconds), elapsed seconds of the current window, requested tokens}
+--
+-- Returns the number of tokens that have been granted, which is 0 if the key
+-- is rate limited. Granted tokens are counted as used right away.
+assert(#KEYS == 2, "incorrect number of keys provided")
+
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local elapsed = tonumber(ARGV[3])
+local requested = tonumber(ARGV[4])
+
+local current = tonumber(redis.call('GET', KEYS[1]) or 0)
+local previous = tonumber(redis.call('GET', KEYS[2]) or 0)
+
+local used = math.floor(previous * (window - elapsed) / window) + current
+local granted = math.min(requested, limit - used)
+
+if granted <= 0 then
+    return 0
+end
+
+redis.call('INCRBY', KEYS[1], granted)
+redis.call('EXPIRE', KEYS[1], window * 2)
+
+return granted
@@ -53,6 +53,15 @@ To query the top 10 items from the first sketch:
 
     EVALSHA $SHA 2 1:i 1:e RANKED 5 64 50 10
 
+INCRMULTI increments different items in different groups of sketches with a
+single call, and sets the expiration time of every sketch. Each group of
+arguments consists of the number of sketches in the group, the expiration
+timestamp of each of these sketches, the number of items and then the items
+themselves. The keys of the sketches are taken from ``KEYS`` in order. To add
+"foo" to the first two sketches, and "bar" to the third:
+
+    EVALSHA $SHA 6 1:i 1:e 2:i 2:e 3:i 3:e INCRMULTI 5 64 50 2 1500000000 1500003600 1 1 foo 1 1500000000 1 2 bar
+
 ]]--
 
 --[[ Helpers ]]--
@@ -463,7 +472,8 @@ local Router = {}
 
 function Router:new(commands)
     return function (keys, arguments)
-        local name, arguments = head(arguments)
+        -- Batched commands can have more arguments than ``unpack`` supports.
+        local name = table.remove(arguments, 1)
         return commands[name:upper()](keys, arguments)
     end
 end
@@ -497,6 +507,45 @@ return Router:new({
         end
     ),
 
+    --[[
+    Increment the number of observations for different items in different
+    groups of sketches, and set the expiration time of each sketch.
+    ]]--
+    INCRMULTI = function (keys, arguments)
+        local configuration = {
+            depth=tonumber(arguments[1]),
+            width=tonumber(arguments[2]),
+            index=tonumber(arguments[3])
+        }
+
+        local k = 1
+        local i = 4
+        while i <= #arguments do
+            local sketches = {}
+            local expirations = {}
+            for s = 1, tonumber(arguments[i]) do
+                table.insert(sketches, Sketch:new(configuration, keys[k], keys[k + 1]))
+                table.insert(expirations, arguments[i + s])
+                k = k + 2
+            end
+            i = i + #sketches + 1
+
+            local items = {}
+            for j = i + 1, i + 2 * tonumber(arguments[i]), 2 do
+                local delta = tonumber(arguments[j])
+                assert(delta > 0, 'The increment value must be positive and nonzero.')
+                table.insert(items, {arguments[j + 1], delta})
+            end
+            i = i + 2 * #items + 1
+
+            for s, sketch in ipairs(sketches) do
+                sketch:increment(items)
+                redis.call('EXPIREAT', sketch.index, expirations[s])
+                redis.call('EXPIREAT', sketch.estimates, expirations[s])
+            end
+        end
+    end,
+
     --[[
     Estimate the number of observations for each item in all sketches,
     returning a sequence containing scores for items in the order that they
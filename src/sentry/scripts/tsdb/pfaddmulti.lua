@@ -0,0 +1,27 @@
+-- Add values to several HyperLogLogs and set their expiration times with a
+-- single call.
+--
+--   KEYS = {HyperLogLog key, ...}
+--   ARGV = {expiration timestamp, number of values, value, ...} for each key
+--
+-- To add "foo" and "bar" to the first key and "baz" to the second one:
+--
+--   EVALSHA $SHA 2 1 2 1500000000 2 foo bar 1500003600 1 baz
+
+-- The number of values added with a single PFADD, as ``unpack`` fails for
+-- more values than fit on the Lua stack.
+local slice_size = 1000
+
+local i = 1
+for _, key in ipairs(KEYS) do
+    local expiration = ARGV[i]
+    local count = tonumber(ARGV[i + 1])
+    local last = i + 1 + count
+    local first = i + 2
+    repeat
+        redis.call('PFADD', key, unpack(ARGV, first, math.min(first + slice_size - 1, last)))
+        first = first + slice_size
+    until first > last
+    redis.call('EXPIREAT', key, expiration)
+    i = last + 1
+end
@@ -0,0 +1,28 @@
+-- Merge serialized HyperLogLogs (as returned by ``GET``) into several keys and
+-- set their expiration times with a single call.
+--
+--   KEYS = {temporary key, destination HyperLogLog key, ...}
+--   ARGV = {expiration timestamp, number of values, value, ...} for each
+--          destination key
+--
+-- The values need to be stored under a key to be merged. Scripts are executed
+-- atomically, so the temporary key is never visible to other clients and is
+-- deleted before the script returns.
+local temporary = KEYS[1]
+
+local i = 1
+for k = 2, #KEYS do
+    local key = KEYS[k]
+    local expiration = ARGV[i]
+    local count = tonumber(ARGV[i + 1])
+
+    for j = i + 2, i + 1 + count do
+        redis.call('SET', temporary, ARGV[j])
+        redis.call('PFMERGE', key, key, temporary)
+    end
+
+    redis.call('EXPIREAT', key, expiration)
+    i = i + 2 + count
+end
+
+redis.call('DEL', temporary)
@@ -14,6 +14,19 @@ class AbstractIndexBackend(metaclass=ABCMeta):
     def record(self, scope, key, items, timestamp=None):
         pass
 
+    def record_multi(self, scope, records, timestamp=None):
+        """
+        Record the items of multiple keys, passed as ``(key, items)`` or
+        ``(key, items, timestamp)`` tuples. Records without a timestamp of
+        their own are recorded at ``timestamp``.
+        """
+        return [
+            self.record(
+                scope, key, items, timestamp=record_timestamp[0] if record_timestamp else timestamp
+            )
+            for key, items, *record_timestamp in records
+        ]
+
     @abstractmethod
     def merge(self, scope, destination, items, timestamp=None):
         pass
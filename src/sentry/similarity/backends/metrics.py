@@ -22,6 +22,9 @@ class MetricsWrapper(AbstractIndexBackend):
     def record(self, *args, **kwargs):
         return self.__instrumented_method_call("record", *args, **kwargs)
 
+    def record_multi(self, *args, **kwargs):
+        return self.__instrumented_method_call("record_multi", *args, **kwargs)
+
     def classify(self, *args, **kwargs):
         return self.__instrumented_method_call("classify", *args, **kwargs)
 
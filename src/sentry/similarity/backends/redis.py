@@ -33,13 +33,22 @@ class RedisScriptMinHashIndexBackend(AbstractIndexBackend):
         self.candidate_set_limit = candidate_set_limit
 
     def _build_signature_arguments(self, features):
-        if not features:
-            return [0] * self.bands
+        return self._build_signature_arguments_many([features])[0]
 
-        arguments = []
-        for bucket in band(self.bands, self.signature_builder(features)):
-            arguments.extend([1, ",".join(map("{}".format, bucket)), 1])
-        return arguments
+    def _build_signature_arguments_many(self, feature_sets):
+        signatures = iter(self.signature_builder.build_many([f for f in feature_sets if f]))
+
+        rv = []
+        for features in feature_sets:
+            if not features:
+                rv.append([0] * self.bands)
+                continue
+
+            arguments = []
+            for bucket in band(self.bands, next(signatures)):
+                arguments.extend([1, ",".join(map("{}".format, bucket)), 1])
+            rv.append(arguments)
+        return rv
 
     def __index(self, scope, args):
         # scope must be passed into the script call as a key to allow the
@@ -90,9 +99,12 @@ class RedisScriptMinHashIndexBackend(AbstractIndexBackend):
             limit if limit is not None else -1,
         ]
 
-        for idx, threshold, features in items:
+        signature_arguments = self._build_signature_arguments_many(
+            [features for _, _, features in items]
+        )
+        for (idx, threshold, _), signature in zip(items, signature_arguments):
             arguments.extend([idx, threshold])
-            arguments.extend(self._build_signature_arguments(features))
+            arguments.extend(signature)
 
         return self._as_search_result(self.__index(scope, arguments))
 
@@ -122,26 +134,49 @@ class RedisScriptMinHashIndexBackend(AbstractIndexBackend):
         if not items:
             return  # nothing to do
 
+        return self.record_multi(scope, [(key, items)], timestamp=timestamp)[0]
+
+    def record_multi(self, scope, records, timestamp=None):
         if timestamp is None:
             timestamp = int(time.time())
 
-        arguments = [
-            "RECORD",
-            timestamp,
-            self.namespace,
-            self.bands,
-            self.interval,
-            self.retention,
-            self.candidate_set_limit,
-            scope,
-            key,
+        records = [
+            (key, items, record_timestamp[0] if record_timestamp else timestamp)
+            for key, items, *record_timestamp in records
+            if items
         ]
-
-        for idx, features in items:
-            arguments.append(idx)
-            arguments.extend(self._build_signature_arguments(features))
-
-        return self.__index(scope, arguments)
+        if not records:
+            return []  # nothing to do
+
+        # Signatures of all records are built at once, so that features
+        # shared between them are only hashed once.
+        signature_arguments = iter(
+            self._build_signature_arguments_many(
+                [features for _, items, _ in records for _, features in items]
+            )
+        )
+
+        results = []
+        for key, items, record_timestamp in records:
+            arguments = [
+                "RECORD",
+                record_timestamp,
+                self.namespace,
+                self.bands,
+                self.interval,
+                self.retention,
+                self.candidate_set_limit,
+                scope,
+                key,
+            ]
+
+            for idx, _ in items:
+                arguments.append(idx)
+                arguments.extend(next(signature_arguments))
+
+            results.append(self.__index(scope, arguments))
+
+        return results
 
     def merge(self, scope, destination, items, timestamp=None):
         if timestamp is None:
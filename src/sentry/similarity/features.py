@@ -96,13 +96,17 @@ class FeatureSet:
         return results
 
     def record(self, events):
+        """
+        Record the features of events, which may belong to different groups of
+        the same project. All events are recorded with a single call to the
+        index, each with its own timestamp.
+        """
         if not events:
             return []
 
         scope = None
-        key = None
 
-        items = []
+        records = {}
         for event in events:
             if not event.group_id:
                 continue
@@ -114,12 +118,9 @@ class FeatureSet:
                         self.__get_scope(event.project) == scope
                     ), "all events must be associated with the same project"
 
-                if key is None:
-                    key = self.__get_key(event.group)
-                else:
-                    assert (
-                        self.__get_key(event.group) == key
-                    ), "all events must be associated with the same group"
+                items = records.setdefault(
+                    (self.__get_key(event.group), int(to_timestamp(event.datetime))), []
+                )
 
                 try:
                     features = map(self.encoder.dumps, features)
@@ -139,7 +140,9 @@ class FeatureSet:
                     if features:
                         items.append((self.aliases[label], features))
 
-        return self.index.record(scope, key, items, timestamp=int(to_timestamp(event.datetime)))
+        return self.index.record_multi(
+            scope, [(key, items, timestamp) for (key, timestamp), items in records.items()]
+        )
 
     def classify(self, events, limit=None, thresholds=None):
         if not events:
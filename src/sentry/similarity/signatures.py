@@ -1,6 +1,6 @@
 import mmh3
 
-from sentry.utils.compat import map
+from sentry.utils.compat import map, zip
 
 
 class MinHashSignatureBuilder:
@@ -15,3 +15,28 @@ class MinHashSignatureBuilder:
             ),
             range(self.columns),
         )
+
+    def build_many(self, feature_sets):
+        """
+        Build the signatures of multiple (non-empty) feature sets at once.
+        Features that occur in several sets, such as frames shared between
+        events, are only hashed once.
+        """
+        columns = range(self.columns)
+        rows = self.rows
+
+        hashes = {}
+        signatures = []
+        for features in feature_sets:
+            matrix = []
+            for feature in features:
+                row = hashes.get(feature)
+                if row is None:
+                    row = hashes[feature] = [
+                        mmh3.hash(feature, column) % rows for column in columns
+                    ]
+                matrix.append(row)
+
+            signatures.append(map(min, zip(*matrix)))
+
+        return signatures
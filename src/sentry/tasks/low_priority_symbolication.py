@@ -0,0 +1,128 @@
+"""
+Automatic assignment of projects to the low priority symbolication queue.
+
+Projects are moved to ``symbolicate_event_low_priority`` once their rate of
+events or their symbolication times are too high, based on the metrics that
+``symbolicate_event`` records in the realtime metrics store. They are moved
+back once both have dropped well below those limits again, so that projects
+close to a limit do not flip between the queues.
+"""
+
+import logging
+import time
+from typing import Dict, Iterable, List, NamedTuple, Set
+
+from sentry import options
+from sentry.processing import realtime_metrics
+from sentry.processing.realtime_metrics.base import BucketedCount
+from sentry.tasks.base import instrumented_task
+from sentry.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class ProjectScore(NamedTuple):
+    # Events per second over the window, corrected for sampling.
+    rate: float
+    # The 90th percentile of symbolication times in seconds.
+    p90_duration: int
+
+
+def get_rate(counts: List[BucketedCount], window: int, sample_rate: float) -> float:
+    total = sum(bucket.count for bucket in counts)
+    return total / window / sample_rate
+
+
+def get_percentile(histogram: Dict[int, int], percentile: float) -> int:
+    total = sum(histogram.values())
+    if not total:
+        return 0
+
+    seen = 0
+    for duration, count in sorted(histogram.items()):
+        seen += count
+        if seen >= total * percentile:
+            return duration
+
+    return max(histogram)
+
+
+def get_project_scores(project_ids: Iterable[int], now: int) -> Dict[int, ProjectScore]:
+    """
+    Scores the given projects based on their metrics over the configured window.
+    The metrics of all projects are fetched at once.
+    """
+    window = options.get("symbolicate-event.low-priority.window")
+    sample_rate = options.get("symbolicate-event.low-priority.metrics.submission-rate")
+
+    project_ids = list(project_ids)
+    counts = realtime_metrics.get_counts_timeseries_multi(project_ids, now - window, now)
+    histograms = realtime_metrics.get_durations_histogram_multi(project_ids, now - window, now)
+
+    return {
+        project_id: ProjectScore(
+            rate=get_rate(counts[project_id], window, sample_rate) if sample_rate else 0.0,
+            p90_duration=get_percentile(histograms[project_id], 0.9),
+        )
+        for project_id in project_ids
+    }
+
+
+def should_demote(score: ProjectScore) -> bool:
+    demote_rate = options.get("symbolicate-event.low-priority.demote-rate")
+    demote_duration = options.get("symbolicate-event.low-priority.demote-duration")
+    return score.rate > demote_rate or score.p90_duration > demote_duration
+
+
+def should_promote(score: ProjectScore) -> bool:
+    promote_rate = options.get("symbolicate-event.low-priority.promote-rate")
+    promote_duration = options.get("symbolicate-event.low-priority.promote-duration")
+    return score.rate < promote_rate and score.p90_duration < promote_duration
+
+
+def update_lpq_projects(project_ids: Iterable[int], lpq_projects: Set[int], now: int) -> None:
+    """
+    Demotes and promotes the given projects based on their scores. Projects in
+    the low priority queue that do not have any recent metrics are promoted.
+    """
+    project_ids = set(project_ids)
+    promoted = lpq_projects - project_ids
+
+    for project_id, score in get_project_scores(project_ids, now).items():
+        if project_id in lpq_projects:
+            if should_promote(score):
+                promoted.add(project_id)
+        elif should_demote(score):
+            logger.info(
+                "symbolicate_event.low_priority.demoted",
+                extra={"project_id": project_id, "rate": score.rate, "p90": score.p90_duration},
+            )
+            realtime_metrics.add_project_to_lpq(project_id)
+            metrics.incr("symbolicate_event.low_priority.demoted")
+
+    if promoted:
+        logger.info(
+            "symbolicate_event.low_priority.promoted", extra={"project_ids": sorted(promoted)}
+        )
+        realtime_metrics.remove_projects_from_lpq(promoted)
+        metrics.incr("symbolicate_event.low_priority.promoted", amount=len(promoted))
+
+
+@instrumented_task(
+    name="sentry.tasks.low_priority_symbolication.scan_for_suspect_projects",
+    time_limit=15,
+    soft_time_limit=10,
+)
+def scan_for_suspect_projects():
+    """
+    Scores all projects that recently had events symbolicated, and updates the
+    projects assigned to the low priority queue accordingly.
+    """
+    if not options.get("symbolicate-event.low-priority.auto-routing"):
+        return
+
+    now = int(time.time())
+    project_ids = list(realtime_metrics.projects())
+    metrics.timing("symbolicate_event.low_priority.projects_scanned", len(project_ids))
+
+    update_lpq_projects(project_ids, realtime_metrics.get_lpq_projects(), now)
@@ -197,9 +197,7 @@ def post_process_group(
     """
     Fires post processing hooks for a group.
     """
-    from sentry.eventstore.models import Event
     from sentry.eventstore.processing import event_processing_store
-    from sentry.reprocessing2 import is_reprocessed_event
     from sentry.utils import snuba
 
     with snuba.options_override({"consistent": True}):
@@ -213,199 +211,271 @@ def post_process_group(
                 extra={"cache_key": cache_key, "reason": "missing_cache"},
             )
             return
-        event = Event(
-            project_id=data["project"], event_id=data["event_id"], group_id=group_id, data=data
-        )
 
-        set_current_event_project(event.project_id)
+        _post_process_event(
+            data,
+            is_new=is_new,
+            is_regression=is_regression,
+            is_new_group_environment=is_new_group_environment,
+            cache_key=cache_key,
+            group_id=group_id,
+            **kwargs,
+        )
 
-        is_transaction_event = not bool(event.group_id)
 
-        from sentry.models import EventDict, Organization, Project
+@instrumented_task(
+    name="sentry.tasks.post_process.post_process_group_batch",
+    time_limit=300,
+    soft_time_limit=290,
+)
+def post_process_group_batch(project_id, events):
+    """
+    Fires post processing hooks for a batch of events of one project.
 
-        # Re-bind node data to avoid renormalization. We only want to
-        # renormalize when loading old data from the database.
-        event.data = EventDict(event.data, skip_renormalization=True)
+    ``events`` is a list of the keyword arguments that ``post_process_group``
+    would receive for each event. The events and their groups are loaded at
+    once, then every event is processed like by ``post_process_group``.
+    """
+    from sentry.eventstore.processing import event_processing_store
+    from sentry.models import Group
+    from sentry.utils import snuba
 
-        # Re-bind Project and Org since we're reading the Event object
-        # from cache which may contain stale parent models.
-        event.project = Project.objects.get_from_cache(id=event.project_id)
-        event.project.set_cached_field_value(
-            "organization", Organization.objects.get_from_cache(id=event.project.organization_id)
-        )
+    with snuba.options_override({"consistent": True}):
+        data_by_key = event_processing_store.get_many([e["cache_key"] for e in events])
+
+        group_ids = {e["group_id"] for e in events if e.get("group_id")}
+        groups = {g.id: g for g in Group.objects.get_many_from_cache(list(group_ids))}
+        metrics.timing("tasks.post_process.batch_size", len(events))
+
+        for task_kwargs in events:
+            cache_key = task_kwargs["cache_key"]
+            data = data_by_key.get(cache_key)
+            if not data:
+                logger.info(
+                    "post_process.skipped",
+                    extra={"cache_key": cache_key, "reason": "missing_cache"},
+                )
+                continue
 
-        # Simplified post processing for transaction events.
-        # This should eventually be completely removed and transactions
-        # will not go through any post processing.
-        if is_transaction_event:
-            transaction_processed.send_robust(
-                sender=post_process_group,
-                project=event.project,
-                event=event,
-            )
+            # A failing event must not keep the rest of the batch from being
+            # processed, since the batch is not retried.
+            try:
+                _post_process_event(
+                    data, group=groups.get(task_kwargs.get("group_id")), **task_kwargs
+                )
+            except Exception:
+                logger.exception(
+                    "post_process.batch.failed",
+                    extra={"project_id": project_id, "cache_key": cache_key},
+                )
 
-            event_processing_store.delete_by_key(cache_key)
 
-            return
+def _post_process_event(
+    data,
+    is_new,
+    is_regression,
+    is_new_group_environment,
+    cache_key,
+    group_id=None,
+    group=None,
+    **kwargs,
+):
+    from sentry.eventstore.models import Event
+    from sentry.eventstore.processing import event_processing_store
+    from sentry.reprocessing2 import is_reprocessed_event
 
-        is_reprocessed = is_reprocessed_event(event.data)
-        sentry_sdk.set_tag("is_reprocessed", is_reprocessed)
-
-        # NOTE: we must pass through the full Event object, and not an
-        # event_id since the Event object may not actually have been stored
-        # in the database due to sampling.
-        from sentry.models import Commit, GroupInboxReason
-        from sentry.models.group import get_group_with_redirect
-        from sentry.models.groupinbox import add_group_to_inbox
-        from sentry.rules.processor import RuleProcessor
-        from sentry.tasks.groupowner import process_suspect_commits
-        from sentry.tasks.servicehooks import process_service_hook
-
-        # Re-bind Group since we're reading the Event object
-        # from cache, which may contain a stale group and project
-        event.group, _ = get_group_with_redirect(event.group_id)
-        event.group_id = event.group.id
+    event = Event(
+        project_id=data["project"], event_id=data["event_id"], group_id=group_id, data=data
+    )
 
-        event.group.project = event.project
-        event.group.project.set_cached_field_value("organization", event.project.organization)
+    set_current_event_project(event.project_id)
 
-        bind_organization_context(event.project.organization)
+    is_transaction_event = not bool(event.group_id)
 
-        _capture_stats(event, is_new)
+    from sentry.models import EventDict, Organization, Project
 
-        with sentry_sdk.start_span(op="tasks.post_process_group.add_group_to_inbox"):
-            try:
-                if is_reprocessed and is_new:
-                    add_group_to_inbox(event.group, GroupInboxReason.REPROCESSED)
-            except Exception:
-                logger.exception("Failed to add group to inbox for reprocessed groups")
+    # Re-bind node data to avoid renormalization. We only want to
+    # renormalize when loading old data from the database.
+    event.data = EventDict(event.data, skip_renormalization=True)
 
-        if not is_reprocessed:
-            # we process snoozes before rules as it might create a regression
-            # but not if it's new because you can't immediately snooze a new group
-            has_reappeared = not is_new
-            try:
-                if has_reappeared:
-                    has_reappeared = process_snoozes(event.group)
-            except Exception:
-                logger.exception("Failed to process snoozes for group")
+    # Re-bind Project and Org since we're reading the Event object
+    # from cache which may contain stale parent models.
+    event.project = Project.objects.get_from_cache(id=event.project_id)
+    event.project.set_cached_field_value(
+        "organization", Organization.objects.get_from_cache(id=event.project.organization_id)
+    )
 
-            try:
-                if not has_reappeared:  # If true, we added the .UNIGNORED reason already
-                    if is_new:
-                        add_group_to_inbox(event.group, GroupInboxReason.NEW)
-                    elif is_regression:
-                        add_group_to_inbox(event.group, GroupInboxReason.REGRESSION)
-            except Exception:
-                logger.exception("Failed to add group to inbox for non-reprocessed groups")
+    # Simplified post processing for transaction events.
+    # This should eventually be completely removed and transactions
+    # will not go through any post processing.
+    if is_transaction_event:
+        transaction_processed.send_robust(
+            sender=post_process_group,
+            project=event.project,
+            event=event,
+        )
 
-            with sentry_sdk.start_span(op="tasks.post_process_group.handle_owner_assignment"):
-                try:
-                    handle_owner_assignment(event.project, event.group, event)
-                except Exception:
-                    logger.exception("Failed to handle owner assignments")
+        event_processing_store.delete_by_key(cache_key)
 
-            rp = RuleProcessor(
-                event, is_new, is_regression, is_new_group_environment, has_reappeared
-            )
-            has_alert = False
-            with sentry_sdk.start_span(op="tasks.post_process_group.rule_processor_callbacks"):
-                # TODO(dcramer): ideally this would fanout, but serializing giant
-                # objects back and forth isn't super efficient
-                for callback, futures in rp.apply():
-                    has_alert = True
-                    safe_execute(callback, event, futures, _with_transaction=False)
+        return
 
-            try:
-                lock = locks.get(
-                    f"w-o:{event.group_id}-d-l",
-                    duration=10,
-                )
-                with lock.acquire():
-                    has_commit_key = f"w-o:{event.project.organization_id}-h-c"
-                    org_has_commit = cache.get(has_commit_key)
-                    if org_has_commit is None:
-                        org_has_commit = Commit.objects.filter(
-                            organization_id=event.project.organization_id
-                        ).exists()
-                        cache.set(has_commit_key, org_has_commit, 3600)
-
-                    if org_has_commit:
-                        group_cache_key = f"w-o-i:g-{event.group_id}"
-                        if cache.get(group_cache_key):
-                            metrics.incr(
-                                "sentry.tasks.process_suspect_commits.debounce",
-                                tags={"detail": "w-o-i:g debounce"},
-                            )
-                        else:
-                            from sentry.utils.committers import get_frame_paths
-
-                            cache.set(group_cache_key, True, 604800)  # 1 week in seconds
-                            event_frames = get_frame_paths(event.data)
-                            process_suspect_commits.delay(
-                                event_id=event.event_id,
-                                event_platform=event.platform,
-                                event_frames=event_frames,
-                                group_id=event.group_id,
-                                project_id=event.project_id,
-                            )
-            except UnableToAcquireLock:
-                pass
-            except Exception:
-                logger.exception("Failed to process suspect commits")
+    is_reprocessed = is_reprocessed_event(event.data)
+    sentry_sdk.set_tag("is_reprocessed", is_reprocessed)
+
+    # NOTE: we must pass through the full Event object, and not an
+    # event_id since the Event object may not actually have been stored
+    # in the database due to sampling.
+    from sentry.models import Commit, GroupInboxReason
+    from sentry.models.group import get_group_with_redirect
+    from sentry.models.groupinbox import add_group_to_inbox
+    from sentry.rules.processor import RuleProcessor
+    from sentry.tasks.groupowner import process_suspect_commits
+    from sentry.tasks.servicehooks import process_service_hook
+
+    # Re-bind Group since we're reading the Event object
+    # from cache, which may contain a stale group and project
+    if group is not None:
+        event.group = group
+    else:
+        event.group, _ = get_group_with_redirect(event.group_id)
+    event.group_id = event.group.id
 
-            if features.has("projects:servicehooks", project=event.project):
-                allowed_events = {"event.created"}
-                if has_alert:
-                    allowed_events.add("event.alert")
+    event.group.project = event.project
+    event.group.project.set_cached_field_value("organization", event.project.organization)
 
-                if allowed_events:
-                    for servicehook_id, events in _get_service_hooks(project_id=event.project_id):
-                        if any(e in allowed_events for e in events):
-                            process_service_hook.delay(servicehook_id=servicehook_id, event=event)
+    bind_organization_context(event.project.organization)
 
-            from sentry.tasks.sentry_apps import process_resource_change_bound
+    _capture_stats(event, is_new)
 
-            if event.get_event_type() == "error" and _should_send_error_created_hooks(
-                event.project
-            ):
-                process_resource_change_bound.delay(
-                    action="created", sender="Error", instance_id=event.event_id, instance=event
-                )
-            if is_new:
-                process_resource_change_bound.delay(
-                    action="created", sender="Group", instance_id=event.group_id
-                )
+    with sentry_sdk.start_span(op="tasks.post_process_group.add_group_to_inbox"):
+        try:
+            if is_reprocessed and is_new:
+                add_group_to_inbox(event.group, GroupInboxReason.REPROCESSED)
+        except Exception:
+            logger.exception("Failed to add group to inbox for reprocessed groups")
+
+    if not is_reprocessed:
+        # we process snoozes before rules as it might create a regression
+        # but not if it's new because you can't immediately snooze a new group
+        has_reappeared = not is_new
+        try:
+            if has_reappeared:
+                has_reappeared = process_snoozes(event.group)
+        except Exception:
+            logger.exception("Failed to process snoozes for group")
 
-            from sentry.plugins.base import plugins
+        try:
+            if not has_reappeared:  # If true, we added the .UNIGNORED reason already
+                if is_new:
+                    add_group_to_inbox(event.group, GroupInboxReason.NEW)
+                elif is_regression:
+                    add_group_to_inbox(event.group, GroupInboxReason.REGRESSION)
+        except Exception:
+            logger.exception("Failed to add group to inbox for non-reprocessed groups")
+
+        with sentry_sdk.start_span(op="tasks.post_process_group.handle_owner_assignment"):
+            try:
+                handle_owner_assignment(event.project, event.group, event)
+            except Exception:
+                logger.exception("Failed to handle owner assignments")
 
-            for plugin in plugins.for_project(event.project):
-                plugin_post_process_group(
-                    plugin_slug=plugin.slug, event=event, is_new=is_new, is_regresion=is_regression
-                )
+        rp = RuleProcessor(event, is_new, is_regression, is_new_group_environment, has_reappeared)
+        has_alert = False
+        with sentry_sdk.start_span(op="tasks.post_process_group.rule_processor_callbacks"):
+            # TODO(dcramer): ideally this would fanout, but serializing giant
+            # objects back and forth isn't super efficient
+            for callback, futures in rp.apply():
+                has_alert = True
+                safe_execute(callback, event, futures, _with_transaction=False)
 
-            from sentry import similarity
+        try:
+            lock = locks.get(
+                f"w-o:{event.group_id}-d-l",
+                duration=10,
+            )
+            with lock.acquire():
+                has_commit_key = f"w-o:{event.project.organization_id}-h-c"
+                org_has_commit = cache.get(has_commit_key)
+                if org_has_commit is None:
+                    org_has_commit = Commit.objects.filter(
+                        organization_id=event.project.organization_id
+                    ).exists()
+                    cache.set(has_commit_key, org_has_commit, 3600)
+
+                if org_has_commit:
+                    group_cache_key = f"w-o-i:g-{event.group_id}"
+                    if cache.get(group_cache_key):
+                        metrics.incr(
+                            "sentry.tasks.process_suspect_commits.debounce",
+                            tags={"detail": "w-o-i:g debounce"},
+                        )
+                    else:
+                        from sentry.utils.committers import get_frame_paths
+
+                        cache.set(group_cache_key, True, 604800)  # 1 week in seconds
+                        event_frames = get_frame_paths(event.data)
+                        process_suspect_commits.delay(
+                            event_id=event.event_id,
+                            event_platform=event.platform,
+                            event_frames=event_frames,
+                            group_id=event.group_id,
+                            project_id=event.project_id,
+                        )
+        except UnableToAcquireLock:
+            pass
+        except Exception:
+            logger.exception("Failed to process suspect commits")
+
+        if features.has("projects:servicehooks", project=event.project):
+            allowed_events = {"event.created"}
+            if has_alert:
+                allowed_events.add("event.alert")
+
+            if allowed_events:
+                for servicehook_id, events in _get_service_hooks(project_id=event.project_id):
+                    if any(e in allowed_events for e in events):
+                        process_service_hook.delay(servicehook_id=servicehook_id, event=event)
+
+        from sentry.tasks.sentry_apps import process_resource_change_bound
+
+        if event.get_event_type() == "error" and _should_send_error_created_hooks(event.project):
+            process_resource_change_bound.delay(
+                action="created", sender="Error", instance_id=event.event_id, instance=event
+            )
+        if is_new:
+            process_resource_change_bound.delay(
+                action="created", sender="Group", instance_id=event.group_id
+            )
 
-            with sentry_sdk.start_span(op="tasks.post_process_group.similarity"):
-                safe_execute(similarity.record, event.project, [event], _with_transaction=False)
+        from sentry.plugins.base import plugins
 
-        # Patch attachments that were ingested on the standalone path.
-        with sentry_sdk.start_span(op="tasks.post_process_group.update_existing_attachments"):
-            try:
-                update_existing_attachments(event)
-            except Exception:
-                logger.exception("Failed to update existing attachments")
-
-        if not is_reprocessed:
-            event_processed.send_robust(
-                sender=post_process_group,
-                project=event.project,
-                event=event,
-                primary_hash=kwargs.get("primary_hash"),
+        for plugin in plugins.for_project(event.project):
+            plugin_post_process_group(
+                plugin_slug=plugin.slug, event=event, is_new=is_new, is_regresion=is_regression
             )
 
-        with metrics.timer("tasks.post_process.delete_event_cache"):
-            event_processing_store.delete_by_key(cache_key)
+        from sentry import similarity
+
+        with sentry_sdk.start_span(op="tasks.post_process_group.similarity"):
+            safe_execute(similarity.record, event.project, [event], _with_transaction=False)
+
+    # Patch attachments that were ingested on the standalone path.
+    with sentry_sdk.start_span(op="tasks.post_process_group.update_existing_attachments"):
+        try:
+            update_existing_attachments(event)
+        except Exception:
+            logger.exception("Failed to update existing attachments")
+
+    if not is_reprocessed:
+        event_processed.send_robust(
+            sender=post_process_group,
+            project=event.project,
+            event=event,
+            primary_hash=kwargs.get("primary_hash"),
+        )
+
+    with metrics.timer("tasks.post_process.delete_event_cache"):
+        event_processing_store.delete_by_key(cache_key)
 
 
 def process_snoozes(group):
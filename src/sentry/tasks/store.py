@@ -100,7 +100,36 @@ def should_demote_symbolication(project_id):
             "project_id": project_id,
         },
     )
-    return not never_lowpri and always_lowpri
+    if never_lowpri:
+        return False
+    if always_lowpri:
+        return True
+
+    if options.get("symbolicate-event.low-priority.auto-routing"):
+        try:
+            return project_id in _get_lpq_projects()
+        except Exception as e:
+            sentry_sdk.capture_exception(e)
+
+    return False
+
+
+# Projects assigned to the low priority queue are cached for this many seconds,
+# as they are looked up for every event.
+LPQ_PROJECTS_CACHE_TTL = 10
+
+_lpq_projects_cache = (0.0, frozenset())
+
+
+def _get_lpq_projects():
+    global _lpq_projects_cache
+
+    expires_at, lpq_projects = _lpq_projects_cache
+    if expires_at <= time():
+        lpq_projects = frozenset(realtime_metrics.get_lpq_projects())
+        _lpq_projects_cache = (time() + LPQ_PROJECTS_CACHE_TTL, lpq_projects)
+
+    return lpq_projects
 
 
 def submit_symbolicate(project, from_reprocessing, cache_key, event_id, start_time, data):
@@ -283,12 +312,14 @@ def _do_symbolicate_event(cache_key, start_time, event_id, symbolicate_task, dat
 
     submission_ratio = options.get("symbolicate-event.low-priority.metrics.submission-rate")
     submit_realtime_metrics = not from_reprocessing and random.random() < submission_ratio
+    timestamp = int(symbolication_start_time)
 
     if submit_realtime_metrics:
+        # The event is counted before symbolication, so that events which time
+        # out or fail are counted as well.
         with sentry_sdk.start_span(op="tasks.store.symbolicate_event.low_priority.metrics.counter"):
-            timestamp = int(symbolication_start_time)
             try:
-                realtime_metrics.increment_project_event_counter(project_id, timestamp)
+                realtime_metrics.increment_multi(events=[(project_id, timestamp)])
             except Exception as e:
                 sentry_sdk.capture_exception(e)
 
@@ -367,8 +398,8 @@ def _do_symbolicate_event(cache_key, start_time, event_id, symbolicate_task, dat
         ):
             symbolication_duration = int(time() - symbolication_start_time)
             try:
-                realtime_metrics.increment_project_duration_counter(
-                    project_id, timestamp, symbolication_duration
+                realtime_metrics.increment_multi(
+                    durations=[(project_id, timestamp, symbolication_duration)]
                 )
             except Exception as e:
                 sentry_sdk.capture_exception(e)
@@ -925,6 +956,85 @@ def _do_save_event(
             time_synthetic_monitoring_event(data, project_id, start_time)
 
 
+def save_event_batch(events, projects, on_saving=None):
+    """
+    Saves a batch of error events that need neither processing nor
+    symbolication without going through the ``save_event`` task, so that
+    release, environment and event user lookups as well as nodestore and
+    eventstream writes are shared by all events in the batch.
+
+    :param events:   A sequence of ``(data, start_time)`` tuples, where data is
+                     the normalized event payload.
+    :param projects: A mapping of project IDs to all projects in the batch.
+    :param on_saving: Optional callback invoked with the index of every event
+                      in ``events`` before the first write for it that must
+                      not be repeated. Events it has not been invoked for
+                      are untouched if saving the batch fails.
+    """
+    from sentry.event_manager import save_error_events
+
+    jobs = []
+
+    for index, (data, start_time) in enumerate(events):
+        data = CanonicalKeyDict(data)
+        project_id = data["project"]
+
+        if killswitch_matches_context(
+            "store.load-shed-save-event-projects",
+            {
+                "project_id": project_id,
+                "event_type": data.get("type") or "none",
+                "platform": data.get("platform") or "none",
+            },
+        ):
+            if on_saving is not None:
+                on_saving(index)
+            reprocessing2.mark_event_reprocessed(data)
+            continue
+
+        if reprocessing.event_supports_reprocessing(data):
+            with metrics.timer("tasks.store.save_event_batch.delete_raw_event"):
+                delete_raw_event(project_id, data["event_id"], allow_hint_clear=True)
+
+        jobs.append(
+            {"data": data, "project_id": project_id, "start_time": start_time, "index": index}
+        )
+
+    if not jobs:
+        return
+
+    with metrics.timer("tasks.store.save_event_batch.save_error_events"):
+        save_error_events(
+            jobs,
+            projects,
+            on_saving=None if on_saving is None else lambda job: on_saving(job["index"]),
+        )
+
+    for job in jobs:
+        data = job["data"]
+        if "discarded" not in job:
+            # Put the updated event into the cache so that post_process has
+            # the most recent data.
+            with metrics.timer("tasks.store.save_event_batch.write_processing_cache"):
+                event_processing_store.store(dict(data.items()))
+
+        reprocessing2.mark_event_reprocessed(data)
+
+        if job["start_time"]:
+            metrics.timing(
+                "events.time-to-process",
+                time() - job["start_time"],
+                instance=data["platform"],
+                tags={
+                    "is_reprocessing2": "true"
+                    if reprocessing2.is_reprocessed_event(data)
+                    else "false",
+                },
+            )
+
+        time_synthetic_monitoring_event(data, job["project_id"], job["start_time"])
+
+
 def time_synthetic_monitoring_event(data, project_id, start_time):
     """
     For special events produced by the recurring synthetic monitoring
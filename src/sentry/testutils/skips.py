@@ -1,5 +1,6 @@
 import os
 import socket
+from importlib.util import find_spec
 from urllib.parse import urlparse
 
 import pytest
@@ -80,3 +81,8 @@ def relay_is_available():
 requires_relay = pytest.mark.skipif(
     not relay_is_available(), reason="requires relay server running"
 )
+
+
+requires_pytest_benchmark = pytest.mark.skipif(
+    find_spec("pytest_benchmark") is None, reason="requires pytest-benchmark"
+)
@@ -1,17 +1,22 @@
+import atexit
 import itertools
 import logging
 import operator
 import random
+import time
 import uuid
-from collections import defaultdict, namedtuple
+from collections import OrderedDict, defaultdict, namedtuple
 from functools import reduce
 from hashlib import md5
+from threading import Event, Lock, Timer
+from weakref import WeakSet
 
 from django.utils import timezone
 from django.utils.encoding import force_bytes
 from pkg_resources import resource_string
 
 from sentry.tsdb.base import BaseTSDB
+from sentry.utils import metrics
 from sentry.utils.compat import crc32, map, zip
 from sentry.utils.dates import to_datetime, to_timestamp
 from sentry.utils.redis import SentryScript, check_cluster_versions, get_cluster_from_options
@@ -22,6 +27,10 @@ logger = logging.getLogger(__name__)
 SketchParameters = namedtuple("SketchParameters", "depth width capacity")
 
 CountMinScript = SentryScript(None, resource_string("sentry", "scripts/tsdb/cmsketch.lua"))
+PFAddMultiScript = SentryScript(None, resource_string("sentry", "scripts/tsdb/pfaddmulti.lua"))
+PFMergeValuesScript = SentryScript(
+    None, resource_string("sentry", "scripts/tsdb/pfmergevalues.lua")
+)
 
 
 class SuppressionWrapper:
@@ -50,6 +59,247 @@ class SuppressionWrapper:
         return True
 
 
+class ScriptBatches:
+    """\
+    Collects the keys and arguments of script calls by the host that their
+    routing key maps to, such that the calls for each host can be made with a
+    single script invocation (or one invocation per ``max_keys`` keys.)
+    """
+
+    def __init__(self, router, max_keys):
+        self.router = router
+        self.max_keys = max_keys
+        # host id -> [(routing key, keys, arguments)]
+        self.batches = defaultdict(list)
+
+    def add(self, routing_key, keys, arguments):
+        batches = self.batches[self.router.get_host_for_key(routing_key)]
+        if not batches or len(batches[-1][1]) + len(keys) > self.max_keys:
+            batches.append((routing_key, [], []))
+
+        _, batch_keys, batch_arguments = batches[-1]
+        batch_keys.extend(keys)
+        batch_arguments.extend(arguments)
+
+    def get_commands(self, script, arguments=()):
+        """
+        Returns the script invocations in the format of ``execute_commands``.
+        """
+        commands = defaultdict(list)
+        for batches in self.batches.values():
+            for routing_key, keys, batch_arguments in batches:
+                commands[routing_key].append((script, keys, [*arguments, *batch_arguments]))
+        return commands
+
+
+class BucketCache:
+    """\
+    A process local LRU cache for the values of rollup buckets that are
+    complete, and therefore are not expected to change anymore. Entries
+    expire after ``ttl`` seconds, which bounds how long late writes, as well
+    as merges and deletions by other processes, are not seen.
+
+    Cache keys are tuples, of which ``model_index`` is the model and
+    ``key_index`` the key the value belongs to.
+    """
+
+    model_index = 1
+    key_index = 4
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        # cache key -> (value, expires_at)
+        self._values = OrderedDict()
+        self._lock = Lock()
+
+    def get_many(self, keys):
+        results = {}
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                item = self._values.get(key)
+                if item is None:
+                    continue
+                value, expires_at = item
+                if expires_at <= now:
+                    del self._values[key]
+                    continue
+                self._values.move_to_end(key)
+                results[key] = value
+        return results
+
+    def set_many(self, values):
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            for key, value in values.items():
+                self._values[key] = (value, expires_at)
+                self._values.move_to_end(key)
+            while len(self._values) > self.max_size:
+                self._values.popitem(last=False)
+
+    def invalidate(self, models, keys):
+        """
+        Removes all cached values of the given models and keys.
+        """
+        models = {model.value for model in models}
+        keys = set(keys)
+        with self._lock:
+            for cache_key in [
+                cache_key
+                for cache_key in self._values
+                if cache_key[self.model_index] in models and cache_key[self.key_index] in keys
+            ]:
+                del self._values[cache_key]
+
+
+class RequestCoalescer:
+    """\
+    Coalesces concurrent identical requests within a process, such that only
+    one of them is executed while the others wait for its result.
+    """
+
+    class Request:
+        def __init__(self):
+            self.done = Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._requests = {}
+        self._lock = Lock()
+
+    def call(self, key, func):
+        with self._lock:
+            request = self._requests.get(key)
+            leader = request is None
+            if leader:
+                request = self._requests[key] = self.Request()
+
+        if not leader:
+            metrics.incr("tsdb.read_cache.coalesced")
+            request.done.wait()
+            if request.error is not None:
+                raise request.error
+            return request.result
+
+        try:
+            request.result = func()
+        except Exception as e:
+            request.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._requests[key]
+            request.done.set()
+
+        return request.result
+
+
+class CounterBuffer:
+    """\
+    Aggregates counter increments in process, such that repeated increments of
+    the same hash field are written as a single ``HINCRBY``. Pending
+    increments are written in one pipelined batch per host, either when
+    ``max_size`` hash fields are pending or ``interval`` seconds after the
+    first pending increment, whichever comes first, and when the process
+    exits.
+
+    Increments are delayed by at most ``interval`` seconds. Increments that
+    cannot be written are dropped and counted in the
+    ``tsdb.counter_buffer.dropped`` metric, so that at most ``max_size`` hash
+    fields of increments are lost per failed flush.
+    """
+
+    def __init__(self, write, interval, max_size):
+        self.write = write
+        self.interval = interval
+        self.max_size = max_size
+
+        # (cluster, durable) -> ((hash_key, hash_field) -> count, hash_key -> expiry)
+        self._pending = {}
+        self._size = 0
+        self._timer = None
+        self._lock = Lock()
+
+    def add(self, cluster, durable, key_operations, key_expiries):
+        with self._lock:
+            operations, expiries = self._pending.setdefault((cluster, durable), ({}, {}))
+
+            for field, count in key_operations.items():
+                if field not in operations:
+                    operations[field] = 0
+                    self._size += 1
+                operations[field] += count
+
+            for hash_key, expiry in key_expiries.items():
+                if expiries.get(hash_key, 0) < expiry:
+                    expiries[hash_key] = expiry
+
+            flush = self._size >= self.max_size
+            if not flush and self._timer is None:
+                self._timer = Timer(self.interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if flush:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            size, self._size = self._size, 0
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if not pending:
+            return
+
+        metrics.timing("tsdb.counter_buffer.flushed", size)
+
+        for (cluster, durable), (operations, expiries) in pending.items():
+            try:
+                self.write(cluster, durable, operations, expiries)
+            except Exception:
+                logger.exception("Failed to write buffered TSDB counters")
+                metrics.incr("tsdb.counter_buffer.dropped", amount=len(operations))
+
+
+# All counter buffers of the process, which are flushed when it shuts down.
+_counter_buffers = WeakSet()
+_counter_buffers_lock = Lock()
+_counter_buffers_registered = False
+
+
+def _flush_counter_buffers(**kwargs):
+    with _counter_buffers_lock:
+        counter_buffers = list(_counter_buffers)
+
+    for counter_buffer in counter_buffers:
+        counter_buffer.flush()
+
+
+def flush_counter_buffer_on_shutdown(counter_buffer):
+    """\
+    Flushes the counter buffer when the process exits, without keeping the
+    buffer alive. The shutdown handlers are only registered once per process.
+    """
+    global _counter_buffers_registered
+
+    with _counter_buffers_lock:
+        _counter_buffers.add(counter_buffer)
+        if _counter_buffers_registered:
+            return
+        _counter_buffers_registered = True
+
+    from celery.signals import worker_process_shutdown
+
+    atexit.register(_flush_counter_buffers)
+    # Celery worker processes can exit without running `atexit` handlers.
+    worker_process_shutdown.connect(_flush_counter_buffers, weak=False)
+
+
 class RedisTSDB(BaseTSDB):
     """
     A time series storage backend for Redis.
@@ -103,15 +353,56 @@ class RedisTSDB(BaseTSDB):
     frequency table can be displayed as percentages of the whole data set.
     (Additional documentation and the bulk of the logic for implementing the
     frequency table API can be found in the ``cmsketch.lua`` script.)
+
+    Counter increments can be aggregated in process before they are written
+    by setting ``counter_buffer_interval`` (in seconds), see ``CounterBuffer``.
+
+    Reads of counter and distinct counter series can be cached in process by
+    setting ``read_cache_size`` to the number of buckets to cache. Buckets are
+    cached once they are complete, which is ``read_cache_delay`` seconds after
+    their rollup period ended, for at most ``read_cache_ttl`` seconds, so that
+    writes of late events are picked up eventually. Only the remaining buckets
+    are read from Redis, and concurrent identical reads are coalesced. Merges
+    and deletions invalidate the buckets cached by the same process, other
+    processes see them once their cached buckets expire.
     """
 
     DEFAULT_SKETCH_PARAMETERS = SketchParameters(3, 128, 50)
 
+    # The maximum number of keys that distinct counters and frequency tables
+    # are recorded to with a single script invocation.
+    max_batch_keys = 1000
+
+    # The number of rollup buckets that are merged at a time, and for how long
+    # the progress of a merge is kept so that it can be resumed.
+    merge_chunk_size = 50
+    merge_checkpoint_ttl = 60 * 60 * 24
+
     def __init__(self, prefix="ts:", vnodes=64, **options):
         self.cluster, options = get_cluster_from_options("SENTRY_TSDB_OPTIONS", options)
         self.prefix = prefix
         self.vnodes = vnodes
         self.enable_frequency_sketches = options.pop("enable_frequency_sketches", False)
+
+        counter_buffer_interval = options.pop("counter_buffer_interval", None)
+        counter_buffer_size = options.pop("counter_buffer_size", 10000)
+        if counter_buffer_interval:
+            self.counter_buffer = CounterBuffer(
+                self._write_counters, counter_buffer_interval, counter_buffer_size
+            )
+            flush_counter_buffer_on_shutdown(self.counter_buffer)
+        else:
+            self.counter_buffer = None
+
+        read_cache_size = options.pop("read_cache_size", None)
+        self.read_cache_delay = options.pop("read_cache_delay", 300)
+        read_cache_ttl = options.pop("read_cache_ttl", 60)
+        if read_cache_size:
+            self.bucket_cache = BucketCache(read_cache_size, read_cache_ttl)
+            self.request_coalescer = RequestCoalescer()
+        else:
+            self.bucket_cache = None
+
         super().__init__(**options)
 
     def validate(self):
@@ -222,43 +513,51 @@ class RedisTSDB(BaseTSDB):
             default_timestamp = timezone.now()
 
         for (cluster, durable), environment_ids in self.get_cluster_groups({None, environment_id}):
-            manager = cluster.map()
-            if not durable:
-                manager = SuppressionWrapper(manager)
-
-            with manager as client:
-                # (hash_key, hash_field) -> count
-                key_operations = defaultdict(lambda: 0)
-                # (hash_key) -> "max expiration encountered"
-                key_expiries = defaultdict(lambda: 0.0)
-
-                for rollup, max_values in self.rollups.items():
-                    for item in items:
-                        if len(item) == 2:
-                            model, key = item
-                            options = {}
-                        else:
-                            model, key, options = item
+            # (hash_key, hash_field) -> count
+            key_operations = defaultdict(lambda: 0)
+            # (hash_key) -> "max expiration encountered"
+            key_expiries = defaultdict(lambda: 0.0)
+
+            for rollup, max_values in self.rollups.items():
+                for item in items:
+                    if len(item) == 2:
+                        model, key = item
+                        options = {}
+                    else:
+                        model, key, options = item
+
+                    count = options.get("count", default_count)
+                    timestamp = options.get("timestamp", default_timestamp)
+
+                    expiry = self.calculate_expiry(rollup, max_values, timestamp)
+
+                    for environment_id in environment_ids:
+                        hash_key, hash_field = self.make_counter_key(
+                            model, rollup, timestamp, key, environment_id
+                        )
 
-                        count = options.get("count", default_count)
-                        timestamp = options.get("timestamp", default_timestamp)
+                        if key_expiries[hash_key] < expiry:
+                            key_expiries[hash_key] = expiry
 
-                        expiry = self.calculate_expiry(rollup, max_values, timestamp)
+                        key_operations[(hash_key, hash_field)] += count
 
-                        for environment_id in environment_ids:
-                            hash_key, hash_field = self.make_counter_key(
-                                model, rollup, timestamp, key, environment_id
-                            )
+            if self.counter_buffer is not None:
+                self.counter_buffer.add(cluster, durable, key_operations, key_expiries)
+            else:
+                self._write_counters(cluster, durable, key_operations, key_expiries)
 
-                            if key_expiries[hash_key] < expiry:
-                                key_expiries[hash_key] = expiry
+    def _write_counters(self, cluster, durable, key_operations, key_expiries):
+        key_expiries = dict(key_expiries)
 
-                            key_operations[(hash_key, hash_field)] += count
+        manager = cluster.map()
+        if not durable:
+            manager = SuppressionWrapper(manager)
 
-                for (hash_key, hash_field), count in key_operations.items():
-                    client.hincrby(hash_key, hash_field, count)
-                    if key_expiries.get(hash_key):
-                        client.expireat(hash_key, key_expiries.pop(hash_key))
+        with manager as client:
+            for (hash_key, hash_field), count in key_operations.items():
+                client.hincrby(hash_key, hash_field, count)
+                if key_expiries.get(hash_key):
+                    client.expireat(hash_key, key_expiries.pop(hash_key))
 
     def get_range(
         self, model, keys, start, end, rollup=None, environment_ids=None, use_cache=False
@@ -279,27 +578,71 @@ class RedisTSDB(BaseTSDB):
         self.validate_arguments([model], [environment_id])
 
         rollup, series = self.get_optimal_rollup_series(start, end, rollup)
-        series = map(to_datetime, series)
 
-        results = []
-        cluster, _ = self.get_cluster(environment_id)
-        with cluster.map() as client:
-            for key in keys:
-                for timestamp in series:
+        def get_counts(requests):
+            promises = []
+            cluster, _ = self.get_cluster(environment_id)
+            with cluster.map() as client:
+                for key, timestamp in requests:
                     hash_key, hash_field = self.make_counter_key(
-                        model, rollup, timestamp, key, environment_id
-                    )
-                    results.append(
-                        (to_timestamp(timestamp), key, client.hget(hash_key, hash_field))
+                        model, rollup, to_datetime(timestamp), key, environment_id
                     )
+                    promises.append(client.hget(hash_key, hash_field))
 
-        results_by_key = defaultdict(dict)
-        for epoch, key, count in results:
-            results_by_key[key][epoch] = int(count.value or 0)
+            return [int(promise.value or 0) for promise in promises]
 
-        for key, points in results_by_key.items():
-            results_by_key[key] = sorted(points.items())
-        return dict(results_by_key)
+        results = self._get_series("range", model, keys, rollup, series, environment_id, get_counts)
+
+        return {
+            key: [(float(timestamp), count) for timestamp, count in points]
+            for key, points in results.items()
+        }
+
+    def _invalidate_read_cache(self, models, keys):
+        if self.bucket_cache is not None:
+            self.bucket_cache.invalidate(models, keys)
+
+    def _get_series(self, name, model, keys, rollup, series, environment_id, fetch):
+        """
+        Returns the values of all keys for all timestamps of the series.
+        ``fetch`` takes a list of ``(key, timestamp)`` tuples and returns
+        their values in the same order.
+
+        Values of complete buckets are cached, if the read cache is enabled.
+        """
+        requests = [(key, timestamp) for key in keys for timestamp in series]
+
+        if self.bucket_cache is None:
+            values = dict(zip(requests, fetch(requests)))
+        else:
+            complete_before = time.time() - self.read_cache_delay
+
+            def get_cache_key(request):
+                key, timestamp = request
+                return (name, model.value, rollup, timestamp, key, environment_id)
+
+            cached = self.bucket_cache.get_many(map(get_cache_key, requests))
+            values = {request: cached.get(get_cache_key(request)) for request in requests}
+
+            missing = [request for request, value in values.items() if value is None]
+            metrics.timing("tsdb.read_cache.hits", len(requests) - len(missing))
+            if missing:
+                fetched = self.request_coalescer.call(
+                    (name, model.value, rollup, environment_id, tuple(missing)),
+                    lambda: fetch(missing),
+                )
+                values.update(zip(missing, fetched))
+                self.bucket_cache.set_many(
+                    {
+                        get_cache_key(request): value
+                        for request, value in zip(missing, fetched)
+                        if request[1] + rollup <= complete_before
+                    }
+                )
+
+        return {
+            key: [(timestamp, values[(key, timestamp)]) for timestamp in series] for key in keys
+        }
 
     def merge(self, model, destination, sources, timestamp=None, environment_ids=None):
         environment_ids = (set(environment_ids) if environment_ids is not None else set()).union(
@@ -311,43 +654,92 @@ class RedisTSDB(BaseTSDB):
         rollups = self.get_active_series(timestamp=timestamp)
 
         for (cluster, durable), environment_ids in self.get_cluster_groups(environment_ids):
-            manager = cluster.map()
-            if not durable:
-                manager = SuppressionWrapper(manager)
-
-            with manager as client:
-                data = {}
-                for rollup, series in rollups.items():
-                    data[rollup] = {}
-                    for timestamp in series:
-                        results = data[rollup][timestamp] = defaultdict(list)
+            for buckets in self._iter_merge_chunks(
+                cluster, "counters", model, destination, sources, environment_ids, rollups
+            ):
+                manager = cluster.map()
+                if not durable:
+                    manager = SuppressionWrapper(manager)
+
+                # (rollup, timestamp, environment_id) -> promises
+                data = defaultdict(list)
+                with manager as client:
+                    for rollup, timestamp in buckets:
                         for source in sources:
                             for environment_id in environment_ids:
                                 source_hash_key, source_hash_field = self.make_counter_key(
                                     model, rollup, timestamp, source, environment_id
                                 )
-                                results[environment_id].append(
+                                data[(rollup, timestamp, environment_id)].append(
                                     client.hget(source_hash_key, source_hash_field)
                                 )
                                 client.hdel(source_hash_key, source_hash_field)
 
-            with cluster.map() as client:
-                for rollup, series in data.items():
-                    for timestamp, results in series.items():
-                        for environment_id, promises in results.items():
-                            total = sum(int(p.value) for p in promises if p.value)
-                            if total:
-                                (
-                                    destination_hash_key,
-                                    destination_hash_field,
-                                ) = self.make_counter_key(
-                                    model, rollup, timestamp, destination, environment_id
-                                )
-                                client.hincrby(destination_hash_key, destination_hash_field, total)
-                                client.expireat(
-                                    destination_hash_key,
-                                    self.calculate_expiry(rollup, self.rollups[rollup], timestamp),
-                                )
+                with cluster.map() as client:
+                    for (rollup, timestamp, environment_id), promises in data.items():
+                        total = sum(int(p.value) for p in promises if p.value)
+                        if total:
+                            destination_hash_key, destination_hash_field = self.make_counter_key(
+                                model, rollup, timestamp, destination, environment_id
+                            )
+                            client.hincrby(destination_hash_key, destination_hash_field, total)
+                            client.expireat(
+                                destination_hash_key,
+                                self.calculate_expiry(rollup, self.rollups[rollup], timestamp),
+                            )
+
+        self._invalidate_read_cache([model], [destination, *sources])
+
+    def _iter_merge_chunks(
+        self, cluster, name, model, destination, sources, environment_ids, rollups
+    ):
+        """
+        Yields the buckets of ``rollups`` (as returned by
+        ``get_active_series``) in chunks of ``merge_chunk_size`` ``(rollup,
+        timestamp)`` pairs.
+
+        The progress is checkpointed after every chunk, so that a merge that
+        has been interrupted continues after the last chunk that was merged
+        when it is retried with the same arguments.
+        """
+        checkpoint_key = "{prefix}merge:{checksum}".format(
+            prefix=self.prefix,
+            checksum=md5(
+                repr(
+                    (
+                        name,
+                        model.value,
+                        destination,
+                        sorted(sources),
+                        sorted(environment_ids, key=lambda e: e or 0),
+                    )
+                ).encode("utf-8")
+            ).hexdigest(),
+        )
+        client = cluster.get_local_client_for_key(checkpoint_key)
+
+        # Buckets are merged ordered by rollup and timestamp, which is also how
+        # the checkpoint compares to them.
+        rollup_order = {rollup: i for i, rollup in enumerate(self.rollups)}
+        checkpoint = client.get(checkpoint_key)
+        if checkpoint is not None:
+            checkpoint = tuple(map(int, checkpoint.split(b":")))
+            metrics.incr("tsdb.merge.resumed", tags={"name": name})
+
+        buckets = []
+        for rollup, series in rollups.items():
+            for timestamp in series:
+                position = (rollup_order[rollup], int(to_timestamp(timestamp)))
+                if checkpoint is None or position > checkpoint:
+                    buckets.append((position, rollup, timestamp))
+        buckets.sort(key=operator.itemgetter(0))
+
+        for i in range(0, len(buckets), self.merge_chunk_size):
+            chunk = buckets[i : i + self.merge_chunk_size]
+            yield [(rollup, timestamp) for _, rollup, timestamp in chunk]
+            client.setex(checkpoint_key, self.merge_checkpoint_ttl, "{}:{}".format(*chunk[-1][0]))
+
+        client.delete(checkpoint_key)
 
     def delete(self, models, keys, start=None, end=None, timestamp=None, environment_ids=None):
         environment_ids = (set(environment_ids) if environment_ids is not None else set()).union(
@@ -375,6 +767,8 @@ class RedisTSDB(BaseTSDB):
 
                                     client.hdel(hash_key, hash_field)
 
+        self._invalidate_read_cache(models, keys)
+
     def record(self, model, key, values, timestamp=None, environment_id=None):
         self.validate_arguments([model], [environment_id])
 
@@ -383,6 +777,10 @@ class RedisTSDB(BaseTSDB):
     def record_multi(self, items, timestamp=None, environment_id=None):
         """
         Record an occurrence of an item in a distinct counter.
+
+        Values are deduplicated per distinct counter, and the distinct
+        counters that are routed to the same host are recorded with a single
+        script invocation.
         """
         self.validate_arguments([model for model, key, values in items], [environment_id])
 
@@ -391,19 +789,32 @@ class RedisTSDB(BaseTSDB):
 
         ts = int(to_timestamp(timestamp))  # ``timestamp`` is not actually a timestamp :(
 
+        # (model, key) -> values
+        values_by_key = {}
+        for model, key, values in items:
+            values_by_key.setdefault((model, key), set()).update(values)
+
         for (cluster, durable), environment_ids in self.get_cluster_groups({None, environment_id}):
-            manager = cluster.fanout()
-            if not durable:
-                manager = SuppressionWrapper(manager)
+            batches = self._make_script_batches(cluster)
 
-            with manager as client:
-                for model, key, values in items:
-                    c = client.target_key(key)
-                    for rollup, max_values in self.rollups.items():
-                        for environment_id in environment_ids:
-                            k = self.make_key(model, rollup, ts, key, environment_id)
-                            c.pfadd(k, *values)
-                            c.expireat(k, self.calculate_expiry(rollup, max_values, timestamp))
+            for (model, key), values in values_by_key.items():
+                for rollup, max_values in self.rollups.items():
+                    expiry = self.calculate_expiry(rollup, max_values, timestamp)
+                    for environment_id in environment_ids:
+                        batches.add(
+                            key,
+                            [self.make_key(model, rollup, ts, key, environment_id)],
+                            [expiry, len(values), *values],
+                        )
+
+            try:
+                cluster.execute_commands(batches.get_commands(PFAddMultiScript))
+            except Exception:
+                if durable:
+                    raise
+
+    def _make_script_batches(self, cluster):
+        return ScriptBatches(cluster.get_router(), self.max_batch_keys)
 
     def get_distinct_counts_series(
         self, model, keys, start, end=None, rollup=None, environment_id=None
@@ -415,24 +826,22 @@ class RedisTSDB(BaseTSDB):
 
         rollup, series = self.get_optimal_rollup_series(start, end, rollup)
 
-        responses = {}
-        cluster, _ = self.get_cluster(environment_id)
-        with cluster.fanout() as client:
-            for key in keys:
-                c = client.target_key(key)
-                r = responses[key] = []
-                for timestamp in series:
-                    r.append(
-                        (
-                            timestamp,
-                            c.pfcount(self.make_key(model, rollup, timestamp, key, environment_id)),
+        def get_distinct_counts(requests):
+            promises = []
+            cluster, _ = self.get_cluster(environment_id)
+            with cluster.fanout() as client:
+                for key, timestamp in requests:
+                    promises.append(
+                        client.target_key(key).pfcount(
+                            self.make_key(model, rollup, timestamp, key, environment_id)
                         )
                     )
 
-        return {
-            key: [(timestamp, promise.value) for timestamp, promise in value]
-            for key, value in responses.items()
-        }
+            return [promise.value for promise in promises]
+
+        return self._get_series(
+            "distinct_counts", model, keys, rollup, series, environment_id, get_distinct_counts
+        )
 
     def get_distinct_counts_totals(
         self, model, keys, start, end=None, rollup=None, environment_id=None, use_cache=False
@@ -557,57 +966,55 @@ class RedisTSDB(BaseTSDB):
         for (cluster, durable), environment_ids in self.get_cluster_groups(environment_ids):
             wrapper = SuppressionWrapper if not durable else lambda value: value
 
-            temporary_id = uuid.uuid1().hex
-
-            def make_temporary_key(key):
-                return f"{self.prefix}{temporary_id}:{key}"
-
-            data = {}
-            for rollup, series in rollups.items():
-                data[rollup] = {timestamp: {e: [] for e in environment_ids} for timestamp in series}
-
-            with wrapper(cluster.fanout()) as client:
-                for source in sources:
-                    c = client.target_key(source)
-                    for rollup, series in data.items():
-                        for timestamp, results in series.items():
+            for buckets in self._iter_merge_chunks(
+                cluster, "distinct_counts", model, destination, sources, environment_ids, rollups
+            ):
+                # (rollup, timestamp, environment_id) -> promises
+                data = defaultdict(list)
+                with wrapper(cluster.fanout()) as client:
+                    for source in sources:
+                        c = client.target_key(source)
+                        for rollup, timestamp in buckets:
                             for environment_id in environment_ids:
                                 key = self.make_key(
                                     model, rollup, to_timestamp(timestamp), source, environment_id
                                 )
-                                results[environment_id].append(c.get(key))
+                                data[(rollup, timestamp, environment_id)].append(c.get(key))
                                 c.delete(key)
 
-            with wrapper(cluster.fanout()) as client:
-                c = client.target_key(destination)
+                keys = []
+                arguments = []
+                for (rollup, timestamp, environment_id), promises in data.items():
+                    values = [promise.value for promise in promises if promise.value is not None]
+                    if values:
+                        keys.append(
+                            self.make_key(
+                                model, rollup, to_timestamp(timestamp), destination, environment_id
+                            )
+                        )
+                        arguments.extend(
+                            (
+                                self.calculate_expiry(rollup, self.rollups[rollup], timestamp),
+                                len(values),
+                                *values,
+                            )
+                        )
 
-                temporary_key_sequence = itertools.count()
+                if keys:
+                    temporary_key = f"{self.prefix}{uuid.uuid1().hex}:merge"
+                    try:
+                        cluster.execute_commands(
+                            {
+                                destination: [
+                                    (PFMergeValuesScript, [temporary_key, *keys], arguments)
+                                ]
+                            }
+                        )
+                    except Exception:
+                        if durable:
+                            raise
 
-                for rollup, series in data.items():
-                    for timestamp, results in series.items():
-                        for environment_id, promises in results.items():
-                            values = {}
-                            for promise in promises:
-                                if promise.value is None:
-                                    continue
-                                k = make_temporary_key(next(temporary_key_sequence))
-                                values[k] = promise.value
-
-                            if values:
-                                key = self.make_key(
-                                    model,
-                                    rollup,
-                                    to_timestamp(timestamp),
-                                    destination,
-                                    environment_id,
-                                )
-                                c.mset(values)
-                                c.pfmerge(key, key, *values.keys())
-                                c.delete(*values.keys())
-                                c.expireat(
-                                    key,
-                                    self.calculate_expiry(rollup, self.rollups[rollup], timestamp),
-                                )
+        self._invalidate_read_cache([model], [destination, *sources])
 
     def delete_distinct_counts(
         self, models, keys, start=None, end=None, timestamp=None, environment_ids=None
@@ -642,11 +1049,20 @@ class RedisTSDB(BaseTSDB):
                                         )
                                     )
 
+        self._invalidate_read_cache(models, keys)
+
     def make_frequency_table_keys(self, model, rollup, timestamp, key, environment_id):
         prefix = self.make_key(model, rollup, timestamp, key, environment_id)
         return map(operator.methodcaller("format", prefix), ("{}:i", "{}:e"))
 
     def record_frequency_multi(self, requests, timestamp=None, environment_id=None):
+        """
+        Record occurrences of items in frequency tables.
+
+        Scores are summed up per frequency table and item, and the frequency
+        tables that are routed to the same host are recorded with a single
+        script invocation.
+        """
         self.validate_arguments([model for model, request in requests], [environment_id])
 
         if not self.enable_frequency_sketches:
@@ -657,40 +1073,43 @@ class RedisTSDB(BaseTSDB):
 
         ts = int(to_timestamp(timestamp))  # ``timestamp`` is not actually a timestamp :(
 
-        for (cluster, durable), environment_ids in self.get_cluster_groups({None, environment_id}):
-            commands = {}
+        # (model, key) -> member -> score
+        scores_by_key = {}
+        for model, request in requests:
+            for key, items in request.items():
+                scores = scores_by_key.setdefault((model, key), {})
+                for member, score in items.items():
+                    scores[member] = scores.get(member, 0) + score
 
-            for model, request in requests:
-                for key, items in request.items():
-                    keys = []
-                    expirations = {}
+        for (cluster, durable), environment_ids in self.get_cluster_groups({None, environment_id}):
+            batches = self._make_script_batches(cluster)
 
-                    # Figure out all of the keys we need to be incrementing, as
-                    # well as their expiration policies.
-                    for rollup, max_values in self.rollups.items():
-                        for environment_id in environment_ids:
-                            chunk = self.make_frequency_table_keys(
-                                model, rollup, ts, key, environment_id
-                            )
-                            keys.extend(chunk)
+            for (model, key), scores in scores_by_key.items():
+                keys = []
+                expirations = []
 
-                        expiry = self.calculate_expiry(rollup, max_values, timestamp)
-                        for k in chunk:
-                            expirations[k] = expiry
+                # Figure out all of the keys we need to be incrementing, as
+                # well as their expiration policies.
+                for rollup, max_values in self.rollups.items():
+                    expiry = self.calculate_expiry(rollup, max_values, timestamp)
+                    for environment_id in environment_ids:
+                        keys.extend(
+                            self.make_frequency_table_keys(model, rollup, ts, key, environment_id)
+                        )
+                        expirations.append(expiry)
 
-                    arguments = ["INCR"] + list(self.DEFAULT_SKETCH_PARAMETERS)
-                    for member, score in items.items():
-                        arguments.extend((score, member))
+                arguments = [len(expirations), *expirations, len(scores)]
+                for member, score in scores.items():
+                    arguments.extend((score, member))
 
-                    # Since we're essentially merging dictionaries, we need to
-                    # append this to any value that already exists at the key.
-                    cmds = commands.setdefault(key, [])
-                    cmds.append((CountMinScript, keys, arguments))
-                    for k, t in expirations.items():
-                        cmds.append(("EXPIREAT", k, t))
+                batches.add(key, keys, arguments)
 
             try:
-                cluster.execute_commands(commands)
+                cluster.execute_commands(
+                    batches.get_commands(
+                        CountMinScript, ["INCRMULTI"] + list(self.DEFAULT_SKETCH_PARAMETERS)
+                    )
+                )
             except Exception:
                 if durable:
                     raise
@@ -829,21 +1248,23 @@ class RedisTSDB(BaseTSDB):
         if not self.enable_frequency_sketches:
             return
 
-        rollups = []
+        rollups = {}
         for rollup, samples in self.rollups.items():
             _, series = self.get_optimal_rollup_series(
                 to_datetime(self.get_earliest_timestamp(rollup, timestamp=timestamp)),
                 end=None,
                 rollup=rollup,
             )
-            rollups.append((rollup, map(to_datetime, series)))
+            rollups[rollup] = map(to_datetime, series)
 
         for (cluster, durable), environment_ids in self.get_cluster_groups(environment_ids):
-            exports = defaultdict(list)
+            for buckets in self._iter_merge_chunks(
+                cluster, "frequencies", model, destination, sources, environment_ids, rollups
+            ):
+                exports = defaultdict(list)
 
-            for source in sources:
-                for rollup, series in rollups:
-                    for timestamp in series:
+                for source in sources:
+                    for rollup, timestamp in buckets:
                         keys = []
                         for environment_id in environment_ids:
                             keys.extend(
@@ -854,20 +1275,19 @@ class RedisTSDB(BaseTSDB):
                         arguments = ["EXPORT"] + list(self.DEFAULT_SKETCH_PARAMETERS)
                         exports[source].extend([(CountMinScript, keys, arguments), ["DEL"] + keys])
 
-            try:
-                responses = cluster.execute_commands(exports)
-            except Exception:
-                if durable:
-                    raise
-                else:
-                    continue
+                try:
+                    responses = cluster.execute_commands(exports)
+                except Exception:
+                    if durable:
+                        raise
+                    else:
+                        continue
 
-            imports = []
+                imports = []
 
-            for source, results in responses.items():
-                results = iter(results)
-                for rollup, series in rollups:
-                    for timestamp in series:
+                for source, results in responses.items():
+                    results = iter(results)
+                    for rollup, timestamp in buckets:
                         for environment_id, payload in zip(environment_ids, next(results).value):
                             imports.append(
                                 (
@@ -884,11 +1304,11 @@ class RedisTSDB(BaseTSDB):
                             )
                         next(results)  # pop off the result of DEL
 
-            try:
-                cluster.execute_commands({destination: imports})
-            except Exception:
-                if durable:
-                    raise
+                try:
+                    cluster.execute_commands({destination: imports})
+                except Exception:
+                    if durable:
+                        raise
 
     def delete_frequencies(
         self, models, keys, start=None, end=None, timestamp=None, environment_ids=None
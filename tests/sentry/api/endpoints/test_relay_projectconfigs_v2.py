@@ -276,7 +276,11 @@ def test_untrusted_external_relays_should_not_receive_configs(
 @pytest.fixture
 def projectconfig_cache_set(monkeypatch):
     calls = []
-    monkeypatch.setattr("sentry.relay.projectconfig_cache.set_many", calls.append)
+
+    def set_many_serialized(configs):
+        calls.append({key: json.loads(config) for key, config in configs.items()})
+
+    monkeypatch.setattr("sentry.relay.projectconfig_cache.set_many_serialized", set_many_serialized)
     return calls
 
 
@@ -320,6 +324,36 @@ def test_relay_projectconfig_cache_full_config(
     assert redis_cfg == http_cfg
 
 
+@pytest.mark.django_db
+def test_relay_projectconfig_cache_serialized(
+    call_endpoint, default_projectkey, projectconfig_cache_set, monkeypatch
+):
+    """
+    Full configs that are cached are returned as they are, without being
+    computed again.
+    """
+
+    other_public_key = ProjectKey.generate_api_key()
+    cached = {default_projectkey.public_key: b'{"disabled":false,"cached":true}'}
+    monkeypatch.setattr(
+        "sentry.relay.projectconfig_cache.get_many_serialized",
+        lambda keys: {key: cached[key] for key in keys if key in cached},
+    )
+
+    result, status_code = call_endpoint(
+        full_config=True, public_keys=[default_projectkey.public_key, other_public_key]
+    )
+    assert status_code < 400
+
+    assert result == {
+        "configs": {
+            default_projectkey.public_key: {"disabled": False, "cached": True},
+            other_public_key: {"disabled": True},
+        }
+    }
+    assert projectconfig_cache_set == [{other_public_key: {"disabled": True}}]
+
+
 @pytest.mark.django_db
 def test_relay_nonexistent_project(call_endpoint, projectconfig_cache_set, task_runner):
     wrong_public_key = ProjectKey.generate_api_key()
@@ -73,3 +73,40 @@ class BufferTest(TestCase):
         self.buf.process(Group, columns, filters, {"last_seen": the_date}, signal_only=True)
         group.refresh_from_db()
         assert group.times_seen == prev_times_seen
+
+    def test_process_batch(self):
+        project = self.create_project()
+        group = Group.objects.create(project=project)
+        other_group = Group.objects.create(project=project)
+        the_date = timezone.now() + timedelta(days=5)
+
+        self.buf.process_batch(
+            Group,
+            [
+                ({"times_seen": 2}, {"id": group.id}, {"last_seen": the_date}, None),
+                ({"times_seen": 3}, {"id": other_group.id}, {"last_seen": the_date}, None),
+                ({"times_seen": 1}, {"id": group.id}, {"last_seen": the_date}, None),
+                ({"times_seen": 1}, {"message": "foo bar", "project_id": project.id}, None, None),
+            ],
+        )
+
+        group_ = Group.objects.get(id=group.id)
+        assert group_.times_seen == group.times_seen + 3
+        assert group_.last_seen == the_date
+        assert group_.score > 0
+        assert Group.objects.get(id=other_group.id).times_seen == other_group.times_seen + 3
+        # missing rows are created
+        assert Group.objects.get(message="foo bar").times_seen == 2
+
+    def test_process_batch_increments_when_null(self):
+        org = Organization.objects.create(slug="test-org")
+        project = Project.objects.create(organization=org, slug="test-project")
+        release = Release.objects.create(organization=org, version="abcdefg")
+        release_project = ReleaseProject.objects.create(project=project, release=release)
+        ReleaseProject.objects.filter(id=release_project.id).update(new_groups=None)
+
+        self.buf.process_batch(
+            ReleaseProject,
+            [({"new_groups": 1}, {"id": release_project.id}, None, None)],
+        )
+        assert ReleaseProject.objects.get(id=release_project.id).new_groups == 1
@@ -45,6 +45,37 @@ class RedisBufferTest(TestCase):
         client = self.buf.cluster.get_routing_client()
         assert client.zrange("b:p", 0, -1) == []
 
+    @mock.patch("sentry.buffer.redis.process_incr")
+    def test_process_pending_bulk_flush(self, process_incr):
+        self.buf.bulk_flush = True
+        with self.buf.cluster.map() as client:
+            client.zadd("b:p", {"foo": 1, "bar": 2, "baz": 3})
+        self.buf.process_pending()
+        assert len(process_incr.apply_async.mock_calls) == 1
+        process_incr.apply_async.assert_any_call(kwargs={"batch_keys": ["foo", "bar", "baz"]})
+
+    @mock.patch("sentry.buffer.base.Buffer.process_batch")
+    def test_process_bulk_flush(self, process_batch):
+        self.buf.bulk_flush = True
+        client = self.buf.cluster.get_routing_client()
+        client.hmset(
+            "foo",
+            {"f": '{"pk": ["i","1"]}', "i+times_seen": "2", "m": "sentry.models.Group"},
+        )
+        client.hmset(
+            "bar",
+            {"f": '{"pk": ["i","2"]}', "i+times_seen": "3", "m": "sentry.models.Group"},
+        )
+        client.zadd("b:p", {"foo": 1, "bar": 2})
+        self.buf.process(batch_keys=["foo", "bar", "baz"])
+        process_batch.assert_called_once_with(
+            Group,
+            [({"times_seen": 2}, {"pk": 1}, {}, None), ({"times_seen": 3}, {"pk": 2}, {}, None)],
+        )
+        assert client.zrange("b:p", 0, -1) == []
+        assert not client.exists("foo")
+        assert not client.exists("l:foo")
+
     @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
     @mock.patch("sentry.buffer.base.Buffer.process")
     def test_process_does_bubble_up_json(self, process):
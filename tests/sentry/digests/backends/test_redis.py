@@ -151,3 +151,33 @@ class RedisBackendTestCase(TestCase):
 
         with backend.digest("timeline", 0) as records:
             assert len(set(records)) == n
+
+    def test_sampled_digest(self):
+        backend = RedisBackend()
+
+        t = time.time()
+        records = [Record(f"record:{i}", f"{i}", t + i) for i in range(5)]
+        backend.add("timeline", records[0], sample_keys=["1:1", "2:1"])
+        backend.add("timeline", records[1], sample_keys=["1:1"])
+        backend.add("timeline", records[2], sample_keys=["1:2"])
+        backend.add("timeline", records[3], sample_keys=["1:1"])
+
+        try:
+            with backend.digest("timeline", 0) as digest:
+                # The latest record of every sample key, and the oldest record.
+                assert digest == [records[3], records[2], records[0]]
+                raise Exception("This causes the digest to not be closed.")
+        except Exception:
+            pass
+
+        backend.maintenance(time.time())
+        backend.add("timeline", records[4], sample_keys=["2:1"])
+        assert {entry.key for entry in backend.schedule(time.time())} == {"timeline"}
+
+        # The sample index of the timeline is merged into the one of the digest.
+        with backend.digest("timeline", 0) as digest:
+            assert digest == [records[4], records[3], records[2], records[0]]
+
+        # The records that were not part of the sample are deleted as well.
+        assert backend._get_connection("timeline").keys("d:t:timeline:r:*") == []
+        assert backend._get_connection("timeline").keys("d:t:timeline:*s") == []
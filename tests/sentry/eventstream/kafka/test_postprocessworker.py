@@ -4,6 +4,7 @@ import pytest
 
 from sentry import options
 from sentry.eventstream.kafka.postprocessworker import (
+    _BATCH_TASKS_OPTION,
     _CONCURRENCY_OPTION,
     PostProcessForwarderWorker,
 )
@@ -128,3 +129,38 @@ def test_post_process_forwarder_concurrency(kafka_message_payload):
     assert forwarder._PostProcessForwarderWorker__current_concurrency == 5
 
     forwarder.shutdown()
+
+
+@pytest.mark.django_db
+@patch("sentry.eventstream.kafka.postprocessworker.post_process_group_batch")
+@patch("sentry.eventstream.kafka.postprocessworker.dispatch_post_process_group_task")
+def test_post_process_forwarder_batch_tasks(
+    dispatch_post_process_group_task, post_process_group_batch, kafka_message_payload
+):
+    """
+    Test that the events of a batch are dispatched in one task per project.
+    """
+    forwarder = PostProcessForwarderWorker(concurrency=2)
+    options.set(_BATCH_TASKS_OPTION, True)
+
+    futures = []
+    for event_id, project_id in [("a" * 32, 1), ("b" * 32, 2), ("c" * 32, 1)]:
+        kafka_message_payload[2].update(event_id=event_id, project_id=project_id)
+        mock_message = Mock()
+        mock_message.value = MagicMock(return_value=json.dumps(kafka_message_payload))
+        mock_message.partition = MagicMock("1")
+        futures.append(forwarder.process_message(mock_message))
+
+    forwarder.flush_batch(futures)
+
+    dispatch_post_process_group_task.assert_not_called()
+    calls = {
+        call.kwargs["project_id"]: [event["cache_key"] for event in call.kwargs["events"]]
+        for call in post_process_group_batch.delay.call_args_list
+    }
+    assert calls == {
+        1: ["e:aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa:1", "e:cccccccccccccccccccccccccccccccc:1"],
+        2: ["e:bbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbb:2"],
+    }
+
+    forwarder.shutdown()
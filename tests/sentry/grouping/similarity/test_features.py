@@ -1,3 +1,5 @@
+import time
+
 import pytest
 
 import sentry.similarity
@@ -7,7 +9,7 @@ from sentry.grouping.api import get_default_grouping_config_dict
 from sentry.grouping.strategies.configurations import CONFIGURATIONS
 from sentry.models import Group, Project
 from sentry.utils import json
-from sentry.utils.compat import zip
+from sentry.utils.compat import mock, zip
 from tests.sentry.grouping import with_fingerprint_input, with_grouping_input
 
 
@@ -53,6 +55,29 @@ def test_basic(similarity):
     assert evt2_diff[msg_label] == 0.5
 
 
+def test_record_batch(similarity):
+    timestamp = int(time.time())
+    evt1 = create_event({"message": "hello world", "timestamp": timestamp - 60}, group_id=123)
+    evt2 = create_event({"message": "hello world", "timestamp": timestamp - 30}, group_id=123)
+    evt3 = create_event({"message": "jello world", "timestamp": timestamp}, group_id=345)
+
+    with mock.patch.object(
+        similarity.index, "record_multi", wraps=similarity.index.record_multi
+    ) as record_multi:
+        similarity.record([evt1, evt2, evt3])
+
+    assert record_multi.call_count == 1
+    (_, records), _ = record_multi.call_args
+    assert {(key, record_timestamp) for key, _, record_timestamp in records} == {
+        ("123", timestamp - 60),
+        ("123", timestamp - 30),
+        ("345", timestamp),
+    }
+
+    comparison = dict(similarity.compare(evt1.group))
+    assert set(comparison) == {evt1.group_id, evt3.group_id}
+
+
 @with_grouping_input("grouping_input")
 def test_similarity_extract_grouping_input(grouping_input, insta_snapshot):
     similarity = sentry.similarity.features2
@@ -1,7 +1,12 @@
 import pytest
 
 from sentry.grouping.component import GroupingComponent
-from sentry.grouping.enhancer import Enhancements, InvalidEnhancerConfig, create_match_frame
+from sentry.grouping.enhancer import (
+    Enhancements,
+    InvalidEnhancerConfig,
+    RuleIndex,
+    create_match_frame,
+)
 
 
 def dump_obj(obj):
@@ -418,3 +423,64 @@ def test_sentinel_and_prefix(action, type):
     actions[0][1].update_frame_components_contributions([component], frames, 0)
     expected = True if action == "+" else False
     assert getattr(component, f"is_{type}_frame") is expected
+
+
+def test_rule_index():
+    enhancement = Enhancements.from_config_string(
+        """
+        family:native function:std::*                  -app
+        module:com.example.*                           +app
+        package:/usr/lib/**                            -app
+        !function:foo                                  -group
+        [ function:bar ] | function:baz                -group
+        """
+    )
+    frames = [
+        create_match_frame(frame, "native")
+        for frame in [
+            {"function": "std::panicking::begin_panic"},
+            {"function": "std::foo", "platform": "java"},
+            {"function": "foo", "module": "com.example.app"},
+            {"function": "bar", "package": "\\usr\\lib\\libc.so"},
+            {"function": "baz", "package": "usr/lib/libc.so"},
+        ]
+    ]
+
+    assert [rule.index_keys for rule in enhancement.rules] == [
+        [("function", b"std::")],
+        [("module", b"com.example.")],
+        [("package", b"/usr/lib/")],
+        None,
+        [("function", b"baz")],
+    ]
+    assert RuleIndex(enhancement.rules).get_frame_indices(frames) == [
+        [0, 1],
+        [2],
+        [3, 4],
+        range(5),
+        [4],
+    ]
+
+
+@pytest.mark.parametrize("base", ["common:2019-03-23", "mobile:2021-04-02"])
+def test_rule_index_matches_like_rules(base):
+    enhancement = Enhancements(rules=[], bases=[base])
+    frames = [
+        {"function": "std::panicking::begin_panic", "package": "/usr/lib/libstd.so"},
+        {"function": "__cxa_throw", "package": "/usr/lib/libc++abi.dylib"},
+        {"function": "-[SentryClient sendEvent:]", "package": "/Users/foo/App.app/Contents/App"},
+        {"function": "main", "package": "/private/var/containers/Bundle/Application/App"},
+        {"function": "kscrash_install", "package": "C:\\Windows\\System32\\ntdll.dll"},
+        {"function": "onCreate", "module": "android.app.Activity", "platform": "java"},
+        {"function": "invoke", "module": "java.lang.reflect.Method", "platform": "java"},
+    ]
+    match_frames = [create_match_frame(frame, "native") for frame in frames]
+
+    for rules in (enhancement._modifier_rules, enhancement._updater_rules):
+        frame_indices = RuleIndex(rules).get_frame_indices(match_frames)
+        for rule, indices in zip(rules, frame_indices):
+            assert rule.get_matching_frame_actions(
+                match_frames, "native", {}, {}
+            ) == rule.get_matching_frame_actions(
+                match_frames, "native", {}, {}, frame_indices=indices
+            )
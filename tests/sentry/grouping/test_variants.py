@@ -4,6 +4,7 @@ from sentry.eventtypes.base import format_title_from_tree_label
 from sentry.grouping.api import detect_synthetic_exception, get_default_grouping_config_dict
 from sentry.grouping.component import GroupingComponent
 from sentry.grouping.strategies.configurations import CONFIGURATIONS
+from sentry.grouping.strategies.newstyle import frame_component_cache
 from sentry.utils import json
 from tests.sentry.grouping import with_grouping_input
 
@@ -76,3 +77,27 @@ def test_event_hash_variant(config_name, grouping_input, insta_snapshot, log):
     assert evt.get_grouping_config() == grouping_config
 
     insta_snapshot(output)
+
+
+@with_grouping_input("grouping_input")
+@pytest.mark.parametrize("config_name", CONFIGURATIONS.keys(), ids=lambda x: x.replace("-", "_"))
+def test_frame_component_cache(config_name, grouping_input):
+    grouping_config = get_default_grouping_config_dict(config_name)
+    evt = grouping_input.create_event(grouping_config)
+    evt.project = None
+    detect_synthetic_exception(evt.data, grouping_config)
+
+    def dump_variants():
+        rv = []
+        for (key, value) in sorted(evt.get_grouping_variants().items()):
+            rv.append("%s:" % key)
+            dump_variant(value, rv, 1)
+        return rv
+
+    frame_component_cache.clear()
+    uncached = dump_variants()
+
+    # Components are updated after they have been returned from the cache,
+    # which must not affect later events.
+    assert dump_variants() == uncached
+    assert dump_variants() == uncached
@@ -3,10 +3,13 @@ import uuid
 
 import pytest
 
+from sentry import event_manager
 from sentry.event_manager import EventManager
+from sentry.eventstore.processing import event_processing_store
 from sentry.ingest.ingest_consumer import (
     process_attachment_chunk,
     process_event,
+    process_event_batch,
     process_individual_attachment,
     process_userreport,
 )
@@ -60,6 +63,117 @@ def test_deduplication_works(default_project, task_runner, preprocess_event):
     }
 
 
+@pytest.mark.django_db
+def test_event_batch(default_project, task_runner, preprocess_event):
+    project_id = default_project.id
+    start_time = time.time() - 3600
+
+    payloads = [
+        get_normalized_event(
+            {"message": "hello world", "user": {"email": "foo@example.com"}}, default_project
+        )
+        for _ in range(3)
+    ]
+    messages = [
+        {
+            "payload": json.dumps(payload),
+            "start_time": start_time,
+            "event_id": payload["event_id"],
+            "project_id": project_id,
+            "remote_addr": "127.0.0.1",
+        }
+        for payload in payloads
+    ]
+
+    with task_runner():
+        to_dispatch = process_event_batch(messages, {default_project.id: default_project})
+
+    assert to_dispatch == []
+    assert preprocess_event == []
+
+    for payload in payloads:
+        cache_key = f"e:{payload['event_id']}:{project_id}"
+        data = event_processing_store.get(cache_key)
+        assert data["event_id"] == payload["event_id"]
+        assert data["culprit"]
+
+    (evtuser,) = EventUser.objects.all()
+    assert evtuser.email == "foo@example.com"
+
+    # Deduplication works across batches
+    with task_runner():
+        assert process_event_batch(messages, {default_project.id: default_project}) == []
+
+
+@pytest.mark.django_db
+def test_event_batch_failure_falls_back(default_project, task_runner, monkeypatch):
+    project_id = default_project.id
+    payloads = [get_normalized_event({"message": "hello world"}, default_project) for _ in range(2)]
+    messages = [
+        {
+            "payload": json.dumps(payload),
+            "start_time": time.time(),
+            "event_id": payload["event_id"],
+            "project_id": project_id,
+            "remote_addr": "127.0.0.1",
+        }
+        for payload in payloads
+    ]
+
+    def save_event_batch(events, projects, on_saving=None):
+        on_saving(0)
+        raise ValueError("boom")
+
+    monkeypatch.setattr("sentry.ingest.ingest_consumer.save_event_batch", save_event_batch)
+
+    with task_runner():
+        to_dispatch = process_event_batch(messages, {default_project.id: default_project})
+
+    # Only the event that was not saved yet is retried through preprocessing
+    assert [loaded_event.data["event_id"] for loaded_event in to_dispatch] == [
+        payloads[1]["event_id"]
+    ]
+
+
+@pytest.mark.django_db
+def test_event_batch_failure_in_chunk(default_project, task_runner, monkeypatch):
+    project_id = default_project.id
+    payloads = [
+        get_normalized_event({"message": f"hello world {i}"}, default_project) for i in range(3)
+    ]
+    messages = [
+        {
+            "payload": json.dumps(payload),
+            "start_time": time.time(),
+            "event_id": payload["event_id"],
+            "project_id": project_id,
+            "remote_addr": "127.0.0.1",
+        }
+        for payload in payloads
+    ]
+
+    save_aggregate = event_manager._save_aggregate
+    calls = []
+
+    def failing_save_aggregate(*args, **kwargs):
+        calls.append(kwargs["event"].event_id)
+        if len(calls) == 2:
+            raise ValueError("boom")
+        return save_aggregate(*args, **kwargs)
+
+    monkeypatch.setattr("sentry.event_manager._save_aggregate", failing_save_aggregate)
+
+    with task_runner():
+        to_dispatch = process_event_batch(messages, {default_project.id: default_project})
+
+    # The events written before and at the failure are never saved again, only
+    # the untouched event is retried through preprocessing.
+    assert calls == [payloads[0]["event_id"], payloads[1]["event_id"]]
+    assert [loaded_event.data["event_id"] for loaded_event in to_dispatch] == [
+        payloads[2]["event_id"]
+    ]
+
+
 @pytest.mark.django_db
 @pytest.mark.parametrize("missing_chunks", (True, False))
 def test_with_attachments(default_project, task_runner, missing_chunks, monkeypatch):
@@ -1,6 +1,7 @@
 from unittest import TestCase
 
-from sentry.lang.javascript.cache import SourceCache
+from sentry.lang.javascript.cache import SourceCache, ViewCache
+from sentry.testutils.helpers.options import override_options
 
 
 class BasicCacheTest(TestCase):
@@ -37,3 +38,37 @@ class BasicCacheTest(TestCase):
         # fall back to utf-8
         cache.add(url, "foobar".encode("utf-32"), encoding="utf-32")
         assert cache.get(url)[0] == "foobar"
+
+
+class ViewCacheTest(TestCase):
+    def test_lru(self):
+        cache = ViewCache()
+        created = []
+
+        def get(key, size):
+            return cache.get_or_create(key, size, lambda: created.append(key) or key, "source")
+
+        with override_options({"sourcemaps.view-cache-size": 10}):
+            assert get("a", 4) == "a"
+            assert get("b", 4) == "b"
+            assert get("a", 4) == "a"
+            assert created == ["a", "b"]
+
+            # Evicts "b", which was used least recently.
+            assert get("c", 4) == "c"
+            assert get("a", 4) == "a"
+            assert get("b", 4) == "b"
+            assert created == ["a", "b", "c", "b"]
+
+            # Too large to be cached at all.
+            get("d", 11)
+            get("d", 11)
+            assert created[-2:] == ["d", "d"]
+
+    def test_kinds(self):
+        cache = ViewCache()
+
+        with override_options({"sourcemaps.view-cache-size": 10}):
+            assert cache.get_or_create("a", 1, lambda: 1, "source") == 1
+            assert cache.get_or_create("a", 1, lambda: 2, "sourcemap") == 2
+            assert cache.get_or_create("a", 1, lambda: 3, "source") == 1
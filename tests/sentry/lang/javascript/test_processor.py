@@ -31,7 +31,11 @@ from sentry.lang.javascript.processor import (
     trim_line,
 )
 from sentry.models import EventError, File, Release, ReleaseFile
-from sentry.models.releasefile import ARTIFACT_INDEX_FILENAME, update_artifact_index
+from sentry.models.releasefile import (
+    ARTIFACT_INDEX_FILENAME,
+    IndexedReleaseArchive,
+    update_artifact_index,
+)
 from sentry.testutils import TestCase
 from sentry.testutils.helpers.options import override_options
 from sentry.utils import json
@@ -579,6 +583,42 @@ class FetchFileTest(TestCase):
         result2 = fetch_file("/example.js", release=release)
         assert result2 == result
 
+    def test_non_url_with_release_archive_on_disk(self):
+        compressed = BytesIO()
+        with zipfile.ZipFile(compressed, mode="w", compression=zipfile.ZIP_DEFLATED) as zip_file:
+            zip_file.writestr("example.js", b"foo" * 100)
+            zip_file.writestr(
+                "manifest.json",
+                json.dumps(
+                    {
+                        "files": {
+                            "example.js": {
+                                "url": "/example.js",
+                                "headers": {"content-type": "application/json"},
+                            }
+                        }
+                    }
+                ),
+            )
+
+        release = Release.objects.create(version="1", organization_id=self.project.organization_id)
+        release.add_project(self.project)
+
+        compressed.seek(0)
+        file_ = File.objects.create(name="foo", type="release.bundle")
+        file_.putfile(compressed)
+        update_artifact_index(release, None, file_)
+
+        # Every archive is large enough to be stored on disk.
+        with override_options({"releasefile.cache-limit": 0}):
+            with fetch_release_archive_for_url(release, dist=None, url="/example.js") as archive:
+                assert isinstance(archive, IndexedReleaseArchive)
+
+            result = fetch_file("/example.js", release=release)
+
+        assert result.body == b"foo" * 100
+        assert result.headers == {"content-type": "application/json"}
+
     def _create_archive(self, release, url):
         pseudo_archive = File.objects.create(name="", type="release.bundle")
         pseudo_archive.putfile(BytesIO(b"0123456789"))
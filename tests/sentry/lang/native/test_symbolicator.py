@@ -265,3 +265,14 @@ class TestAliasReversion:
         reverse_aliases = symbolicator.reverse_aliases_map(builtin_sources)
         expected = {"sentry:ios-source": "sentry:ios", "sentry:tvos-source": "sentry:ios"}
         assert reverse_aliases == expected
+
+
+@pytest.mark.django_db
+def test_pooled_session():
+    first = symbolicator.SymbolicatorSession(url="http://symbolicator")
+    second = symbolicator.SymbolicatorSession(url="http://symbolicator")
+
+    with first, second:
+        assert first.session is second.session is symbolicator.get_pooled_session()
+
+    assert first.session is None
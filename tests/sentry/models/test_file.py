@@ -155,6 +155,35 @@ class FileTest(TestCase):
             with self.assertRaises(ValueError):
                 fp.seek(0, 666)
 
+    def test_read_ahead(self):
+        data = b"abcdefghijklmnopqrstuvwxyz"
+        file1 = File.objects.create(name="baz.js", type="default", size=26)
+        file1.putfile(BytesIO(data), 5)
+
+        with file1.getfile(read_ahead=2) as fp:
+            assert fp.read() == data
+            fp.seek(7)
+            assert fp.read(10) == data[7:17]
+            fp.seek(3)
+            assert fp.read() == data[3:]
+
+    def test_read_range(self):
+        data = b"abcdefghijklmnopqrstuvwxyz"
+        file1 = File.objects.create(name="baz.js", type="default", size=26)
+        file1.putfile(BytesIO(data), 5)
+
+        assert file1.read_range(0, 26) == data
+        assert file1.read_range(7, 10) == data[7:17]
+        assert file1.read_range(24, 10) == data[24:]
+        assert file1.read_range(30, 10) == b""
+
+        with patch.object(
+            FileBlob, "getfile", autospec=True, side_effect=FileBlob.getfile
+        ) as getfile:
+            assert file1.read_range(6, 3) == b"ghi"
+        # Only the blob that covers the range is fetched
+        assert getfile.call_count == 1
+
     def test_multi_chunk_prefetch(self):
         random_data = os.urandom(1 << 25)
 
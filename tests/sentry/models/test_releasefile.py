@@ -4,7 +4,7 @@ from datetime import datetime, timezone
 from io import BytesIO
 from threading import Thread
 from time import sleep
-from zipfile import ZipFile
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
 
 import pytest
 
@@ -14,6 +14,7 @@ from sentry.models.distribution import Distribution
 from sentry.models.file import File
 from sentry.models.releasefile import (
     ARTIFACT_INDEX_FILENAME,
+    IndexedReleaseArchive,
     _ArtifactIndexGuard,
     delete_from_artifact_index,
     read_artifact_index,
@@ -113,6 +114,51 @@ class ReleaseFileCacheTest(TestCase):
         else:
             assert False, "file should not exist"
 
+    def test_getarchive(self):
+        buffer = BytesIO()
+        with ZipFile(buffer, mode="w", compression=ZIP_DEFLATED) as zf:
+            zf.writestr(
+                "manifest.json",
+                json.dumps(
+                    {
+                        "files": {
+                            "foo": {"url": "fake://foo", "headers": {"a": "b"}},
+                            "bar": {"url": "fake://bar"},
+                        }
+                    }
+                ),
+            )
+            zf.writestr("foo", b"foo" * 100)
+            zf.writestr("bar", b"bar", compress_type=ZIP_STORED)
+
+        file = self.create_file(name="archive.zip")
+        buffer.seek(0)
+        file.putfile(buffer)
+        release_file = self.create_release_file(file=file)
+
+        expected_path = os.path.join(
+            options.get("releasefile.cache-path"),
+            str(self.organization.id),
+            str(file.id),
+        )
+
+        for _ in range(2):
+            with ReleaseFile.cache.getarchive(release_file) as archive:
+                fp, headers = archive.get_file_by_url("fake://foo")
+                assert fp.read() == b"foo" * 100
+                assert headers == {"a": "b"}
+
+                fp, headers = archive.get_file_by_url("fake://bar")
+                assert fp.read() == b"bar"
+                assert headers == {}
+
+                with pytest.raises(KeyError):
+                    archive.get_file_by_url("fake://baz")
+
+            # The archive and its index are cached on disk
+            os.stat(expected_path)
+            os.stat(expected_path + IndexedReleaseArchive.INDEX_SUFFIX)
+
 
 class ReleaseArchiveTestCase(TestCase):
     def create_archive(self, fields, files, dist=None):
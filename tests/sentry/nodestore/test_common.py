@@ -5,8 +5,22 @@ Testsuite of backend-independent nodestore tests. Add your backend to the
 from contextlib import contextmanager
 
 import pytest
-
+import zstandard
+
+from sentry.models import File
+from sentry.nodestore.base import (
+    ZSTD_DICTIONARY_FILE_TYPE,
+    ZSTD_DICTIONARY_FORMAT,
+    MissingNodeChunk,
+    MissingZstdDictionary,
+    NodeStorage,
+    get_chunk_node_id,
+    json_dumps,
+    json_loads,
+)
+from sentry.nodestore.compressor import PATCHSETS_KEY
 from sentry.nodestore.django.backend import DjangoNodeStorage
+from sentry.testutils.helpers.options import override_options
 from tests.sentry.nodestore.bigtable.backend.tests import (
     MockedBigtableNodeStorage,
     get_temporary_bigtable_nodestorage,
@@ -97,3 +111,115 @@ def test_set_subkeys(ns):
     ns.delete("node_1")
     assert ns.get("node_1") is None
     assert ns.get("node_1", subkey="other") is None
+
+
+def test_set_many(ns):
+    ns.set_subkeys_many(
+        {
+            "node_1": {None: {"foo": "a"}, "other": {"foo": "b"}},
+            "node_2": {None: {"foo": "c"}},
+        }
+    )
+    assert ns.get_multi(["node_1", "node_2"]) == {"node_1": {"foo": "a"}, "node_2": {"foo": "c"}}
+    assert ns.get("node_1", subkey="other") == {"foo": "b"}
+
+    ns.set_many({"node_1": {"foo": "d"}})
+    assert ns.get("node_1") == {"foo": "d"}
+    assert ns.get("node_1", subkey="other") is None
+
+
+def test_buffered_writes(ns):
+    with ns.buffered_writes(max_items=2):
+        ns.set("node_1", {"foo": "a"})
+        # Pending writes are visible to the writing thread
+        assert ns._get_bytes("node_1") is None
+        assert ns.get("node_1") == {"foo": "a"}
+
+        ns.set("node_1", {"foo": "b"})
+        assert ns._get_bytes("node_1") is None
+
+        # Reaching the limit flushes the buffer
+        ns.set("node_2", {"foo": "c"})
+        assert ns._get_bytes("node_1") is not None
+
+        ns.set("node_3", {"foo": "d"})
+        ns.delete("node_3")
+
+    assert ns.get_multi(["node_1", "node_2"]) == {"node_1": {"foo": "b"}, "node_2": {"foo": "c"}}
+    assert ns.get("node_3") is None
+
+
+@pytest.mark.django_db
+def test_zstd_dictionary(ns):
+    ns.set("node_1", {"platform": "python", "foo": "a"})
+
+    samples = [
+        json_dumps(
+            {"platform": "python", "sdk": {"name": "sentry.python", "version": f"1.{i}.0"}}
+        ).encode("utf8")
+        for i in range(1000)
+    ]
+    dict_id = ns.set_zstd_dictionary(zstandard.train_dictionary(1024, samples).as_bytes())
+
+    with override_options({"nodestore.zstd-dictionaries": {"python": dict_id}}):
+        ns.set_subkeys("node_2", {None: {"platform": "python", "foo": "b"}, "other": {"foo": "c"}})
+        ns.set("node_3", {"platform": "javascript", "foo": "d"})
+
+    assert ns._get_bytes("node_2").startswith(ZSTD_DICTIONARY_FORMAT)
+    assert not ns._get_bytes("node_3").startswith(ZSTD_DICTIONARY_FORMAT)
+
+    # Nodes are readable regardless of the format they were written with
+    assert ns.get_multi(["node_1", "node_2", "node_3"]) == {
+        "node_1": {"platform": "python", "foo": "a"},
+        "node_2": {"platform": "python", "foo": "b"},
+        "node_3": {"platform": "javascript", "foo": "d"},
+    }
+    assert ns.get("node_2", subkey="other") == {"foo": "c"}
+
+    # Nodes compressed with a missing dictionary are never returned as empty
+    NodeStorage._zstd_dictionaries.clear()
+    ns.__dict__.pop("_zstd_decompressors", None)
+    File.objects.filter(type=ZSTD_DICTIONARY_FILE_TYPE).delete()
+    if ns.cache:
+        ns.cache.clear()
+
+    with pytest.raises(MissingZstdDictionary):
+        ns.get("node_2")
+
+
+@pytest.mark.parametrize("buffered", (True, False))
+def test_deduplicated_interfaces(ns, buffered):
+    def make_event(i):
+        return {
+            "message": f"event {i}",
+            "modules": {"django": "3.1", "sentry-sdk": "1.0"},
+            "sdk": {"name": "sentry.python", "packages": [{"name": "pypi:sentry-sdk"}]},
+            "debug_meta": {"images": [{"image_addr": hex(i), "debug_id": "abcd"}]},
+            "breadcrumbs": {"values": [{"message": "hello", "timestamp": float(i)}]},
+        }
+
+    write_context = ns.buffered_writes() if buffered else nullcontext(None)
+    with override_options({"nodestore.dedup-interfaces": True}), write_context:
+        ns.set_subkeys("node_1", {None: make_event(1), "other": make_event(2)})
+        ns.set("node_2", make_event(3))
+
+    node = json_loads(ns._get_bytes("node_2"))
+    assert "modules" not in node
+    assert len(node[PATCHSETS_KEY]) == 4
+
+    # Chunks are read from the backend if they have not been seen before
+    ns._chunk_cache.items.clear()
+    if ns.cache:
+        ns.cache.clear()
+
+    assert ns.get_multi(["node_1", "node_2"]) == {"node_1": make_event(1), "node_2": make_event(3)}
+    assert ns.get("node_1", subkey="other") == make_event(2)
+
+    # Nodes are never returned without the interfaces of a missing chunk
+    ns.delete(get_chunk_node_id(node[PATCHSETS_KEY][0][1]))
+    ns._chunk_cache.items.clear()
+    if ns.cache:
+        ns.cache.clear()
+
+    with pytest.raises(MissingNodeChunk):
+        ns.get("node_2")
@@ -0,0 +1,95 @@
+import copy
+
+import pytest
+
+from sentry.nodestore.compressor import PATCHSETS_KEY, assemble, deduplicate
+
+
+def _assert_roundtrip(data, assert_extra_keys=None):
+    new_data, extra_keys = deduplicate(copy.deepcopy(data))
+
+    if assert_extra_keys is not None:
+        assert extra_keys == assert_extra_keys
+
+    def get_extra_keys(checksums):
+        assert set(checksums) == set(extra_keys)
+        return extra_keys
+
+    new_new_data = assemble(copy.deepcopy(new_data), get_extra_keys)
+
+    assert new_new_data == data
+
+
+def test_basic():
+    assert deduplicate({}) == ({}, {})
+
+    _assert_roundtrip({})
+    _assert_roundtrip({"debug_meta": {}})
+    _assert_roundtrip({"debug_meta": None})
+    _assert_roundtrip({"debug_meta": {"images": []}})
+    _assert_roundtrip({"debug_meta": {"images": None}})
+    _assert_roundtrip({"debug_meta": {"images": [{}]}})
+
+    checksum = "988f626fc215906bdb74677008ac4469"
+    _assert_roundtrip(
+        {
+            "debug_meta": {
+                "images": [
+                    {
+                        "image_addr": "0xdeadbeef",
+                        "debug_file": "C:/Ding/bla.pdb",
+                        "code_file": "C:/Ding/bla.exe",
+                        "debug_id": "1234abcdef",
+                        "code_id": "1234abcdefgggg",
+                    }
+                ]
+            }
+        },
+        assert_extra_keys={
+            checksum: {
+                "code_file": ["C:/Ding/bla.exe"],
+                "code_id": ["1234abcdefgggg"],
+                "debug_file": ["C:/Ding/bla.pdb"],
+                "debug_id": ["1234abcdef"],
+            }
+        },
+    )
+
+
+def test_interfaces():
+    _assert_roundtrip({"modules": {}})
+    _assert_roundtrip({"sdk": {"name": "sentry.python"}}, assert_extra_keys={})
+    _assert_roundtrip({"breadcrumbs": {"values": [None, {"message": "no timestamp"}]}})
+
+    data = {
+        "modules": {"django": "3.1"},
+        "sdk": {"name": "sentry.python", "packages": [{"name": "pypi:sentry-sdk"}]},
+        "debug_meta": {"images": [None, {"image_addr": "0x1", "debug_id": "abcd"}]},
+        "breadcrumbs": {"values": [{"message": "hello", "timestamp": 1.0}]},
+        "message": "hello",
+    }
+    _assert_roundtrip(data)
+
+    # The input is not modified
+    original = copy.deepcopy(data)
+    new_data, extra_keys = deduplicate(data)
+    assert data == original
+    assert new_data["message"] == "hello"
+    assert {key for key, _, _ in new_data[PATCHSETS_KEY]} == {
+        "modules",
+        "sdk",
+        "debug_meta",
+        "breadcrumbs",
+    }
+
+    # Events that only differ in their timestamps and image addresses share
+    # all deduplicated parts
+    data["breadcrumbs"]["values"][0]["timestamp"] = 2.0
+    data["debug_meta"]["images"][1]["image_addr"] = "0x2"
+    assert deduplicate(data)[1] == extra_keys
+
+
+def test_missing_extra_keys():
+    new_data, _ = deduplicate({"modules": {"django": "3.1"}, "message": "hello"})
+    with pytest.raises(KeyError):
+        assemble(new_data, lambda checksums: {})
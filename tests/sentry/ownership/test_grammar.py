@@ -3,10 +3,12 @@ import pytest
 from sentry.ownership.grammar import (
     Matcher,
     Owner,
+    OwnershipIndex,
     Rule,
     convert_codeowners_syntax,
     convert_schema_to_rules_text,
     dump_schema,
+    get_ownership_index,
     load_schema,
     parse_code_owners,
     parse_rules,
@@ -191,11 +193,47 @@ def test_matcher_test_tags_without_tag_data(data):
     assert not Matcher("tags.bar", "barval").test(data)
 
 
+def test_ownership_index():
+    rules = parse_rules(fixture_data) + [
+        Rule(Matcher("codeowners", "/src/"), [Owner("user", "src@sentry.io")]),
+        Rule(Matcher("codeowners", "app.py"), [Owner("user", "app@sentry.io")]),
+    ]
+    index = OwnershipIndex(rules)
+
+    for data in (
+        {},
+        {"tags": [["foo", "bar"], ["bar", "foo"]]},
+        {"request": {"url": "http://google.com/search"}},
+        {"stacktrace": {"frames": [{"filename": "src/components/app.py"}]}},
+        {"stacktrace": {"frames": [{"module": "foo.bar", "abs_path": "src/sentry/foo.js"}]}},
+        {
+            "tags": [["foo", "bar baz"]],
+            "exception": {
+                "values": [{"stacktrace": {"frames": [{"abs_path": "/frontend/index.ts"}]}}]
+            },
+        },
+    ):
+        assert index.test(data) == [rule for rule in rules if rule.test(data)]
+
+
+def test_get_ownership_index():
+    schema = dump_schema(parse_rules(fixture_data))
+    index = get_ownership_index(("test", 1), schema)
+    assert get_ownership_index(("test", 1), dump_schema(parse_rules(fixture_data))) is index
+    assert get_ownership_index(("test", 2), schema) is not index
+
+    changed = dump_schema(parse_rules(fixture_data + "codeowners:docs/ docs@sentry.io\n"))
+    assert get_ownership_index(("test", 1), changed) is not index
+
+
 def _assert_matcher(matcher: Matcher, path_details, expected):
     """Helper function to reduce repeated code"""
     frames = {"stacktrace": {"frames": path_details}}
     assert matcher.test(frames) == expected
 
+    rule = Rule(matcher, [])
+    assert OwnershipIndex([rule]).test(frames) == ([rule] if expected else [])
+
 
 @pytest.mark.parametrize(
     "path_details, expected",
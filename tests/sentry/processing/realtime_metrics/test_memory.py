@@ -0,0 +1,71 @@
+import datetime
+import time
+
+import pytest
+
+from sentry.exceptions import InvalidConfiguration
+from sentry.processing.realtime_metrics import base  # type: ignore
+from sentry.processing.realtime_metrics.memory import MemoryRealtimeMetricsStore  # type: ignore
+
+
+@pytest.fixture
+def store() -> MemoryRealtimeMetricsStore:
+    return MemoryRealtimeMetricsStore(
+        counter_bucket_size=10,
+        counter_ttl=datetime.timedelta(seconds=5),
+        histogram_bucket_size=10,
+        histogram_ttl=datetime.timedelta(seconds=5),
+    )
+
+
+def test_validate() -> None:
+    with pytest.raises(InvalidConfiguration):
+        MemoryRealtimeMetricsStore(counter_bucket_size=0).validate()
+
+
+def test_projects(store: MemoryRealtimeMetricsStore) -> None:
+    now = int(time.time())
+    store.increment_project_event_counter(17, now)
+    store.increment_multi(events=[(42, now), (23, now - 10)])
+
+    assert sorted(store.projects()) == [17, 42]
+
+
+def test_get_counts_timeseries(store: MemoryRealtimeMetricsStore) -> None:
+    store.increment_multi(events=[(17, 1147), (17, 1149), (17, 1161), (42, 1151)])
+
+    assert store.get_counts_timeseries_multi([17, 42], 1145, 1165) == {
+        17: [
+            base.BucketedCount(timestamp=1140, count=2),
+            base.BucketedCount(timestamp=1150, count=0),
+            base.BucketedCount(timestamp=1160, count=1),
+        ],
+        42: [
+            base.BucketedCount(timestamp=1140, count=0),
+            base.BucketedCount(timestamp=1150, count=1),
+            base.BucketedCount(timestamp=1160, count=0),
+        ],
+    }
+    assert store.get_counts_timeseries(23, 1145, 1145) == [
+        base.BucketedCount(timestamp=1140, count=0)
+    ]
+
+
+def test_get_durations_histogram(store: MemoryRealtimeMetricsStore) -> None:
+    store.increment_multi(
+        durations=[(17, 1147, 15), (17, 1149, 19), (17, 1161, 42), (17, 1171, 42), (42, 1151, 15)]
+    )
+    store.increment_project_duration_counter(17, 1161, 45)
+
+    assert store.get_durations_histogram_multi([17, 42, 23], 1145, 1165) == {
+        17: {10: 2, 40: 2},
+        42: {10: 1},
+        23: {},
+    }
+
+
+def test_lpq_projects(store: MemoryRealtimeMetricsStore) -> None:
+    store.add_project_to_lpq(17)
+    store.add_project_to_lpq(42)
+    store.remove_projects_from_lpq({17})
+    assert store.get_lpq_projects() == {42}
@@ -5,6 +5,7 @@ from typing import TYPE_CHECKING, Any, Dict
 import pytest
 
 from sentry.processing import realtime_metrics  # type: ignore
+from sentry.processing.realtime_metrics import base  # type: ignore
 from sentry.processing.realtime_metrics.redis import RedisRealtimeMetricsStore  # type: ignore
 from sentry.utils import redis
 
@@ -112,3 +113,88 @@ def test_increment_project_duration_counter_different_buckets(
 
     assert redis_cluster.hget("symbolicate_event_low_priority:histogram:10:17:1140", "20") == "1"
     assert redis_cluster.hget("symbolicate_event_low_priority:histogram:10:17:1150", "40") == "1"
+
+
+def test_projects(store: RedisRealtimeMetricsStore) -> None:
+    now = int(time.time())
+    store.increment_project_event_counter(17, now)
+    store.increment_project_event_counter(42, now)
+    store.increment_project_event_counter(23, now - 10)
+
+    # Projects are forgotten together with their counters.
+    assert sorted(store.projects()) == [17, 42]
+
+
+def test_get_counts_timeseries(store: RedisRealtimeMetricsStore) -> None:
+    store.increment_project_event_counter(17, 1147)
+    store.increment_project_event_counter(17, 1149)
+    store.increment_project_event_counter(17, 1161)
+    store.increment_project_event_counter(42, 1151)
+
+    assert store.get_counts_timeseries(17, 1145, 1165) == [
+        base.BucketedCount(timestamp=1140, count=2),
+        base.BucketedCount(timestamp=1150, count=0),
+        base.BucketedCount(timestamp=1160, count=1),
+    ]
+
+
+def test_get_durations_histogram(store: RedisRealtimeMetricsStore) -> None:
+    store.increment_project_duration_counter(17, 1147, 15)
+    store.increment_project_duration_counter(17, 1149, 19)
+    store.increment_project_duration_counter(17, 1161, 42)
+    store.increment_project_duration_counter(17, 1171, 42)
+    store.increment_project_duration_counter(42, 1151, 15)
+
+    assert store.get_durations_histogram(17, 1145, 1165) == {10: 2, 40: 1}
+
+
+def test_increment_multi(
+    store: RedisRealtimeMetricsStore, redis_cluster: redis._RedisCluster
+) -> None:
+    store.increment_multi(
+        events=[(17, 1147), (17, 1149), (42, 1152)],
+        durations=[(17, 1147, 15), (17, 1149, 19), (42, 1152, 42)],
+    )
+
+    assert redis_cluster.get("symbolicate_event_low_priority:counter:10:17:1140") == "2"
+    assert redis_cluster.get("symbolicate_event_low_priority:counter:10:42:1150") == "1"
+    assert redis_cluster.hgetall("symbolicate_event_low_priority:histogram:10:17:1140") == {
+        "10": "2"
+    }
+    assert redis_cluster.hgetall("symbolicate_event_low_priority:histogram:10:42:1150") == {
+        "40": "1"
+    }
+
+    # Nothing to write, no round trip.
+    store.increment_multi()
+
+
+def test_get_multi(store: RedisRealtimeMetricsStore) -> None:
+    store.increment_multi(
+        events=[(17, 1147), (42, 1151)],
+        durations=[(17, 1147, 15), (42, 1151, 42)],
+    )
+
+    assert store.get_counts_timeseries_multi([17, 42, 23], 1145, 1155) == {
+        17: [base.BucketedCount(1140, 1), base.BucketedCount(1150, 0)],
+        42: [base.BucketedCount(1140, 0), base.BucketedCount(1150, 1)],
+        23: [base.BucketedCount(1140, 0), base.BucketedCount(1150, 0)],
+    }
+    assert store.get_durations_histogram_multi([17, 42, 23], 1145, 1155) == {
+        17: {10: 1},
+        42: {40: 1},
+        23: {},
+    }
+    assert store.get_counts_timeseries_multi([], 1145, 1155) == {}
+
+
+def test_lpq_projects(store: RedisRealtimeMetricsStore) -> None:
+    assert store.get_lpq_projects() == set()
+
+    store.add_project_to_lpq(17)
+    store.add_project_to_lpq(42)
+    assert store.get_lpq_projects() == {17, 42}
+
+    store.remove_projects_from_lpq({17})
+    store.remove_projects_from_lpq(set())
+    assert store.get_lpq_projects() == {42}
@@ -0,0 +1,37 @@
+import pytest
+
+from sentry.ratelimits.redis import LeasedRedisRateLimiter, RedisRateLimiter
+from sentry.testutils.skips import requires_pytest_benchmark
+from sentry.utils.compat.mock import patch
+
+
+def run_processes(limiters, key, limit, calls):
+    # Calls are interleaved between the limiters, which stand in for separate
+    # processes sharing one Redis.
+    allowed = 0
+    for i in range(calls):
+        if not limiters[i % len(limiters)].is_limited(key, limit):
+            allowed += 1
+    return allowed
+
+
+@pytest.mark.parametrize("lease_size", [1, 10])
+@patch("sentry.ratelimits.redis.time", return_value=1000.0)
+def test_accuracy(mock_time, lease_size):
+    limiters = [LeasedRedisRateLimiter(lease_size=lease_size, lease_ttl=60) for _ in range(4)]
+    allowed = run_processes(limiters, f"accuracy:{lease_size}", 100, 1000)
+
+    # Every process can hold back at most one lease worth of unused tokens.
+    assert 100 - len(limiters) * (lease_size - 1) <= allowed <= 100
+
+
+@requires_pytest_benchmark
+def test_benchmark_fixed_window(benchmark):
+    limiter = RedisRateLimiter()
+    benchmark(run_processes, [limiter], "benchmark:fixed", 100000, 1000)
+
+
+@requires_pytest_benchmark
+def test_benchmark_leased(benchmark):
+    limiter = LeasedRedisRateLimiter(lease_size=100, lease_ttl=10)
+    benchmark(run_processes, [limiter], "benchmark:leased", 100000, 1000)
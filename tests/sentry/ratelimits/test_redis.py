@@ -1,5 +1,6 @@
-from sentry.ratelimits.redis import RedisRateLimiter
+from sentry.ratelimits.redis import LeasedRedisRateLimiter, RedisRateLimiter
 from sentry.testutils import TestCase
+from sentry.utils.compat.mock import patch
 
 
 class RedisRateLimiterTest(TestCase):
@@ -13,3 +14,63 @@ class RedisRateLimiterTest(TestCase):
     def test_simple_key(self):
         assert not self.backend.is_limited("foo", 1)
         assert self.backend.is_limited("foo", 1)
+
+
+class LeasedRedisRateLimiterTest(TestCase):
+    def setUp(self):
+        self.backend = LeasedRedisRateLimiter()
+
+    def test_project_key(self):
+        assert not self.backend.is_limited("foo", 1, self.project)
+        assert self.backend.is_limited("foo", 1, self.project)
+
+    def test_simple_key(self):
+        assert not self.backend.is_limited("foo", 1)
+        assert self.backend.is_limited("foo", 1)
+
+    @patch("sentry.ratelimits.redis.time")
+    def test_leases(self, mock_time):
+        mock_time.return_value = 1000.0
+
+        options = {"prefixes": {"leased:": {"lease_size": 4, "lease_ttl": 10}}}
+        backends = [LeasedRedisRateLimiter(**options), LeasedRedisRateLimiter(**options)]
+
+        with patch.object(
+            LeasedRedisRateLimiter,
+            "_acquire_lease",
+            autospec=True,
+            side_effect=LeasedRedisRateLimiter._acquire_lease,
+        ) as acquire:
+            for _ in range(4):
+                assert not backends[0].is_limited("leased:foo", 6)
+            assert acquire.call_count == 1
+
+            # Only the remaining 2 tokens are left for the second process
+            assert not backends[1].is_limited("leased:foo", 6)
+            assert not backends[1].is_limited("leased:foo", 6)
+            assert backends[1].is_limited("leased:foo", 6)
+            assert backends[0].is_limited("leased:foo", 6)
+            assert acquire.call_count == 4
+
+            # Denials are cached as well
+            assert backends[1].is_limited("leased:foo", 6)
+            assert acquire.call_count == 4
+
+        # Keys without a configured prefix are not leased
+        assert not backends[0].is_limited("foo", 2)
+        assert not backends[1].is_limited("foo", 2)
+        assert backends[0].is_limited("foo", 2)
+
+    @patch("sentry.ratelimits.redis.time")
+    def test_sliding_window(self, mock_time):
+        mock_time.return_value = 120.0
+        for _ in range(10):
+            assert not self.backend.is_limited("foo", 10, window=60)
+        assert self.backend.is_limited("foo", 10, window=60)
+
+        # Half of the previous window still overlaps the sliding window
+        mock_time.return_value = 210.0
+        self.backend = LeasedRedisRateLimiter()
+        for _ in range(5):
+            assert not self.backend.is_limited("foo", 10, window=60)
+        assert self.backend.is_limited("foo", 10, window=60)
@@ -6,11 +6,12 @@ from django.db import DEFAULT_DB_ALIAS, connections
 from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
+from sentry import tsdb
 from sentry.models import GroupRuleStatus, GroupStatus, Rule
 from sentry.notifications.types import ActionTargetType
 from sentry.rules import init_registry
 from sentry.rules.filters.base import EventFilter
-from sentry.rules.processor import RuleProcessor
+from sentry.rules.processor import RuleProcessor, get_rule_plan
 from sentry.testutils import TestCase
 from sentry.utils.compat.mock import patch
 
@@ -155,6 +156,107 @@ class RuleProcessorTest(TestCase):
             # creates no rows.
             self.run_query_test(rp, 2)
 
+    def test_frequency_conditions_share_queries(self):
+        Rule.objects.filter(project=self.event.project).delete()
+        rules = [
+            Rule.objects.create(
+                project=self.event.project,
+                data={
+                    "conditions": [
+                        {
+                            "id": "sentry.rules.conditions.event_frequency.EventFrequencyCondition",
+                            "interval": "1h",
+                            "value": value,
+                        }
+                    ],
+                    "actions": [EMAIL_ACTION_DATA],
+                },
+            )
+            for value in (10, 100)
+        ]
+        rp = RuleProcessor(
+            self.event,
+            is_new=True,
+            is_regression=True,
+            is_new_group_environment=True,
+            has_reappeared=True,
+        )
+        with patch.object(tsdb, "get_sums", return_value={self.event.group_id: 1000}) as get_sums:
+            results = list(rp.apply())
+
+        assert get_sums.call_count == 1
+        assert len(results) == 1
+        callback, futures = results[0]
+        assert {future.rule for future in futures} == set(rules)
+
+    def test_failing_filter_skips_frequency_query(self):
+        Rule.objects.filter(project=self.event.project).delete()
+        Rule.objects.create(
+            project=self.event.project,
+            data={
+                "conditions": [
+                    {
+                        "id": "sentry.rules.conditions.event_frequency.EventFrequencyCondition",
+                        "interval": "1h",
+                        "value": 10,
+                    },
+                    {"id": "sentry.rules.filters.level.LevelFilter", "match": "eq", "level": "50"},
+                ],
+                "actions": [EMAIL_ACTION_DATA],
+            },
+        )
+        rp = RuleProcessor(
+            self.event,
+            is_new=True,
+            is_regression=True,
+            is_new_group_environment=True,
+            has_reappeared=True,
+        )
+        with patch.object(tsdb, "get_sums", return_value={self.event.group_id: 1000}) as get_sums:
+            results = list(rp.apply())
+
+        assert not results
+        assert get_sums.call_count == 0
+
+    def test_invalid_frequency_condition_only_fails_itself(self):
+        Rule.objects.create(
+            project=self.event.project,
+            data={
+                "conditions": [
+                    {
+                        "id": "sentry.rules.conditions.event_frequency.EventFrequencyCondition",
+                        "interval": "1h",
+                        "value": 10,
+                        "comparisonType": "percent",
+                        "comparisonInterval": "invalid",
+                    }
+                ],
+                "actions": [EMAIL_ACTION_DATA],
+            },
+        )
+        rp = RuleProcessor(
+            self.event,
+            is_new=True,
+            is_regression=True,
+            is_new_group_environment=True,
+            has_reappeared=True,
+        )
+        results = list(rp.apply())
+        assert len(results) == 1
+        callback, futures = results[0]
+        assert {future.rule for future in futures} == {self.rule}
+
+    def test_rule_plan_cached(self):
+        rules = Rule.get_for_project(self.project.id)
+        plan = get_rule_plan(self.project, rules)
+        assert get_rule_plan(self.project, Rule.get_for_project(self.project.id)) is plan
+
+        self.rule.data["frequency"] = 60
+        self.rule.save()
+        new_plan = get_rule_plan(self.project, Rule.get_for_project(self.project.id))
+        assert new_plan is not plan
+        assert new_plan.rules[self.rule.id].frequency == 60
+
 
 # mock filter which always passes
 class MockFilterTrue(EventFilter):
@@ -234,6 +336,39 @@ class RuleProcessorTestFilters(TestCase):
             results = list(rp.apply())
             assert len(results) == 0
 
+    @patch("sentry.constants._SENTRY_RULES", MOCK_SENTRY_RULES_WITH_FILTERS)
+    def test_identical_filters_evaluated_once(self):
+        self.event = self.store_event(data={}, project_id=self.project.id)
+
+        filter_data = {"id": "tests.sentry.rules.test_processor.MockFilterTrue"}
+
+        Rule.objects.filter(project=self.event.project).delete()
+        rules = [
+            Rule.objects.create(
+                project=self.event.project,
+                data={
+                    "conditions": [EVERY_EVENT_COND_DATA, filter_data],
+                    "actions": [EMAIL_ACTION_DATA],
+                },
+            )
+            for _ in range(3)
+        ]
+        with patch("sentry.rules.processor.rules", init_registry()), patch.object(
+            MockFilterTrue, "passes", return_value=True
+        ) as passes:
+            rp = RuleProcessor(
+                self.event,
+                is_new=True,
+                is_regression=True,
+                is_new_group_environment=True,
+                has_reappeared=True,
+            )
+            results = list(rp.apply())
+            assert len(results) == 1
+            callback, futures = results[0]
+            assert {future.rule for future in futures} == set(rules)
+            assert passes.call_count == 1
+
     def test_no_filters(self):
         # setup an alert rule with 1 conditions and no filters that passes
         self.event = self.store_event(data={}, project_id=self.project.id)
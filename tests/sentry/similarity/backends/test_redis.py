@@ -7,6 +7,7 @@ from sentry.similarity.backends.redis import RedisScriptMinHashIndexBackend
 from sentry.similarity.signatures import MinHashSignatureBuilder
 from sentry.testutils import TestCase
 from sentry.utils import redis
+from sentry.utils.compat import mock
 
 from .base import MinHashIndexBackendTestMixin
 
@@ -26,6 +27,36 @@ class RedisScriptMinHashIndexBackendTestCase(MinHashIndexBackendTestMixin, TestC
             10,
         )
 
+    def test_record_multi(self):
+        timestamp = int(time.time())
+        later = timestamp + self.index.interval * (self.index.retention + 1)
+
+        with mock.patch.object(
+            self.index,
+            "_build_signature_arguments_many",
+            wraps=self.index._build_signature_arguments_many,
+        ) as build_signature_arguments_many:
+            self.index.record_multi(
+                "example",
+                [
+                    ("1", [("index", "hello world")], later),
+                    ("2", [("index", "hello world")]),
+                    ("3", []),
+                ],
+                timestamp=timestamp,
+            )
+
+        assert build_signature_arguments_many.call_count == 1
+
+        # Each record is only visible within the retention window of its own
+        # timestamp.
+        assert self.index.classify(
+            "example", [("index", 0, "hello world")], timestamp=timestamp
+        ) == [("2", [1.0])]
+        assert self.index.classify("example", [("index", 0, "hello world")], timestamp=later) == [
+            ("1", [1.0])
+        ]
+
     def test_export_import(self):
         self.index.record("example", "1", [("index", "hello world")])
 
@@ -0,0 +1,30 @@
+import random
+
+from sentry.similarity.signatures import MinHashSignatureBuilder
+from sentry.testutils.skips import requires_pytest_benchmark
+
+
+def get_feature_sets(count=100, size=50, vocabulary=500):
+    # Features of events of the same group largely overlap, which is what
+    # `build_many` takes advantage of.
+    rng = random.Random(0)
+    words = [f"frame-{i}" for i in range(vocabulary)]
+    return [rng.sample(words, size) for _ in range(count)]
+
+
+@requires_pytest_benchmark
+def test_benchmark_signatures(benchmark):
+    builder = MinHashSignatureBuilder(16, 0xFFFF)
+    feature_sets = get_feature_sets()
+
+    benchmark(lambda: [builder(features) for features in feature_sets])
+
+
+@requires_pytest_benchmark
+def test_benchmark_signatures_build_many(benchmark):
+    builder = MinHashSignatureBuilder(16, 0xFFFF)
+    feature_sets = get_feature_sets()
+
+    assert benchmark(builder.build_many, feature_sets) == [
+        builder(features) for features in feature_sets
+    ]
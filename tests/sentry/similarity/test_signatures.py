@@ -29,3 +29,15 @@ class MinHashSignatureBuilderTestCase(TestCase):
         self.assertAlmostEqual(
             similarity, estimation, delta=0.1  # totally made up constant, seems reasonable
         )
+
+    def test_build_many(self):
+        get_signature = MinHashSignatureBuilder(16, 0xFFFF)
+
+        feature_sets = [
+            {"foo", "bar", "baz"},
+            "hello world",
+            ["foo", "bar"],
+            [b"\x00\x01", b"foo"],
+        ]
+        assert get_signature.build_many(feature_sets) == map(get_signature, feature_sets)
+        assert get_signature.build_many([]) == []
@@ -17,7 +17,7 @@ from sentry.models import (
 )
 from sentry.ownership.grammar import Matcher, Owner, Rule, dump_schema
 from sentry.tasks.merge import merge_groups
-from sentry.tasks.post_process import post_process_group
+from sentry.tasks.post_process import post_process_group, post_process_group_batch
 from sentry.testutils import TestCase
 from sentry.testutils.helpers import with_feature
 from sentry.testutils.helpers.datetime import before_now, iso_format
@@ -107,6 +107,35 @@ class PostProcessGroupTest(TestCase):
         )
         assert event_processing_store.get(cache_key) is None
 
+    @patch("sentry.rules.processor.RuleProcessor")
+    def test_batch(self, mock_processor):
+        events = [
+            self.store_event(data={"message": message}, project_id=self.project.id)
+            for message in ("foo", "bar")
+        ]
+        cache_keys = [write_event_to_cache(event) for event in events]
+
+        post_process_group_batch(
+            project_id=self.project.id,
+            events=[
+                {
+                    "is_new": True,
+                    "is_regression": False,
+                    "is_new_group_environment": True,
+                    "cache_key": cache_key,
+                    "group_id": event.group_id,
+                }
+                for cache_key, event in [("total-rubbish", events[0])]
+                + list(zip(cache_keys, events))
+            ],
+        )
+
+        assert [call.args[0] for call in mock_processor.call_args_list] == [
+            EventMatcher(event, group=event.group) for event in events
+        ]
+        for cache_key in cache_keys:
+            assert event_processing_store.get(cache_key) is None
+
     def test_processing_cache_cleared_with_commits(self):
         # Regression test to guard against suspect commit calculations breaking the
         # cache
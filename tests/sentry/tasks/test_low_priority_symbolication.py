@@ -0,0 +1,108 @@
+import pytest
+
+from sentry.processing.realtime_metrics.base import BucketedCount
+from sentry.processing.realtime_metrics.memory import MemoryRealtimeMetricsStore
+from sentry.tasks.low_priority_symbolication import (
+    ProjectScore,
+    get_percentile,
+    get_project_scores,
+    get_rate,
+    scan_for_suspect_projects,
+    should_demote,
+    should_promote,
+    update_lpq_projects,
+)
+from sentry.testutils.helpers.options import override_options
+
+
+def test_get_rate():
+    counts = [BucketedCount(timestamp=10 * i, count=i) for i in range(5)]
+    assert get_rate(counts, window=50, sample_rate=1.0) == 0.2
+    assert get_rate(counts, window=50, sample_rate=0.1) == 2.0
+    assert get_rate([], window=50, sample_rate=1.0) == 0
+
+
+def test_get_percentile():
+    assert get_percentile({}, 0.9) == 0
+    assert get_percentile({0: 90, 60: 10}, 0.9) == 0
+    assert get_percentile({0: 89, 60: 11}, 0.9) == 60
+    assert get_percentile({10: 1, 30: 1, 20: 1}, 0.5) == 20
+
+
+@pytest.mark.django_db
+def test_hysteresis():
+    with override_options(
+        {
+            "symbolicate-event.low-priority.demote-rate": 10.0,
+            "symbolicate-event.low-priority.demote-duration": 60,
+            "symbolicate-event.low-priority.promote-rate": 5.0,
+            "symbolicate-event.low-priority.promote-duration": 30,
+        }
+    ):
+        assert should_demote(ProjectScore(rate=11.0, p90_duration=0))
+        assert should_demote(ProjectScore(rate=0.0, p90_duration=70))
+        assert not should_demote(ProjectScore(rate=8.0, p90_duration=40))
+
+        # Projects between both limits stay where they are.
+        assert not should_promote(ProjectScore(rate=8.0, p90_duration=40))
+        assert not should_promote(ProjectScore(rate=1.0, p90_duration=40))
+        assert should_promote(ProjectScore(rate=1.0, p90_duration=20))
+
+
+@pytest.mark.django_db
+def test_get_project_scores(monkeypatch):
+    store = MemoryRealtimeMetricsStore()
+    store.increment_multi(
+        events=[(17, 995)] * 20 + [(42, 995)],
+        durations=[(17, 995, 5)] * 20 + [(42, 995, 75)],
+    )
+
+    for name in ("get_counts_timeseries_multi", "get_durations_histogram_multi"):
+        monkeypatch.setattr(f"sentry.processing.realtime_metrics.{name}", getattr(store, name))
+
+    with override_options(
+        {
+            "symbolicate-event.low-priority.window": 10,
+            "symbolicate-event.low-priority.metrics.submission-rate": 1.0,
+        }
+    ):
+        assert get_project_scores([17, 42, 23], now=1000) == {
+            17: ProjectScore(rate=2.0, p90_duration=0),
+            42: ProjectScore(rate=0.1, p90_duration=70),
+            23: ProjectScore(rate=0.0, p90_duration=0),
+        }
+
+
+@pytest.mark.django_db
+def test_update_lpq_projects(monkeypatch):
+    scores = {
+        1: ProjectScore(rate=100.0, p90_duration=0),
+        2: ProjectScore(rate=0.1, p90_duration=0),
+        3: ProjectScore(rate=100.0, p90_duration=0),
+        4: ProjectScore(rate=0.1, p90_duration=0),
+    }
+    lpq_projects = {3, 4, 5}
+
+    monkeypatch.setattr(
+        "sentry.tasks.low_priority_symbolication.get_project_scores",
+        lambda project_ids, now: {project_id: scores[project_id] for project_id in project_ids},
+    )
+    monkeypatch.setattr("sentry.processing.realtime_metrics.add_project_to_lpq", lpq_projects.add)
+    monkeypatch.setattr(
+        "sentry.processing.realtime_metrics.remove_projects_from_lpq",
+        lpq_projects.difference_update,
+    )
+
+    update_lpq_projects(scores, set(lpq_projects), now=1000)
+
+    # Project 5 has no recent metrics anymore.
+    assert lpq_projects == {1, 3}
+
+
+@pytest.mark.django_db
+def test_scan_for_suspect_projects_disabled(monkeypatch):
+    def projects():
+        raise AssertionError("should not be scanned")
+
+    monkeypatch.setattr("sentry.processing.realtime_metrics.projects", projects)
+    scan_for_suspect_projects()
@@ -4,6 +4,7 @@ from sentry.models import ProjectKey, ProjectOption
 from sentry.relay.projectconfig_cache.redis import RedisProjectConfigCache
 from sentry.relay.projectconfig_debounce_cache.redis import RedisProjectConfigDebounceCache
 from sentry.tasks.relay import schedule_update_config_cache
+from sentry.utils import json
 from sentry.utils.compat.mock import patch
 
 
@@ -117,6 +118,12 @@ def test_generate(
         }
     ]
 
+    serialized = redis_cache.get_many_serialized([default_projectkey.public_key, "missing"])
+    assert list(serialized) == [default_projectkey.public_key]
+    assert json.loads(serialized[default_projectkey.public_key]) == redis_cache.get(
+        default_projectkey.public_key
+    )
+
 
 @pytest.mark.django_db
 @pytest.mark.parametrize("entire_organization", (True, False))
@@ -472,3 +472,19 @@ def test_should_demote_symbolication_always_and_never(default_project):
         }
     ):
         assert not should_demote_symbolication(default_project.id)
+
+
+@pytest.mark.django_db
+def test_should_demote_symbolication_auto_routing(default_project, monkeypatch):
+    monkeypatch.setattr(
+        "sentry.processing.realtime_metrics.get_lpq_projects", lambda: {default_project.id}
+    )
+    monkeypatch.setattr("sentry.tasks.store._lpq_projects_cache", (0.0, frozenset()))
+
+    assert not should_demote_symbolication(default_project.id)
+
+    with override_options({"symbolicate-event.low-priority.auto-routing": True}):
+        assert should_demote_symbolication(default_project.id)
+
+        with override_options({"store.symbolicate-event-lpq-never": [default_project.id]}):
+            assert not should_demote_symbolication(default_project.id)
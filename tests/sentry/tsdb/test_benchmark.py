@@ -0,0 +1,70 @@
+from datetime import datetime
+
+import pytest
+import pytz
+
+from sentry.testutils.skips import requires_pytest_benchmark
+from sentry.tsdb.base import ONE_DAY, ONE_HOUR, ONE_MINUTE, TSDBModel
+from sentry.tsdb.redis import CountMinScript, RedisTSDB
+from sentry.utils.dates import to_timestamp
+
+
+@pytest.fixture
+def db():
+    db = RedisTSDB(
+        rollups=((10, 30), (ONE_MINUTE, 120), (ONE_HOUR, 24), (ONE_DAY, 30)),
+        enable_frequency_sketches=True,
+        hosts={i - 6: {"db": i} for i in range(6, 9)},
+    )
+    yield db
+    with db.cluster.all() as client:
+        client.flushdb()
+
+
+def get_records(count=200):
+    # Users affected by a few groups of a flood, as recorded for a batch of
+    # events.
+    return [(TSDBModel.users_affected_by_group, i % 10, (f"user-{i % 50}",)) for i in range(count)]
+
+
+def get_frequencies(count=200):
+    return [
+        (TSDBModel.frequent_environments_by_group, {i % 10: {str(i % 3): 1}}) for i in range(count)
+    ]
+
+
+def record_unbatched(db, records, frequencies, timestamp):
+    # Records every item and rollup separately, which is how distinct counters
+    # and frequency tables were recorded before they were batched.
+    ts = int(to_timestamp(timestamp))
+    with db.cluster.fanout() as client:
+        for model, key, values in records:
+            c = client.target_key(key)
+            for rollup, max_values in db.rollups.items():
+                k = db.make_key(model, rollup, ts, key, None)
+                c.pfadd(k, *values)
+                c.expireat(k, db.calculate_expiry(rollup, max_values, timestamp))
+
+    commands = {}
+    for model, request in frequencies:
+        for key, items in request.items():
+            keys = []
+            for rollup in db.rollups:
+                keys.extend(db.make_frequency_table_keys(model, rollup, ts, key, None))
+            arguments = ["INCR"] + list(db.DEFAULT_SKETCH_PARAMETERS)
+            for member, score in items.items():
+                arguments.extend((score, member))
+            commands.setdefault(key, []).append((CountMinScript, keys, arguments))
+    db.cluster.execute_commands(commands)
+
+
+def record_batched(db, records, frequencies, timestamp):
+    db.record_multi(records, timestamp)
+    db.record_frequency_multi(frequencies, timestamp)
+
+
+@requires_pytest_benchmark
+@pytest.mark.parametrize("record", [record_unbatched, record_batched])
+def test_benchmark_record(benchmark, db, record):
+    timestamp = datetime.utcnow().replace(tzinfo=pytz.UTC)
+    benchmark(record, db, get_records(), get_frequencies(), timestamp)
@@ -1,3 +1,6 @@
+import gc
+import threading
+import weakref
 from contextlib import contextmanager
 from datetime import datetime, timedelta
 
@@ -6,10 +9,54 @@ import pytz
 
 from sentry.testutils import TestCase
 from sentry.tsdb.base import ONE_DAY, ONE_HOUR, ONE_MINUTE, TSDBModel
-from sentry.tsdb.redis import CountMinScript, RedisTSDB, SuppressionWrapper
+from sentry.tsdb import redis as redis_tsdb
+from sentry.tsdb.redis import (
+    BucketCache,
+    CounterBuffer,
+    CountMinScript,
+    RedisTSDB,
+    RequestCoalescer,
+    SuppressionWrapper,
+    flush_counter_buffer_on_shutdown,
+)
+from sentry.utils.compat.mock import patch
 from sentry.utils.dates import to_datetime, to_timestamp
 
 
+def test_flush_counter_buffer_on_shutdown():
+    writes = []
+    counter_buffer = CounterBuffer(lambda *args: writes.append(args), 3600, 100)
+    flush_counter_buffer_on_shutdown(counter_buffer)
+    counter_buffer.add("cluster", True, {("key", "field"): 1}, {"key": 1})
+
+    redis_tsdb._flush_counter_buffers()
+    assert writes == [("cluster", True, {("key", "field"): 1}, {"key": 1})]
+
+    # Registered buffers are not kept alive by the shutdown handlers.
+    counter_buffer = CounterBuffer(lambda *args: None, 3600, 100)
+    flush_counter_buffer_on_shutdown(counter_buffer)
+    ref = weakref.ref(counter_buffer)
+    del counter_buffer
+    gc.collect()
+    assert ref() is None
+
+
+def test_bucket_cache():
+    cache = BucketCache(2, ttl=60)
+    cache.set_many({("range", 1, 3600, 0, 1, None): 1, ("range", 1, 3600, 0, 2, None): 2})
+    assert cache.get_many([("range", 1, 3600, 0, 1, None)]) == {("range", 1, 3600, 0, 1, None): 1}
+
+    cache.invalidate([TSDBModel(1)], [1])
+    assert cache.get_many([("range", 1, 3600, 0, 1, None), ("range", 1, 3600, 0, 2, None)]) == {
+        ("range", 1, 3600, 0, 2, None): 2
+    }
+
+    # Entries expire after the ttl.
+    cache = BucketCache(2, ttl=0)
+    cache.set_many({("range", 1, 3600, 0, 1, None): 1})
+    assert cache.get_many([("range", 1, 3600, 0, 1, None)]) == {}
+
+
 def test_suppression_wrapper():
     @contextmanager
     def raise_after():
@@ -27,6 +74,37 @@ def test_suppression_wrapper():
         raise Exception("should not propagate")
 
 
+def test_request_coalescer():
+    coalescer = RequestCoalescer()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(None)
+        started.set()
+        release.wait()
+        return [1, 2]
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(coalescer.call("key", fetch)))
+    leader.start()
+    started.wait()
+
+    follower = threading.Thread(target=lambda: results.append(coalescer.call("key", fetch)))
+    follower.start()
+    # Give the follower a chance to wait for the leader.
+    follower.join(0.1)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert results == [[1, 2], [1, 2]]
+    assert len(calls) == 1
+
+    assert coalescer.call("key", lambda: [3]) == [3]
+
+
 class RedisTSDBTest(TestCase):
     def setUp(self):
         self.db = RedisTSDB(
@@ -179,6 +257,161 @@ class RedisTSDBTest(TestCase):
         results = self.db.get_sums(TSDBModel.project, [1, 2], dts[0], dts[-1], environment_id=1)
         assert results == {1: 0, 2: 0}
 
+    def test_counter_buffer(self):
+        db = RedisTSDB(
+            rollups=((ONE_HOUR, 24),),
+            counter_buffer_interval=3600,
+            counter_buffer_size=4,
+            hosts={i - 6: {"db": i} for i in range(6, 9)},
+        )
+
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+        epoch = int(to_timestamp(now)) // ONE_HOUR * ONE_HOUR
+
+        for _ in range(3):
+            db.incr_multi([(TSDBModel.project, 1), (TSDBModel.group, 2)], now)
+        db.incr(TSDBModel.project, 1, now, environment_id=1)
+
+        # Increments of the same hash field are aggregated until flushed.
+        assert db.get_range(TSDBModel.project, [1], now, now) == {1: [(epoch, 0)]}
+        db.counter_buffer.flush()
+        assert db.get_range(TSDBModel.project, [1], now, now) == {1: [(epoch, 4)]}
+        assert db.get_range(TSDBModel.group, [2], now, now) == {2: [(epoch, 3)]}
+
+        # Reaching the maximum number of pending hash fields flushes.
+        db.incr_multi([(TSDBModel.group, i) for i in range(3, 7)], now)
+        assert db.get_range(TSDBModel.group, [3, 6], now, now) == {
+            3: [(epoch, 1)],
+            6: [(epoch, 1)],
+        }
+
+    def test_read_cache(self):
+        db = RedisTSDB(
+            rollups=((ONE_HOUR, 24),),
+            read_cache_size=100,
+            read_cache_delay=0,
+            hosts={i - 6: {"db": i} for i in range(6, 9)},
+        )
+
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+        dts = [now - timedelta(hours=1), now]
+        epochs = [int(to_timestamp(d)) // ONE_HOUR * ONE_HOUR for d in dts]
+
+        for d in dts:
+            db.incr(TSDBModel.project, 1, d)
+            db.record(TSDBModel.users_affected_by_project, 1, ("foo",), d)
+
+        assert db.get_range(TSDBModel.project, [1], dts[0], dts[1]) == {
+            1: [(epochs[0], 1), (epochs[1], 1)]
+        }
+        assert db.get_distinct_counts_series(
+            TSDBModel.users_affected_by_project, [1], dts[0], dts[1]
+        ) == {1: [(epochs[0], 1), (epochs[1], 1)]}
+
+        for d in dts:
+            db.incr(TSDBModel.project, 1, d)
+            db.record(TSDBModel.users_affected_by_project, 1, ("bar",), d)
+
+        # Only the bucket that is still open is read again.
+        assert db.get_range(TSDBModel.project, [1], dts[0], dts[1]) == {
+            1: [(epochs[0], 1), (epochs[1], 2)]
+        }
+        assert db.get_distinct_counts_series(
+            TSDBModel.users_affected_by_project, [1], dts[0], dts[1]
+        ) == {1: [(epochs[0], 1), (epochs[1], 2)]}
+
+        # Merges invalidate the cached buckets of the destination.
+        db.incr(TSDBModel.project, 2, dts[0], count=3)
+        db.merge(TSDBModel.project, 1, [2], now)
+        assert db.get_range(TSDBModel.project, [1], dts[0], dts[1]) == {
+            1: [(epochs[0], 5), (epochs[1], 2)]
+        }
+
+    def test_merge_chunks(self):
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+        rollups = self.db.get_active_series(timestamp=now)
+        self.db.merge_chunk_size = 10
+
+        def iter_merge_chunks():
+            return self.db._iter_merge_chunks(
+                self.db.cluster, "counters", TSDBModel.project, 1, [2], [None], rollups
+            )
+
+        chunks = list(iter_merge_chunks())
+        assert all(len(chunk) <= 10 for chunk in chunks)
+        assert sum(chunks, []) == [
+            (rollup, timestamp) for rollup, series in rollups.items() for timestamp in series
+        ]
+
+        # Interrupt a merge after the first chunk has been merged.
+        interrupted = iter_merge_chunks()
+        assert next(interrupted) == chunks[0]
+        assert next(interrupted) == chunks[1]
+        del interrupted
+
+        assert list(iter_merge_chunks()) == chunks[1:]
+        assert list(iter_merge_chunks()) == chunks
+
+    def test_merge_resumed(self):
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+        dts = [now - timedelta(hours=i) for i in range(4)]
+        distinct_model = TSDBModel.users_affected_by_project
+
+        for dt in dts:
+            self.db.incr(TSDBModel.project, 1, dt)
+            self.db.incr(TSDBModel.project, 2, dt, count=2)
+            self.db.record(distinct_model, 1, ["b", "c"], dt)
+            self.db.record(distinct_model, 2, ["a", "b"], dt)
+
+        self.db.merge_chunk_size = 1
+        iter_merge_chunks = self.db._iter_merge_chunks
+
+        class Interrupted(Exception):
+            pass
+
+        def interrupted_merge_chunks(*args, **kwargs):
+            # Stop once the hourly bucket of dts[2] has been merged.
+            for chunk in iter_merge_chunks(*args, **kwargs):
+                yield chunk
+                ((rollup, timestamp),) = chunk
+                if rollup == ONE_HOUR and 0 <= (dts[2] - timestamp).total_seconds() < ONE_HOUR:
+                    raise Interrupted()
+
+        with patch.object(self.db, "_iter_merge_chunks", interrupted_merge_chunks):
+            with pytest.raises(Interrupted):
+                self.db.merge(TSDBModel.project, 1, [2], now)
+            with pytest.raises(Interrupted):
+                self.db.merge_distinct_counts(distinct_model, 1, [2], now)
+
+        def get_series():
+            counts = self.db.get_range(TSDBModel.project, [1, 2], dts[3], now, rollup=ONE_HOUR)
+            distinct_counts = self.db.get_distinct_counts_series(
+                distinct_model, [1, 2], dts[3], now, rollup=ONE_HOUR
+            )
+            return (
+                {key: [count for _, count in series] for key, series in counts.items()},
+                {key: [count for _, count in series] for key, series in distinct_counts.items()},
+            )
+
+        # Only the oldest two hours have been merged.
+        assert get_series() == (
+            {1: [3, 3, 1, 1], 2: [0, 0, 2, 2]},
+            {1: [3, 3, 2, 2], 2: [0, 0, 2, 2]},
+        )
+
+        self.db.merge(TSDBModel.project, 1, [2], now)
+        self.db.merge_distinct_counts(distinct_model, 1, [2], now)
+
+        assert get_series() == (
+            {1: [3, 3, 3, 3], 2: [0, 0, 0, 0]},
+            {1: [3, 3, 3, 3], 2: [0, 0, 0, 0]},
+        )
+        assert self.db.get_sums(TSDBModel.project, [1, 2], dts[3], now) == {1: 12, 2: 0}
+        assert self.db.get_distinct_counts_totals(distinct_model, [1, 2], dts[3], now) == {
+            1: 3,
+            2: 0,
+        }
+
     def test_count_distinct(self):
         now = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(hours=4)
         dts = [now + timedelta(hours=i) for i in range(4)]
@@ -587,6 +820,48 @@ class RedisTSDBTest(TestCase):
             model, ("organization:1", "organization:2"), now, environment_id=1
         ) == {"organization:1": [], "organization:2": []}
 
+    def test_batched_recording(self):
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+        distinct_model = TSDBModel.users_affected_by_group
+        frequency_model = TSDBModel.frequent_releases_by_group
+        keys = list(range(20))
+
+        with patch.object(
+            self.db.cluster, "execute_commands", wraps=self.db.cluster.execute_commands
+        ) as execute_commands:
+            self.db.record_multi(
+                [(distinct_model, key, ("foo", "bar")) for key in keys]
+                + [(distinct_model, key, ("bar", "baz")) for key in keys],
+                now,
+            )
+            self.db.record_frequency_multi(
+                [(frequency_model, {key: {"1": 1, "2": 2}}) for key in keys]
+                + [(frequency_model, {key: {"1": 2}}) for key in keys],
+                now,
+            )
+
+        # One script invocation per host and data type.
+        for (commands,), _ in execute_commands.call_args_list:
+            assert len(commands) <= len(self.db.cluster.hosts)
+            assert all(len(invocations) == 1 for invocations in commands.values())
+
+        assert self.db.get_distinct_counts_totals(distinct_model, keys, now, rollup=3600) == {
+            key: 3 for key in keys
+        }
+        assert self.db.get_most_frequent(frequency_model, keys, now, rollup=3600) == {
+            key: [("1", 3.0), ("2", 2.0)] for key in keys
+        }
+
+    def test_record_many_values(self):
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+        model = TSDBModel.users_affected_by_group
+
+        # More values than can be unpacked in Lua at once
+        self.db.record(model, 1, [str(i) for i in range(10000)], now)
+
+        count = self.db.get_distinct_counts_totals(model, [1], now, rollup=3600)[1]
+        assert abs(count - 10000) < 10000 * 0.05
+
     def test_frequency_table_import_export_no_estimators(self):
         client = self.db.cluster.get_local_client_for_key("key")
 